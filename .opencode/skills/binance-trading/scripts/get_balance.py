@@ -13,6 +13,7 @@ except ImportError:
 
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
+from price_snapshot import PriceSnapshot
 
 
 def find_project_root() -> Path:
@@ -117,7 +118,12 @@ def print_spot_balance(balances: list[dict]) -> None:
     print("━" * 50)
 
     total_usdt = 0
-    client = Client()  # 시세 조회용
+    # USDT 환산 가격은 전체 시세 스냅샷 한 번으로 조회
+    try:
+        prices = PriceSnapshot.load()
+    except Exception as e:
+        print(f"Warning: 시세 조회 실패, USDT 환산 생략: {e}", file=sys.stderr)
+        prices = PriceSnapshot({})
 
     for b in balances:
         asset = b["asset"]
@@ -125,14 +131,7 @@ def print_spot_balance(balances: list[dict]) -> None:
         locked = b["locked"]
 
         # USDT 환산
-        if asset == "USDT":
-            usdt_value = total
-        else:
-            try:
-                price = client.get_symbol_ticker(symbol=f"{asset}USDT")
-                usdt_value = total * float(price["price"])
-            except Exception:
-                usdt_value = 0
+        usdt_value = total * prices.usdt(asset)
 
         total_usdt += usdt_value
 
@@ -5,41 +5,17 @@ import argparse
 import sys
 from pathlib import Path
 
-try:
-    from dotenv import load_dotenv
-except ImportError:
-    load_dotenv = None
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
 
-from binance.client import Client
-from binance.exceptions import BinanceAPIException
-
-
-def find_project_root() -> Path:
-    current = Path(__file__).resolve().parent
-    while current != current.parent:
-        if (current / ".git").exists() or (current / ".env").exists():
-            return current
-        current = current.parent
-    return Path.cwd()
-
-
-def load_env():
-    if load_dotenv:
-        project_root = find_project_root()
-        env_path = project_root / ".env"
-        if env_path.exists():
-            load_dotenv(env_path)
+from market_client import MarketDataError, market_call  # noqa: E402
 
 
 def get_markets(quote: str | None = None, search: str | None = None) -> None:
     """마켓 목록 조회"""
-    load_env()
-    client = Client()
-
     try:
-        exchange_info = client.get_exchange_info()
-    except BinanceAPIException as e:
-        print(f"Error: {e.message}", file=sys.stderr)
+        exchange_info = market_call("binance", "get_exchange_info")
+    except MarketDataError as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
     symbols = exchange_info["symbols"]
@@ -88,10 +64,8 @@ def main():
     if args.json:
         import json
 
-        load_env()
-        client = Client()
         try:
-            exchange_info = client.get_exchange_info()
+            exchange_info = market_call("binance", "get_exchange_info")
             symbols = exchange_info["symbols"]
 
             if args.quote:
@@ -102,8 +76,8 @@ def main():
             symbols = [s for s in symbols if s["status"] == "TRADING"]
             result = [{"symbol": s["symbol"], "base": s["baseAsset"], "quote": s["quoteAsset"]} for s in symbols]
             print(json.dumps(result, indent=2))
-        except BinanceAPIException as e:
-            print(json.dumps({"error": e.message}, indent=2))
+        except MarketDataError as e:
+            print(json.dumps({"error": str(e)}, indent=2))
             sys.exit(1)
     else:
         get_markets(args.quote, args.search)
@@ -1,35 +1,14 @@
 #!/usr/bin/env python3
-"""바이낸스 OHLCV(캔들) 데이터 조회 스크립트"""
+"""바이낸스 OHLCV(캔들) 데이터 조회 스크립트 (로컬 캔들 저장소 경유)"""
 
 import argparse
 import sys
-from datetime import datetime
 from pathlib import Path
 
-try:
-    from dotenv import load_dotenv
-except ImportError:
-    load_dotenv = None
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
 
-from binance.client import Client
-from binance.exceptions import BinanceAPIException
-
-
-def find_project_root() -> Path:
-    current = Path(__file__).resolve().parent
-    while current != current.parent:
-        if (current / ".git").exists() or (current / ".env").exists():
-            return current
-        current = current.parent
-    return Path.cwd()
-
-
-def load_env():
-    if load_dotenv:
-        project_root = find_project_root()
-        env_path = project_root / ".env"
-        if env_path.exists():
-            load_dotenv(env_path)
+from candle_store import get_candles  # noqa: E402
+from market_client import MarketDataError  # noqa: E402
 
 
 def format_number(num: float, decimals: int = 2) -> str:
@@ -47,28 +26,26 @@ def to_symbol(ticker: str, quote: str = "USDT") -> str:
 
 # 바이낸스 캔들 간격 매핑
 INTERVAL_MAP = {
-    "1m": Client.KLINE_INTERVAL_1MINUTE,
-    "3m": Client.KLINE_INTERVAL_3MINUTE,
-    "5m": Client.KLINE_INTERVAL_5MINUTE,
-    "15m": Client.KLINE_INTERVAL_15MINUTE,
-    "30m": Client.KLINE_INTERVAL_30MINUTE,
-    "1h": Client.KLINE_INTERVAL_1HOUR,
-    "2h": Client.KLINE_INTERVAL_2HOUR,
-    "4h": Client.KLINE_INTERVAL_4HOUR,
-    "6h": Client.KLINE_INTERVAL_6HOUR,
-    "8h": Client.KLINE_INTERVAL_8HOUR,
-    "12h": Client.KLINE_INTERVAL_12HOUR,
-    "1d": Client.KLINE_INTERVAL_1DAY,
-    "3d": Client.KLINE_INTERVAL_3DAY,
-    "1w": Client.KLINE_INTERVAL_1WEEK,
-    "1M": Client.KLINE_INTERVAL_1MONTH,
+    "1m": "1m",
+    "3m": "3m",
+    "5m": "5m",
+    "15m": "15m",
+    "30m": "30m",
+    "1h": "1h",
+    "2h": "2h",
+    "4h": "4h",
+    "6h": "6h",
+    "8h": "8h",
+    "12h": "12h",
+    "1d": "1d",
+    "3d": "3d",
+    "1w": "1w",
+    "1M": "1M",
 }
 
 
 def get_ohlcv(ticker: str, quote: str = "USDT", interval: str = "1d", count: int = 100) -> None:
     """OHLCV 데이터 조회"""
-    load_env()
-    client = Client()
     symbol = to_symbol(ticker, quote)
 
     if interval not in INTERVAL_MAP:
@@ -77,27 +54,23 @@ def get_ohlcv(ticker: str, quote: str = "USDT", interval: str = "1d", count: int
         sys.exit(1)
 
     try:
-        klines = client.get_klines(
-            symbol=symbol,
-            interval=INTERVAL_MAP[interval],
-            limit=count,
-        )
-    except BinanceAPIException as e:
-        print(f"Error: {e.message}", file=sys.stderr)
+        df = get_candles("binance", symbol, INTERVAL_MAP[interval], count)
+    except MarketDataError as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
-    print(f"📊 {symbol} {interval} 캔들 (최근 {len(klines)}개)")
+    print(f"📊 {symbol} {interval} 캔들 (최근 {len(df)}개)")
     print("━" * 80)
     print(f"{'시간':^20} | {'시가':>12} | {'고가':>12} | {'저가':>12} | {'종가':>12} | {'거래량':>12}")
     print("━" * 80)
 
-    for kline in klines[-20:]:  # 최근 20개만 출력
-        open_time = datetime.fromtimestamp(kline[0] / 1000).strftime("%Y-%m-%d %H:%M")
-        open_price = float(kline[1])
-        high = float(kline[2])
-        low = float(kline[3])
-        close = float(kline[4])
-        volume = float(kline[5])
+    for idx, row in df.tail(20).iterrows():  # 최근 20개만 출력
+        open_time = idx.strftime("%Y-%m-%d %H:%M")
+        open_price = row["open"]
+        high = row["high"]
+        low = row["low"]
+        close = row["close"]
+        volume = row["volume"]
 
         print(
             f"{open_time:^20} | "
@@ -108,8 +81,8 @@ def get_ohlcv(ticker: str, quote: str = "USDT", interval: str = "1d", count: int
             f"{format_number(volume, 4):>12}"
         )
 
-    if len(klines) > 20:
-        print(f"... (총 {len(klines)}개 중 최근 20개만 표시)")
+    if len(df) > 20:
+        print(f"... (총 {len(df)}개 중 최근 20개만 표시)")
 
 
 def main():
@@ -123,39 +96,31 @@ def main():
         choices=list(INTERVAL_MAP.keys()),
         help="캔들 간격 (기본: 1d)",
     )
-    parser.add_argument("--count", "-c", type=int, default=100, help="캔들 수 (기본: 100, 최대: 1000)")
+    parser.add_argument("--count", "-c", type=int, default=100, help="캔들 수 (기본: 100, 1000개 초과는 페이지 나눠 조회)")
     parser.add_argument("--json", action="store_true", help="JSON 형식 출력")
     args = parser.parse_args()
 
     if args.json:
         import json
 
-        load_env()
-        client = Client()
         symbol = to_symbol(args.ticker, args.quote)
         try:
-            klines = client.get_klines(
-                symbol=symbol,
-                interval=INTERVAL_MAP[args.interval],
-                limit=args.count,
-            )
-            # OHLCV 포맷으로 변환
+            df = get_candles("binance", symbol, INTERVAL_MAP[args.interval], args.count)
+            # OHLCV 포맷으로 변환 (인덱스는 UTC 기준)
             result = []
-            for k in klines:
+            for idx, row in df.iterrows():
                 result.append({
-                    "timestamp": k[0],
-                    "open": float(k[1]),
-                    "high": float(k[2]),
-                    "low": float(k[3]),
-                    "close": float(k[4]),
-                    "volume": float(k[5]),
-                    "close_time": k[6],
-                    "quote_volume": float(k[7]),
-                    "trades": k[8],
+                    "timestamp": int(idx.timestamp() * 1000),
+                    "open": row["open"],
+                    "high": row["high"],
+                    "low": row["low"],
+                    "close": row["close"],
+                    "volume": row["volume"],
+                    "quote_volume": row["value"],
                 })
             print(json.dumps(result, indent=2))
-        except BinanceAPIException as e:
-            print(json.dumps({"error": e.message}, indent=2))
+        except MarketDataError as e:
+            print(json.dumps({"error": str(e)}, indent=2))
             sys.exit(1)
     else:
         get_ohlcv(args.ticker, args.quote, args.interval, args.count)
@@ -5,30 +5,9 @@ import argparse
 import sys
 from pathlib import Path
 
-try:
-    from dotenv import load_dotenv
-except ImportError:
-    load_dotenv = None
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
 
-from binance.client import Client
-from binance.exceptions import BinanceAPIException
-
-
-def find_project_root() -> Path:
-    current = Path(__file__).resolve().parent
-    while current != current.parent:
-        if (current / ".git").exists() or (current / ".env").exists():
-            return current
-        current = current.parent
-    return Path.cwd()
-
-
-def load_env():
-    if load_dotenv:
-        project_root = find_project_root()
-        env_path = project_root / ".env"
-        if env_path.exists():
-            load_dotenv(env_path)
+from market_client import MarketDataError, market_call  # noqa: E402
 
 
 def format_number(num: float, decimals: int = 2) -> str:
@@ -46,14 +25,12 @@ def to_symbol(ticker: str, quote: str = "USDT") -> str:
 
 def get_orderbook(ticker: str, quote: str = "USDT", limit: int = 10) -> None:
     """호가창 조회"""
-    load_env()
-    client = Client()
     symbol = to_symbol(ticker, quote)
 
     try:
-        depth = client.get_order_book(symbol=symbol, limit=limit)
-    except BinanceAPIException as e:
-        print(f"Error: {e.message}", file=sys.stderr)
+        depth = market_call("binance", "get_order_book", symbol=symbol, limit=limit)
+    except MarketDataError as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
     asks = depth["asks"][:limit]  # 매도 호가 (낮은 가격 순)
@@ -102,14 +79,12 @@ def main():
     if args.json:
         import json
 
-        load_env()
-        client = Client()
         symbol = to_symbol(args.ticker, args.quote)
         try:
-            depth = client.get_order_book(symbol=symbol, limit=args.limit)
+            depth = market_call("binance", "get_order_book", symbol=symbol, limit=args.limit)
             print(json.dumps(depth, indent=2))
-        except BinanceAPIException as e:
-            print(json.dumps({"error": e.message}, indent=2))
+        except MarketDataError as e:
+            print(json.dumps({"error": str(e)}, indent=2))
             sys.exit(1)
     else:
         get_orderbook(args.ticker, args.quote, args.limit)
@@ -5,32 +5,9 @@ import argparse
 import sys
 from pathlib import Path
 
-try:
-    from dotenv import load_dotenv
-except ImportError:
-    load_dotenv = None
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
 
-from binance.client import Client
-from binance.exceptions import BinanceAPIException
-
-
-def find_project_root() -> Path:
-    """프로젝트 루트 찾기 (.git 또는 .env 기준)"""
-    current = Path(__file__).resolve().parent
-    while current != current.parent:
-        if (current / ".git").exists() or (current / ".env").exists():
-            return current
-        current = current.parent
-    return Path.cwd()
-
-
-def load_env():
-    """프로젝트 루트의 .env 파일 로드"""
-    if load_dotenv:
-        project_root = find_project_root()
-        env_path = project_root / ".env"
-        if env_path.exists():
-            load_dotenv(env_path)
+from market_client import MarketDataError, market_call  # noqa: E402
 
 
 def format_number(num: float, decimals: int = 2) -> str:
@@ -51,14 +28,11 @@ def to_symbol(ticker: str, quote: str = "USDT") -> str:
 
 def get_ticker(symbols: list[str], quote: str = "USDT") -> None:
     """현재가 조회"""
-    load_env()
-    client = Client()  # 공개 API는 키 불필요
-
     for ticker in symbols:
         symbol = to_symbol(ticker, quote)
         try:
             # 24시간 티커 정보
-            ticker_24h = client.get_ticker(symbol=symbol)
+            ticker_24h = market_call("binance", "get_ticker", symbol=symbol)
 
             current_price = float(ticker_24h["lastPrice"])
             price_change = float(ticker_24h["priceChange"])
@@ -78,8 +52,8 @@ def get_ticker(symbols: list[str], quote: str = "USDT") -> None:
             print(f"   거래대금(24h): ${format_number(quote_volume)}")
             print()
 
-        except BinanceAPIException as e:
-            print(f"Error ({symbol}): {e.message}", file=sys.stderr)
+        except MarketDataError as e:
+            print(f"Error ({symbol}): {e}", file=sys.stderr)
         except Exception as e:
             print(f"Error ({symbol}): {e}", file=sys.stderr)
 
@@ -94,13 +68,11 @@ def main():
     if args.json:
         import json
 
-        load_env()
-        client = Client()
         results = []
         for ticker in args.symbols:
             symbol = to_symbol(ticker, args.quote)
             try:
-                ticker_24h = client.get_ticker(symbol=symbol)
+                ticker_24h = market_call("binance", "get_ticker", symbol=symbol)
                 results.append(ticker_24h)
             except Exception as e:
                 results.append({"symbol": symbol, "error": str(e)})
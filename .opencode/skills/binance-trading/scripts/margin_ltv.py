@@ -13,6 +13,7 @@ except ImportError:
 
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
+from price_snapshot import STABLECOINS, PriceSnapshot
 
 
 def find_project_root() -> Path:
@@ -50,19 +51,13 @@ def get_binance_client() -> Client:
     return Client(api_key, secret_key)
 
 
-def get_asset_price(client: Client, symbol: str) -> float:
-    """자산의 USDT 가격 조회"""
-    if symbol in ["USDT", "USDC", "DAI", "BUSD", "TUSD", "FDUSD"]:
-        return 1.0
-    try:
-        ticker = client.get_symbol_ticker(symbol=f"{symbol}USDT")
-        return float(ticker["price"])
-    except Exception:
-        return 0.0
-
+def calculate_ltv(json_output: bool = False, stress: dict | None = None) -> None:
+    """마진 LTV 계산
 
-def calculate_ltv(json_output: bool = False) -> None:
-    """마진 LTV 계산"""
+    Args:
+        json_output: JSON 형식 출력
+        stress: 스트레스 테스트 옵션 (margin_stress.simulate 인자), None이면 생략
+    """
     client = get_binance_client()
 
     try:
@@ -71,6 +66,13 @@ def calculate_ltv(json_output: bool = False) -> None:
         print(f"Error: {e.message}", file=sys.stderr)
         sys.exit(1)
 
+    # 자산별 USDT 가격은 전체 시세 스냅샷 한 번으로 조회
+    try:
+        prices = PriceSnapshot.load()
+    except Exception as e:
+        print(f"Error: 시세 조회 실패: {e}", file=sys.stderr)
+        sys.exit(1)
+
     # 자산별 계산
     assets = []
     total_collateral = 0.0
@@ -88,7 +90,7 @@ def calculate_ltv(json_output: bool = False) -> None:
 
         if total_amount > 0 or borrowed > 0:
             symbol = asset["asset"]
-            price = get_asset_price(client, symbol)
+            price = prices.usdt(symbol)
 
             collateral_value = total_amount * price
             borrowed_value = borrowed * price
@@ -116,6 +118,12 @@ def calculate_ltv(json_output: bool = False) -> None:
     collateral_ratio = (total_collateral / total_debt * 100) if total_debt > 0 else float("inf")
     margin_level = float(account.get("marginLevel", 0))
 
+    stress_result = None
+    if stress is not None:
+        from margin_stress import run_stress
+
+        stress_result = run_stress(assets, STABLECOINS, **stress)
+
     if json_output:
         import json
 
@@ -131,6 +139,8 @@ def calculate_ltv(json_output: bool = False) -> None:
                 "margin_level": margin_level,
             },
         }
+        if stress_result is not None:
+            result["stress"] = stress_result
         print(json.dumps(result, indent=2, ensure_ascii=False))
         return
 
@@ -195,13 +205,34 @@ def calculate_ltv(json_output: bool = False) -> None:
                 print(f"  현재 BTC 가격: ${format_number(current_price)}")
                 print(f"  청산 예상가: ${format_number(liquidation_price)} ({drop_percent:.1f}% 하락 시)")
 
+    if stress_result is not None:
+        from margin_stress import print_stress
+
+        print_stress(stress_result)
+
 
 def main():
     parser = argparse.ArgumentParser(description="바이낸스 마진 LTV 계산")
     parser.add_argument("--json", action="store_true", help="JSON 형식 출력")
+    parser.add_argument("--stress", action="store_true", help="스트레스 테스트 (청산가, 청산 표면, 청산 확률)")
+    parser.add_argument("--scenarios", type=int, default=10_000, help="몬테카를로 시나리오 수 (기본: 10000)")
+    parser.add_argument("--horizon", type=float, default=7.0, help="시뮬레이션 기간 (일, 기본: 7)")
+    parser.add_argument("--vol", type=float, default=0.8, help="변동 자산 연변동성 (기본: 0.8)")
+    parser.add_argument("--corr", type=float, default=0.7, help="자산 간 상관계수 (기본: 0.7)")
+    parser.add_argument("--seed", type=int, help="난수 시드 (재현용)")
     args = parser.parse_args()
 
-    calculate_ltv(args.json)
+    stress = None
+    if args.stress:
+        stress = {
+            "scenarios": max(1, args.scenarios),
+            "horizon_days": args.horizon,
+            "annual_vol": args.vol,
+            "correlation": args.corr,
+            "seed": args.seed,
+        }
+
+    calculate_ltv(args.json, stress)
 
 
 if __name__ == "__main__":
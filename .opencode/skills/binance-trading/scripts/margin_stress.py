@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""바이낸스 마진 스트레스 테스트 - 전체 자산 벡터에 대한 가격 충격 시나리오
+
+margin_ltv.py --stress에서 사용한다. 모든 계산은 (시나리오 x 자산) 행렬 연산이라
+1만 시나리오 x 자산 수십 개도 수십 ms 안에 끝난다.
+
+Margin Level = 총 자산 가치 / (대출 원금 + 미지급 이자)
+- 청산: Margin Level 1.1 이하, 마진콜: 1.3 이하
+- 스테이블코인 가격은 고정, 나머지 자산은 충격을 받음
+
+계산 항목:
+- 자산별 청산가: 다른 자산 가격이 그대로일 때 해당 자산만 움직여 청산되는 가격
+- 시장 청산 충격: 모든 변동 자산이 같은 비율로 움직일 때 청산되는 변동률
+- 청산 표면: 상위 두 변동 자산 충격 격자별 Margin Level (나머지 자산은 가로축 충격을 따름)
+- 몬테카를로: 단일 팩터 상관 로그정규 충격으로 기간 내 청산/마진콜 확률과 Margin Level 분위수
+"""
+
+import time
+from typing import Optional
+
+import numpy as np
+
+LIQUIDATION_LEVEL = 1.1
+MARGIN_CALL_LEVEL = 1.3
+
+# 몬테카를로 기본값
+DEFAULT_SCENARIOS = 10_000
+DEFAULT_HORIZON_DAYS = 7.0
+DEFAULT_ANNUAL_VOL = 0.8
+DEFAULT_CORRELATION = 0.7
+
+# 청산 표면 충격 격자 (-90% ~ +50%, 10% 간격)
+SURFACE_SHOCKS = np.arange(-9, 6) / 10
+
+
+def margin_levels(collateral: np.ndarray, debt: np.ndarray, multipliers: np.ndarray) -> np.ndarray:
+    """가격 배수별 Margin Level
+
+    Args:
+        collateral: 자산별 보유 가치 (USDT, 길이 A)
+        debt: 자산별 대출+이자 가치 (USDT, 길이 A)
+        multipliers: 가격 배수 (..., A)
+
+    Returns:
+        Margin Level (...), 대출이 없으면 inf
+    """
+    asset_value = multipliers @ collateral
+    debt_value = multipliers @ debt
+    return np.divide(
+        asset_value,
+        debt_value,
+        out=np.full(np.shape(asset_value), np.inf),
+        where=debt_value > 0,
+    )
+
+
+def liquidation_prices(
+    collateral: np.ndarray, debt: np.ndarray, prices: np.ndarray, level: float = LIQUIDATION_LEVEL
+) -> np.ndarray:
+    """자산별 청산가 (해당 자산만 움직일 때), 해당 가격이 없으면 nan
+
+    (A + c_k (m - 1)) / (D + d_k (m - 1)) = level 을 가격 배수 m에 대해 푼다.
+    """
+    total_asset, total_debt = collateral.sum(), debt.sum()
+    slope = collateral - level * debt
+    # slope가 0인 자산은 multiplier가 inf/nan, 가격을 곱할 때도 경고가 나므로 마스킹까지 같은 블록에서
+    with np.errstate(divide="ignore", invalid="ignore"):
+        multiplier = 1 + (level * total_debt - total_asset) / slope
+        valid = (slope != 0) & (multiplier > 0) & (total_debt > 0)
+        return np.where(valid, prices * multiplier, np.nan)
+
+
+def market_liquidation_shock(
+    collateral: np.ndarray, debt: np.ndarray, risky: np.ndarray, level: float = LIQUIDATION_LEVEL
+) -> Optional[float]:
+    """모든 변동 자산이 같은 비율로 움직일 때 청산되는 변동률 (없으면 None)"""
+    stable_asset, risky_asset = collateral[~risky].sum(), collateral[risky].sum()
+    stable_debt, risky_debt = debt[~risky].sum(), debt[risky].sum()
+    slope = risky_asset - level * risky_debt
+    if stable_debt + risky_debt <= 0 or slope == 0:
+        return None
+    multiplier = (level * (stable_debt + risky_debt) - stable_asset - risky_asset) / slope + 1
+    return float(multiplier - 1) if multiplier > 0 else None
+
+
+def liquidation_surface(collateral: np.ndarray, debt: np.ndarray, risky: np.ndarray) -> Optional[dict]:
+    """상위 두 변동 자산 충격 격자별 Margin Level
+
+    가로축(x)은 순노출이 가장 큰 변동 자산과 나머지 변동 자산 전체, 세로축(y)은 두 번째 자산 충격.
+    변동 자산이 하나뿐이면 y축 없이 한 줄.
+    """
+    exposure = np.where(risky, np.abs(collateral - debt), -1.0)
+    order = [i for i in np.argsort(-exposure) if risky[i]]
+    if not order:
+        return None
+    x_index = order[0]
+    y_index = order[1] if len(order) > 1 else None
+
+    y_shocks = SURFACE_SHOCKS if y_index is not None else np.zeros(1)
+    # (y, x, A) 가격 배수
+    multipliers = np.ones((len(y_shocks), len(SURFACE_SHOCKS), len(collateral)))
+    multipliers[:, :, risky] = (1 + SURFACE_SHOCKS)[None, :, None]
+    if y_index is not None:
+        multipliers[:, :, y_index] = (1 + y_shocks)[:, None]
+    levels = margin_levels(collateral, debt, multipliers)
+
+    return {
+        "x_index": int(x_index),
+        "y_index": None if y_index is None else int(y_index),
+        "x_shocks": SURFACE_SHOCKS.tolist(),
+        "y_shocks": y_shocks.tolist() if y_index is not None else [],
+        "margin_levels": levels,
+    }
+
+
+def simulate(
+    collateral: np.ndarray,
+    debt: np.ndarray,
+    risky: np.ndarray,
+    scenarios: int = DEFAULT_SCENARIOS,
+    horizon_days: float = DEFAULT_HORIZON_DAYS,
+    annual_vol: float = DEFAULT_ANNUAL_VOL,
+    correlation: float = DEFAULT_CORRELATION,
+    seed: Optional[int] = None,
+) -> dict:
+    """단일 팩터 상관 로그정규 충격 몬테카를로
+
+    z_i = sqrt(rho) * M + sqrt(1 - rho) * e_i,  배수 = exp(sigma * sqrt(h) * z - sigma^2 * h / 2)
+    """
+    rng = np.random.default_rng(seed)
+    rho = min(max(correlation, 0.0), 1.0)
+    sigma = annual_vol * np.sqrt(horizon_days / 365)
+
+    market = rng.standard_normal((scenarios, 1))
+    idiosyncratic = rng.standard_normal((scenarios, len(collateral)))
+    z = np.sqrt(rho) * market + np.sqrt(1 - rho) * idiosyncratic
+    multipliers = np.where(risky, np.exp(sigma * z - sigma**2 / 2), 1.0)
+
+    levels = margin_levels(collateral, debt, multipliers)
+    finite = levels[np.isfinite(levels)]
+    quantiles = (
+        dict(zip(("p1", "p5", "p50"), np.percentile(finite, [1, 5, 50]).round(4).tolist()))
+        if finite.size
+        else {}
+    )
+    return {
+        "scenarios": scenarios,
+        "horizon_days": horizon_days,
+        "annual_vol": annual_vol,
+        "correlation": rho,
+        "liquidation_probability": float(np.mean(levels <= LIQUIDATION_LEVEL)),
+        "margin_call_probability": float(np.mean(levels <= MARGIN_CALL_LEVEL)),
+        "margin_level_quantiles": quantiles,
+    }
+
+
+def run_stress(assets: list[dict], stablecoins: set[str], **options) -> dict:
+    """margin_ltv.py 자산 목록으로 스트레스 테스트 실행
+
+    Args:
+        assets: {"symbol", "price", "collateral_value", "borrowed_value", "interest_value"} 목록
+        stablecoins: 가격이 고정된 자산
+        options: simulate() 인자 (scenarios, horizon_days, annual_vol, correlation, seed)
+    """
+    started_at = time.perf_counter()
+    symbols = [a["symbol"] for a in assets]
+    prices = np.array([a["price"] for a in assets], dtype=float)
+    collateral = np.array([a["collateral_value"] for a in assets], dtype=float)
+    debt = np.array([a["borrowed_value"] + a["interest_value"] for a in assets], dtype=float)
+    # 가격을 모르는 자산은 가치 0이므로 충격 대상에서도 제외
+    risky = np.array([s not in stablecoins for s in symbols]) & (prices > 0)
+
+    base_level = float(margin_levels(collateral, debt, np.ones(len(assets))))
+    liq_prices = liquidation_prices(collateral, debt, prices)
+    surface = liquidation_surface(collateral, debt, risky)
+    monte_carlo = simulate(collateral, debt, risky, **options)
+
+    result = {
+        "margin_level": base_level,
+        "liquidation_level": LIQUIDATION_LEVEL,
+        "margin_call_level": MARGIN_CALL_LEVEL,
+        "liquidation_prices": {
+            symbols[i]: {
+                "price": float(prices[i]),
+                "liquidation_price": float(liq_prices[i]),
+                "change": float(liq_prices[i] / prices[i] - 1),
+            }
+            for i in range(len(assets))
+            if risky[i] and np.isfinite(liq_prices[i])
+        },
+        "market_liquidation_shock": market_liquidation_shock(collateral, debt, risky),
+        "surface": None,
+        "monte_carlo": monte_carlo,
+    }
+    if surface is not None:
+        levels = surface.pop("margin_levels")
+        result["surface"] = {
+            "x_asset": symbols[surface["x_index"]],
+            "y_asset": None if surface["y_index"] is None else symbols[surface["y_index"]],
+            "x_shocks": surface["x_shocks"],
+            "y_shocks": surface["y_shocks"],
+            # JSON에 inf를 넣지 않도록 대출이 없으면 null
+            "margin_levels": [
+                [round(float(v), 4) if np.isfinite(v) else None for v in row] for row in levels
+            ],
+        }
+    if not np.isfinite(base_level):
+        result["margin_level"] = None
+    result["elapsed_ms"] = round((time.perf_counter() - started_at) * 1000, 2)
+    return result
+
+
+def print_stress(result: dict) -> None:
+    """스트레스 테스트 결과 출력"""
+    print("\n" + "━" * 60)
+    print("🧪 스트레스 테스트")
+
+    if result["margin_level"] is None:
+        print("  대출이 없어 청산 위험 없음")
+        return
+
+    print(f"  현재 Margin Level (스냅샷 시세 기준): {result['margin_level']:.3f}")
+
+    if result["liquidation_prices"]:
+        print("\n[자산별 청산가 (해당 자산만 움직일 때)]")
+        for symbol, info in result["liquidation_prices"].items():
+            print(
+                f"  {symbol:8}: ${info['price']:>12,.4f} → ${info['liquidation_price']:>12,.4f} "
+                f"({info['change'] * 100:+.1f}%)"
+            )
+
+    shock = result["market_liquidation_shock"]
+    if shock is not None:
+        print(f"\n[시장 전체 동반 변동] {shock * 100:+.1f}% 에서 청산")
+
+    surface = result["surface"]
+    if surface:
+        x_label = f"{surface['x_asset']}+기타"
+        print(f"\n[청산 표면] 가로: {x_label} 변동, 세로: {surface['y_asset'] or '-'} 변동")
+        print("  (✗ 청산 ≤1.1, ! 마진콜 ≤1.3, · 안전)")
+        print("         " + "".join(f"{x * 100:>5.0f}" for x in surface["x_shocks"]))
+        y_labels = surface["y_shocks"] or [None]
+        for y, row in zip(y_labels, surface["margin_levels"]):
+            label = f"{y * 100:>+5.0f}%" if y is not None else "     -"
+            cells = []
+            for level in row:
+                if level is None or level > MARGIN_CALL_LEVEL:
+                    cells.append("    ·")
+                elif level > LIQUIDATION_LEVEL:
+                    cells.append("    !")
+                else:
+                    cells.append("    ✗")
+            print(f"  {label} " + "".join(cells))
+
+    mc = result["monte_carlo"]
+    print(
+        f"\n[몬테카를로] {mc['scenarios']:,}개 시나리오, {mc['horizon_days']:g}일, "
+        f"연변동성 {mc['annual_vol'] * 100:.0f}%, 상관 {mc['correlation']:.2f}"
+    )
+    print(f"  청산 확률: {mc['liquidation_probability'] * 100:.2f}%")
+    print(f"  마진콜 확률: {mc['margin_call_probability'] * 100:.2f}%")
+    quantiles = mc["margin_level_quantiles"]
+    if quantiles:
+        print(
+            f"  Margin Level 분위수: 1% {quantiles['p1']:.3f} / 5% {quantiles['p5']:.3f} / 50% {quantiles['p50']:.3f}"
+        )
+    print(f"\n  계산 시간: {result['elapsed_ms']:.1f}ms")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""바이낸스 전체 시세 스냅샷 - 자산별 USDT 환산 가격
+
+잔고/LTV 스크립트가 자산마다 get_symbol_ticker를 호출하지 않도록
+get_all_tickers 한 번(/api/v3/ticker/price)으로 전 심볼 가격을 받아 두고 조회한다.
+market-data 데몬이 떠 있으면 데몬 캐시의 스냅샷을 그대로 쓴다.
+
+- 스테이블코인은 1 USDT
+- {자산}USDT가 없으면 USDT{자산} 역수, 그다음 BTC/ETH/BNB 등 중개 자산 교차 환산
+- Simple Earn 자산(LDBTC 등)은 원래 자산 가격 사용
+
+사용법 (같은 디렉토리의 스크립트에서):
+    from price_snapshot import PriceSnapshot
+
+    prices = PriceSnapshot.load()
+    prices.usdt("BTC")   # 가격을 모르면 0.0
+"""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
+
+from market_client import market_call  # noqa: E402
+
+STABLECOINS = {"USDT", "USDC", "DAI", "BUSD", "TUSD", "FDUSD"}
+# 교차 환산에 쓸 중개 자산 (앞쪽 우선)
+BRIDGE_ASSETS = ("BTC", "ETH", "BNB", "FDUSD", "USDC")
+
+
+class PriceSnapshot:
+    """심볼 → 가격 스냅샷과 USDT 환산"""
+
+    def __init__(self, prices: dict[str, float]):
+        self.prices = prices
+        self._resolved: dict[str, Optional[float]] = {}
+
+    @classmethod
+    def load(cls) -> "PriceSnapshot":
+        """전체 심볼 가격 조회 (요청 한 번)"""
+        tickers = market_call("binance", "get_all_tickers") or []
+        return cls({t["symbol"]: float(t["price"]) for t in tickers if float(t["price"]) > 0})
+
+    def _direct(self, asset: str) -> Optional[float]:
+        if asset in STABLECOINS:
+            return 1.0
+        if f"{asset}USDT" in self.prices:
+            return self.prices[f"{asset}USDT"]
+        if f"USDT{asset}" in self.prices:
+            return 1.0 / self.prices[f"USDT{asset}"]
+        return None
+
+    def price(self, asset: str) -> Optional[float]:
+        """자산의 USDT 가격 (환산 경로가 없으면 None)"""
+        asset = asset.upper()
+        if asset in self._resolved:
+            return self._resolved[asset]
+
+        price = self._direct(asset)
+        if price is None:
+            for bridge in BRIDGE_ASSETS:
+                bridge_price = self._direct(bridge)
+                if bridge == asset or bridge_price is None:
+                    continue
+                if f"{asset}{bridge}" in self.prices:
+                    price = self.prices[f"{asset}{bridge}"] * bridge_price
+                    break
+                if f"{bridge}{asset}" in self.prices:
+                    price = bridge_price / self.prices[f"{bridge}{asset}"]
+                    break
+        if price is None and asset.startswith("LD") and len(asset) > 2:
+            price = self.price(asset[2:])
+
+        self._resolved[asset] = price
+        return price
+
+    def usdt(self, asset: str) -> float:
+        """자산의 USDT 가격 (모르면 0.0)"""
+        return self.price(asset) or 0.0
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+일일 요약용 사전 요약 (map-reduce, 토큰 예산)
+
+하루치 메시지가 에이전트가 한 번에 읽을 수 있는 양을 넘으면 요약이 느려지고 뒤쪽이 잘린다.
+메시지 저장소(telegram-collector)에서 읽은 메시지를 채널별 · 시간 구간별로 나누고,
+구간을 토큰 예산에 맞는 조각으로 잘라 조각마다 중간 요약(digest)을 만든다.
+
+- map: 조각별 요약을 --parallel개까지 동시에 생성. 서버(app.main)가 실행 중이면 워커 풀(/workers/run)에서
+  실행해 전체 opencode 프로세스 수가 OPENCODE_WORKERS를 넘지 않고, 없으면 `opencode run`을 직접 실행
+- reduce: 중간 요약 합계가 --budget을 넘으면 이웃한 요약끼리 묶어 다시 요약 (예산 안에 들 때까지)
+- 캐시: 조각 본문 해시 → 요약 (.cache/presummary). 시간 구간은 시계 기준으로 고정되므로
+  다시 실행하면 새 메시지가 들어온 조각만 다시 요약한다
+
+사용법:
+    uv run python .opencode/skills/daily-summary/scripts/presummarize.py --hours 24
+    uv run python .opencode/skills/daily-summary/scripts/presummarize.py --budget 12000 --parallel 4
+    uv run python .opencode/skills/daily-summary/scripts/presummarize.py --dry-run
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+COLLECTOR_DIR = Path(__file__).resolve().parents[2] / "telegram-collector" / "scripts"
+sys.path.insert(0, str(COLLECTOR_DIR))
+
+from dedup import deduplicate  # noqa: E402
+from message_store import MessageStore, default_db_path  # noqa: E402
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+DEFAULT_MODEL = "zai-coding-plan/glm-4.7"
+DEFAULT_CACHE_DIR = ".cache/presummary"
+
+# 워커 풀 주소
+DEFAULT_WORKERS_URL = "http://127.0.0.1:8000/workers"
+
+# 풀에서 워커를 기다릴 수 있는 시간 (초, 실행 타임아웃에 더함)
+POOL_WAIT = 600
+
+# 직접 실행으로 넘겨도 되는 풀 응답 (local_only 거부, 엔드포인트 없음, 워커 하나뿐)
+DIRECT_STATUSES = {403, 404, 503}
+
+# 프롬프트를 바꾸면 올려서 기존 캐시를 무효화
+PROMPT_VERSION = 1
+
+MAP_PROMPT = """[사전 요약 작업] 도구를 사용하지 말고 아래 텔레그램 메시지만 읽고 요약해라.
+
+채널: {chat}
+구간: {window}
+
+- 시장 동향, 주요 뉴스, 투자 정보(실적/수주/공시), 주의할 사항 위주로 bullet 최대 {bullets}개
+- 각 bullet 앞에 시각(HH:MM)을 붙이고 종목명, 숫자, 단위는 원문 그대로
+- 중요하지 않은 잡담은 버림
+- 요약만 출력
+
+메시지:
+{body}
+"""
+
+REDUCE_PROMPT = """[사전 요약 작업] 도구를 사용하지 말고 아래 중간 요약들을 하나로 합쳐라.
+
+- 같은 사건은 하나로 합치고 출처 채널을 괄호로 남김
+- 중요도 순으로 bullet 최대 {bullets}개, 종목명, 숫자, 단위는 원문 그대로
+- 요약만 출력
+
+중간 요약:
+{body}
+"""
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+_HANGUL_RE = re.compile("[가-힣ㄱ-ㅎㅏ-ㅣ一-鿿]")
+
+
+def find_project_root() -> Path:
+    """프로젝트 루트 찾기 (.git 또는 .env 기준)"""
+    current = Path(__file__).resolve().parent
+    while current != current.parent:
+        if (current / ".git").exists() or (current / ".env").exists():
+            return current
+        current = current.parent
+    return Path.cwd()
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (한글/한자는 글자당 1, 그 외 4글자당 1)"""
+    cjk = len(_HANGUL_RE.findall(text))
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+def format_message(msg: dict) -> str:
+    """조각에 넣을 한 줄 (시각, 발신자, 본문)"""
+    time_str = datetime.fromisoformat(msg["date"]).astimezone().strftime("%H:%M")
+    text = " ".join((msg["text"] or "[미디어]").split())
+    if msg.get("duplicate_count"):
+        text += f" (중복 {msg['duplicate_count']}건)"
+    return f"[{time_str}] {msg['sender_name']}: {text}"
+
+
+def window_start(value: datetime, window_hours: int) -> datetime:
+    """value가 속한 시간 구간의 시작 (로컬 자정 기준으로 window_hours 단위)"""
+    local = value.astimezone()
+    midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    hours = (local - midnight) // timedelta(hours=window_hours) * window_hours
+    return midnight + timedelta(hours=hours)
+
+
+def build_chunks(messages: list[dict], window_hours: int, chunk_tokens: int) -> list[dict]:
+    """
+    채널별 → 시간 구간별 → 토큰 예산별 조각
+
+    구간 안에서는 앞에서부터 채우므로 새 메시지는 마지막 조각만 바꾼다.
+
+    Returns:
+        [{"chat", "window", "lines", "tokens"}] (채널, 시간순)
+    """
+    groups: dict[tuple[str, datetime], list[str]] = {}
+    for msg in sorted(messages, key=lambda m: (m["chat_name"] or "", m["date"])):
+        start = window_start(datetime.fromisoformat(msg["date"]), window_hours)
+        groups.setdefault((msg["chat_name"] or str(msg["chat_id"]), start), []).append(format_message(msg))
+
+    chunks = []
+    for (chat, start), lines in groups.items():
+        end = start + timedelta(hours=window_hours)
+        window = f"{start.strftime('%m/%d %H:%M')}~{end.strftime('%H:%M')}"
+        current: list[str] = []
+        tokens = 0
+        for line in lines:
+            line_tokens = estimate_tokens(line)
+            if current and tokens + line_tokens > chunk_tokens:
+                chunks.append({"chat": chat, "window": window, "lines": current, "tokens": tokens})
+                current, tokens = [], 0
+            current.append(line)
+            tokens += line_tokens
+        if current:
+            chunks.append({"chat": chat, "window": window, "lines": current, "tokens": tokens})
+    return chunks
+
+
+class Summarizer:
+    """워커 풀 또는 `opencode run`으로 요약 (본문 해시 캐시, 동시 실행 상한)"""
+
+    def __init__(
+        self,
+        model: str,
+        cache_dir: Path,
+        parallel: int,
+        timeout: float,
+        project_root: Path,
+        pool_url: str | None = None,
+    ):
+        self.model = model
+        self.cache_dir = cache_dir
+        self.semaphore = asyncio.Semaphore(max(1, parallel))
+        self.timeout = timeout
+        self.project_root = project_root
+        self.pool_url = pool_url if httpx else None
+        self.cache_hits = 0
+        self.calls = 0
+        self.failures = 0
+        self.direct_calls = 0
+
+    def _cache_path(self, prompt: str) -> Path:
+        key = hashlib.sha256(f"{PROMPT_VERSION}\0{self.model}\0{prompt}".encode("utf-8")).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}.md"
+
+    async def _run_pooled(self, prompt: str) -> dict | None:
+        """워커 풀에서 실행. 풀을 쓸 수 없으면 None (이후 호출은 바로 직접 실행)"""
+        timeout = httpx.Timeout(self.timeout + POOL_WAIT, connect=1.0)
+        try:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                response = await client.post(
+                    f"{self.pool_url}/run",
+                    json={"prompt": prompt, "model": self.model, "timeout": self.timeout},
+                )
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            self.pool_url = None
+            return None
+        except httpx.HTTPError as e:
+            # 요청이 풀에 들어간 뒤의 실패는 직접 다시 실행하지 않음 (같은 요약을 두 번 돌리지 않도록)
+            return {"ok": False, "stdout": "", "stderr": f"워커 풀 응답 없음 ({e})", "timed_out": False}
+
+        if response.status_code in DIRECT_STATUSES:
+            print(f"Warning: 워커 풀 사용 불가 (HTTP {response.status_code}), opencode run 직접 실행", file=sys.stderr)
+            self.pool_url = None
+            return None
+        try:
+            result = response.json()
+        except ValueError:
+            result = None
+        if response.status_code != 200 or not isinstance(result, dict):
+            return {"ok": False, "stdout": "", "stderr": f"워커 풀 오류 (HTTP {response.status_code})", "timed_out": False}
+        return result
+
+    async def _run_direct(self, prompt: str) -> dict:
+        """`opencode run` 직접 실행 (서버가 없을 때)"""
+        self.direct_calls += 1
+        process = await asyncio.create_subprocess_exec(
+            "opencode", "run", "-m", self.model, prompt,
+            cwd=str(self.project_root),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return {"ok": False, "stdout": "", "stderr": "", "timed_out": True}
+        return {
+            "ok": process.returncode == 0,
+            "stdout": stdout.decode(errors="replace"),
+            "stderr": stderr.decode(errors="replace"),
+            "timed_out": False,
+        }
+
+    async def summarize(self, prompt: str) -> str | None:
+        """요약 결과 (실패하면 None, 캐시하지 않음)"""
+        path = self._cache_path(prompt)
+        if path.exists():
+            self.cache_hits += 1
+            return path.read_text(encoding="utf-8")
+
+        async with self.semaphore:
+            self.calls += 1
+            result = await self._run_pooled(prompt) if self.pool_url else None
+            if result is None:
+                result = await self._run_direct(prompt)
+
+        if result.get("timed_out"):
+            print(f"Warning: 요약 타임아웃 ({self.timeout:.0f}초)", file=sys.stderr)
+            self.failures += 1
+            return None
+        summary = _ANSI_RE.sub("", result.get("stdout") or "").strip()
+        if not result.get("ok") or not summary:
+            print(f"Warning: 요약 실패: {(result.get('stderr') or '')[:200]}", file=sys.stderr)
+            self.failures += 1
+            return None
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(summary, encoding="utf-8")
+        os.replace(tmp_path, path)
+        return summary
+
+
+def _truncate(lines: list[str], tokens: int) -> str:
+    """요약 실패시 대신 넣을 원문 앞부분"""
+    kept, used = [], 0
+    for line in lines:
+        used += estimate_tokens(line)
+        if used > tokens:
+            kept.append(f"... (이하 {len(lines) - len(kept)}개 생략)")
+            break
+        kept.append(line)
+    return "\n".join(kept)
+
+
+async def map_chunks(summarizer: Summarizer, chunks: list[dict], bullets: int) -> list[dict]:
+    """조각별 중간 요약 → [{"title", "text"}]"""
+
+    async def one(chunk: dict) -> dict:
+        prompt = MAP_PROMPT.format(
+            chat=chunk["chat"], window=chunk["window"], bullets=bullets, body="\n".join(chunk["lines"])
+        )
+        summary = await summarizer.summarize(prompt)
+        if summary is None:
+            summary = "[요약 실패, 원문 일부]\n" + _truncate(chunk["lines"], bullets * 60)
+        return {"title": f"{chunk['chat']} ({chunk['window']}, {len(chunk['lines'])}개)", "text": summary}
+
+    return await asyncio.gather(*(one(chunk) for chunk in chunks))
+
+
+async def reduce_digests(
+    summarizer: Summarizer,
+    digests: list[dict],
+    budget: int,
+    chunk_tokens: int,
+    bullets: int,
+    max_levels: int = 3,
+) -> tuple[list[dict], int]:
+    """합계가 예산을 넘으면 이웃한 요약끼리 묶어 다시 요약. (요약 목록, 거친 단계 수) 반환"""
+    level = 0
+    while level < max_levels and len(digests) > 1:
+        if sum(estimate_tokens(d["text"]) for d in digests) <= budget:
+            break
+
+        groups: list[list[dict]] = [[]]
+        tokens = 0
+        for digest in digests:
+            digest_tokens = estimate_tokens(digest["text"])
+            if groups[-1] and tokens + digest_tokens > chunk_tokens:
+                groups.append([])
+                tokens = 0
+            groups[-1].append(digest)
+            tokens += digest_tokens
+        if len(groups) == len(digests):
+            # 요약 하나가 조각 예산보다 커서 더 묶을 수 없음
+            break
+
+        async def one(group: list[dict]) -> dict:
+            if len(group) == 1:
+                return group[0]
+            body = "\n\n".join(f"### {d['title']}\n{d['text']}" for d in group)
+            summary = await summarizer.summarize(REDUCE_PROMPT.format(bullets=bullets, body=body))
+            if summary is None:
+                return {"title": " / ".join(d["title"] for d in group), "text": body}
+            titles = list(dict.fromkeys(d["title"].split(" (")[0] for d in group))
+            return {"title": ", ".join(titles), "text": summary}
+
+        digests = await asyncio.gather(*(one(group) for group in groups))
+        level += 1
+    return digests, level
+
+
+def format_digest(digests: list[dict], hours: int, total: int, kept: int, levels: int) -> str:
+    lines = [
+        "# 사전 요약",
+        "",
+        f"- 생성 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"- 기간: 최근 {hours}시간",
+        f"- 원본 메시지: {total}개 (유사 중복 제외 {kept}개)",
+        f"- 요약 단계: map{' + reduce ' + str(levels) + '회' if levels else ''}",
+        "",
+        "---",
+        "",
+    ]
+    for digest in digests:
+        lines.append(f"## {digest['title']}")
+        lines.append("")
+        lines.append(digest["text"])
+        lines.append("")
+    return "\n".join(lines)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="일일 요약용 사전 요약 (map-reduce)")
+    parser.add_argument("--hours", type=int, default=24, help="요약할 시간 범위 (기본: 24)")
+    parser.add_argument("--window", type=int, default=6, help="시간 구간 크기(시간) (기본: 6)")
+    parser.add_argument("--chunk-tokens", type=int, default=6000, help="조각 하나의 토큰 예산 (기본: 6000)")
+    parser.add_argument("--budget", type=int, default=16000, help="최종 결과의 토큰 예산 (기본: 16000)")
+    parser.add_argument("--bullets", type=int, default=8, help="요약 하나의 최대 bullet 수 (기본: 8)")
+    parser.add_argument("--parallel", type=int, default=3, help="동시에 요약할 조각 수 (기본: 3, 서버가 있으면 워커 풀 크기로도 제한)")
+    parser.add_argument("--timeout", type=float, default=300, help="요약 하나의 타임아웃(초) (기본: 300)")
+    parser.add_argument("--model", type=str, default=None, help="모델 (기본: OPENCODE_MODEL)")
+    parser.add_argument("--db", type=str, default=None, help="메시지 저장소 경로")
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default=None,
+        help="출력 파일 경로 (기본: collected_messages/YYYY-MM-DD.digest.md)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="조각 계획만 출력 (요약하지 않음)")
+    args = parser.parse_args()
+
+    project_root = find_project_root()
+    if load_dotenv:
+        load_dotenv(project_root / ".env")
+
+    db_path = Path(args.db) if args.db else default_db_path(project_root)
+    if not db_path.exists():
+        print(f"Error: 메시지 저장소가 없습니다: {db_path}")
+        print("먼저 collect_messages.py로 메시지를 수집하세요.")
+        sys.exit(1)
+
+    # 첫 구간도 시계 기준으로 맞춰야 다시 실행했을 때 같은 조각이 나옴
+    since = window_start(datetime.now(timezone.utc) - timedelta(hours=args.hours), args.window)
+    with MessageStore(db_path) as store:
+        messages = store.query(since=since)
+    if not messages:
+        print("요약할 메시지가 없습니다.")
+        return
+
+    kept = deduplicate(messages)
+    chunks = build_chunks(kept, args.window, args.chunk_tokens)
+    total_tokens = sum(c["tokens"] for c in chunks)
+    print(f"메시지 {len(messages)}개 (중복 제외 {len(kept)}개), 약 {total_tokens:,} 토큰 → 조각 {len(chunks)}개")
+
+    if args.dry_run:
+        for chunk in chunks:
+            print(f"  {chunk['chat']} {chunk['window']}: {len(chunk['lines'])}개, 약 {chunk['tokens']:,} 토큰")
+        return
+
+    started_at = time.perf_counter()
+    summarizer = Summarizer(
+        model=args.model or os.environ.get("OPENCODE_MODEL", DEFAULT_MODEL),
+        cache_dir=project_root / DEFAULT_CACHE_DIR,
+        parallel=args.parallel,
+        timeout=args.timeout,
+        project_root=project_root,
+        pool_url=os.environ.get("WORKERS_URL", DEFAULT_WORKERS_URL).rstrip("/"),
+    )
+    digests = await map_chunks(summarizer, chunks, args.bullets)
+    digests, levels = await reduce_digests(summarizer, digests, args.budget, args.chunk_tokens, args.bullets)
+
+    if args.output:
+        output_path = Path(args.output)
+    else:
+        today = datetime.now().strftime("%Y-%m-%d")
+        output_path = project_root / "collected_messages" / f"{today}.digest.md"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(format_digest(digests, args.hours, len(messages), len(kept), levels), encoding="utf-8")
+
+    print(f"\n저장 완료: {output_path}")
+    print(
+        f"요약 {summarizer.calls}회 (직접 실행 {summarizer.direct_calls}회), 캐시 {summarizer.cache_hits}회, "
+        f"실패 {summarizer.failures}회 "
+        f"({time.perf_counter() - started_at:.1f}초)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -7,15 +7,17 @@ import tempfile
 from pathlib import Path
 
 try:
-    import pandas as pd
-    import pyupbit
     import mplfinance as mpf
     import matplotlib.pyplot as plt
 except ImportError as e:
     print(f"Error: {e}")
-    print("필요한 패키지: pip install mplfinance pandas matplotlib pyupbit")
+    print("필요한 패키지: pip install mplfinance matplotlib pandas")
     sys.exit(1)
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
+
+from indicators import get_indicators  # noqa: E402
+
 
 # 봉 간격 매핑
 INTERVAL_MAP = {
@@ -59,30 +61,6 @@ INTERVAL_DISPLAY = {
 }
 
 
-def calculate_macd(df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.DataFrame:
-    """MACD 계산"""
-    exp1 = df["close"].ewm(span=fast, adjust=False).mean()
-    exp2 = df["close"].ewm(span=slow, adjust=False).mean()
-    macd = exp1 - exp2
-    signal_line = macd.ewm(span=signal, adjust=False).mean()
-    histogram = macd - signal_line
-
-    return pd.DataFrame({
-        "MACD": macd,
-        "Signal": signal_line,
-        "Histogram": histogram,
-    }, index=df.index)
-
-
-def calculate_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    """RSI 계산"""
-    delta = df["close"].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
-
-
 def create_chart(
     symbol: str,
     interval: str = "1h",
@@ -118,24 +96,20 @@ def create_chart(
     if interval_key not in INTERVAL_MAP.values():
         raise ValueError(f"지원하지 않는 간격: {interval}")
 
-    # 지표 계산을 위해 필요한 추가 데이터 계산
-    extra_count = 0
-    if ma:
-        extra_count = max(extra_count, max(ma))
+    # 보조지표 (캔들 저장소 옆에 저장된 상태로 새 캔들만 증분 계산, 워밍업 캔들은 엔진이 확보)
+    specs = [f"sma:{period}" for period in ma or []]
     if macd:
-        extra_count = max(extra_count, 35)  # 26(slow) + 9(signal)
+        specs.append("macd:12:26:9")
     if rsi:
-        extra_count = max(extra_count, 14)
-
-    fetch_count = min(count + extra_count, 200)
+        specs.append("rsi:14")
 
-    # 캔들 데이터 조회
-    df_full = pyupbit.get_ohlcv(market, interval=interval_key, count=fetch_count)
-    if df_full is None or df_full.empty:
+    # 캔들 + 지표 조회 (로컬 캔들 저장소, 새 캔들만 업비트에서 받음)
+    df_full = get_indicators("upbit", market, interval_key, count, specs)
+    if df_full.empty:
         raise ValueError(f"{market} 캔들 데이터 조회 실패")
 
     # mplfinance용 컬럼명 변환
-    df_full = df_full.rename(columns={
+    df = df_full[["open", "high", "low", "close", "volume"]].rename(columns={
         "open": "Open",
         "high": "High",
         "low": "Low",
@@ -143,17 +117,16 @@ def create_chart(
         "volume": "Volume",
     })
 
-    # 추가 플롯 설정 (전체 데이터로 지표 계산 후 트리밍)
+    # 추가 플롯 설정
     add_plots = []
     panel_ratios = [3, 1] if volume else [3]  # 메인 차트, (거래량)
 
-    # 이동평균선 (전체 데이터로 계산 후 트리밍)
+    # 이동평균선
     if ma:
         colors = ["#FFA500", "#00BFFF", "#9370DB", "#32CD32", "#FF69B4"]  # orange, deep sky blue, purple, green, pink
         for i, period in enumerate(ma):
-            ma_data = df_full["Close"].rolling(window=period).mean().tail(count)
             add_plots.append(mpf.make_addplot(
-                ma_data,
+                df_full[f"sma:{period}"],
                 color=colors[i % len(colors)],
                 width=1,
                 label=f"MA{period}",
@@ -162,25 +135,25 @@ def create_chart(
     # 패널 인덱스 계산 (메인=0, 거래량=1 if volume else 없음)
     next_panel = 2 if volume else 1
 
-    # MACD (전체 데이터로 계산 후 트리밍)
+    # MACD
     if macd:
-        macd_df = calculate_macd(df_full.rename(columns={"Close": "close"})).tail(count)
         panel_ratios.append(1)
         add_plots.extend([
-            mpf.make_addplot(macd_df["MACD"], panel=next_panel, color="#2962FF", width=0.8, ylabel="MACD"),
-            mpf.make_addplot(macd_df["Signal"], panel=next_panel, color="#FF6D00", width=0.8),
-            mpf.make_addplot(macd_df["Histogram"], panel=next_panel, type="bar", color="#26A69A", alpha=0.5),
+            mpf.make_addplot(df_full["macd:12:26:9.macd"], panel=next_panel, color="#2962FF", width=0.8, ylabel="MACD"),
+            mpf.make_addplot(df_full["macd:12:26:9.signal"], panel=next_panel, color="#FF6D00", width=0.8),
+            mpf.make_addplot(
+                df_full["macd:12:26:9.histogram"], panel=next_panel, type="bar", color="#26A69A", alpha=0.5
+            ),
         ])
         next_panel += 1
 
-    # RSI (전체 데이터로 계산 후 트리밍)
+    # RSI (Wilder)
     if rsi:
-        rsi_data = calculate_rsi(df_full.rename(columns={"Close": "close"})).tail(count)
         panel_ratios.append(1)
         add_plots.extend([
-            mpf.make_addplot(rsi_data, panel=next_panel, color="#7C4DFF", width=1, ylabel="RSI"),
-            mpf.make_addplot([70] * count, panel=next_panel, color="#EF5350", linestyle="--", width=0.5),
-            mpf.make_addplot([30] * count, panel=next_panel, color="#26A69A", linestyle="--", width=0.5),
+            mpf.make_addplot(df_full["rsi:14"], panel=next_panel, color="#7C4DFF", width=1, ylabel="RSI"),
+            mpf.make_addplot([70] * len(df), panel=next_panel, color="#EF5350", linestyle="--", width=0.5),
+            mpf.make_addplot([30] * len(df), panel=next_panel, color="#26A69A", linestyle="--", width=0.5),
         ])
 
     # 수평선 (가격선)
@@ -190,15 +163,12 @@ def create_chart(
             color = line.get("color", "#FF9800")  # 기본 주황색
             if price:
                 add_plots.append(mpf.make_addplot(
-                    [price] * len(df_full.tail(count)),
+                    [price] * len(df),
                     color=color,
                     linestyle="--",
                     width=1.5,
                 ))
 
-    # 표시할 데이터만 자르기 (지표 계산 후)
-    df = df_full.tail(count)
-
     # 캔들 색상: 상승=빨강, 하락=파랑 (한국식)
     market_colors = mpf.make_marketcolors(
         up="#EF5350",      # 상승: 빨강
@@ -305,7 +275,7 @@ def main():
         "--count", "-c",
         type=int,
         default=30,
-        help="봉 개수 (기본: 30, 최대: 200)",
+        help="봉 개수 (기본: 30)",
     )
     parser.add_argument(
         "--ma",
@@ -343,11 +313,6 @@ def main():
 
     args = parser.parse_args()
 
-    # 봉 개수 제한
-    if args.count > 200:
-        args.count = 200
-        print("Warning: 최대 200개까지 조회 가능. 200개로 제한됨.", file=sys.stderr)
-
     # MA 파싱
     ma_periods = None
     if args.ma:
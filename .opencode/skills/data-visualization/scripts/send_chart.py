@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
-"""캔들차트 생성 후 텔레그램으로 전송하는 스크립트"""
+"""캔들차트 생성 후 텔레그램으로 전송하는 스크립트
+
+서버(app.main)가 실행 중이면 로컬 발신 큐(/outbox/sendPhoto)로 보내 속도 제한을 공유하고,
+없으면 Bot API로 직접 전송한다 (429 retry_after 준수).
+"""
 
 import argparse
 import os
@@ -21,6 +25,9 @@ def find_project_root() -> Path:
 
 PROJECT_ROOT = find_project_root()
 
+# 발신 큐/재시도 공용 모듈 (scripts/telegram_outbox.py)
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
 try:
     from dotenv import load_dotenv
     import requests
@@ -30,32 +37,45 @@ except ImportError as e:
 
 # 차트 생성 모듈 임포트
 from create_chart import create_chart, INTERVAL_DISPLAY, INTERVAL_MAP
+import telegram_outbox as outbox
+
+
+def send_via_outbox(chat_id: str, photo_path: Path, caption: str = None):
+    """로컬 발신 큐로 전송. 발신 큐를 쓸 수 없으면 None 반환"""
+    payload = {"chat_id": chat_id, "path": str(photo_path.resolve()), "caption": caption, "parse_mode": None}
+    result = outbox.send_via_outbox("sendPhoto", payload)
+    if result is None:
+        return None
+    if not result.get("ok"):
+        print(f"Error: {result.get('description', 'Unknown error')}")
+        return False
+    return True
 
 
 def send_photo(bot_token: str, chat_id: str, photo_path: str, caption: str = None) -> bool:
     """텔레그램 봇으로 이미지 전송"""
-    url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
-
     photo_file = Path(photo_path)
     if not photo_file.exists():
         print(f"Error: 파일을 찾을 수 없음: {photo_path}")
         return False
 
-    with open(photo_file, "rb") as f:
-        files = {"photo": f}
-        data = {"chat_id": chat_id}
+    result = send_via_outbox(chat_id, photo_file, caption)
+    if result is not None:
+        return result
 
-        if caption:
-            if len(caption) > 1024:
-                caption = caption[:1021] + "..."
-            data["caption"] = caption
+    url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
+    data = {"chat_id": chat_id}
+    if caption:
+        if len(caption) > 1024:
+            caption = caption[:1021] + "..."
+        data["caption"] = caption
 
-        response = requests.post(url, files=files, data=data)
-        result = response.json()
+    files = {"photo": (photo_file.name, photo_file.read_bytes())}
+    result = outbox.post_with_retry(url, timeout=60, data=data, files=files)
 
-        if not result.get("ok"):
-            print(f"Error: {result.get('description', 'Unknown error')}")
-            return False
+    if not result.get("ok"):
+        print(f"Error: {result.get('description', 'Unknown error')}")
+        return False
 
     return True
 
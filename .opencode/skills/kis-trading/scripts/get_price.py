@@ -2,33 +2,12 @@
 """한국투자증권 현재가 조회 스크립트"""
 
 import argparse
-import os
 import sys
 from pathlib import Path
 
-try:
-    from dotenv import load_dotenv
-except ImportError:
-    load_dotenv = None
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
 
-import mojito
-
-
-def find_project_root() -> Path:
-    current = Path(__file__).resolve().parent
-    while current != current.parent:
-        if (current / ".git").exists() or (current / ".env").exists():
-            return current
-        current = current.parent
-    return Path.cwd()
-
-
-def load_env():
-    if load_dotenv:
-        project_root = find_project_root()
-        env_path = project_root / ".env"
-        if env_path.exists():
-            load_dotenv(env_path)
+from market_client import market_call  # noqa: E402
 
 
 def format_number(num: float) -> str:
@@ -38,39 +17,13 @@ def format_number(num: float) -> str:
     return f"{num:.2f}"
 
 
-def get_kis_broker() -> mojito.KoreaInvestment:
-    """한투 브로커 객체 생성"""
-    load_env()
-
-    app_key = os.getenv("KIS_APP_KEY")
-    app_secret = os.getenv("KIS_APP_SECRET")
-    cano = os.getenv("KIS_CANO")
-    acnt_prdt_cd = os.getenv("KIS_ACNT_PRDT_CD")
-
-    if not app_key or not app_secret:
-        print("Error: KIS_APP_KEY, KIS_APP_SECRET 환경변수를 설정해주세요.", file=sys.stderr)
-        sys.exit(1)
-
-    if not cano or not acnt_prdt_cd:
-        print("Error: KIS_CANO, KIS_ACNT_PRDT_CD 환경변수를 설정해주세요.", file=sys.stderr)
-        sys.exit(1)
-
-    return mojito.KoreaInvestment(
-        api_key=app_key,
-        api_secret=app_secret,
-        acc_no=f"{cano}-{acnt_prdt_cd}",
-    )
-
-
 def get_price(codes: list[str]) -> None:
     """현재가 조회"""
-    broker = get_kis_broker()
-
     for code in codes:
         code = code.zfill(6)  # 6자리로 패딩
 
         try:
-            resp = broker.fetch_price(code)
+            resp = market_call("kis", "fetch_price", code)
 
             if resp.get("rt_cd") != "0":
                 print(f"Error ({code}): {resp.get('msg1', '조회 실패')}", file=sys.stderr)
@@ -119,12 +72,11 @@ def main():
     if args.json:
         import json
 
-        broker = get_kis_broker()
         results = []
         for code in args.codes:
             code = code.zfill(6)
             try:
-                resp = broker.fetch_price(code)
+                resp = market_call("kis", "fetch_price", code)
                 results.append({"code": code, "data": resp})
             except Exception as e:
                 results.append({"code": code, "error": str(e)})
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""로컬 캔들(OHLCV) 저장소 - (거래소, 심볼, 간격)별 SQLite 캐시
+
+차트/캔들 스크립트는 매번 거래소에서 전체 구간을 다시 받았다. 이 저장소는 받은 캔들을 보관해 두고
+마지막 저장 캔들 이후(진행 중인 마지막 캔들 포함)만 새로 받고, 저장분보다 긴 구간을 요청하면
+가장 오래된 캔들 앞쪽을 페이지 단위로 채운다. 거래소 호출은 market_call()을 거치므로 데몬 캐시도 그대로 쓴다.
+
+- 거래소 1회 조회 한도(업비트 200, 바이낸스 1000, 한투 100개)와 관계없이 원하는 개수만큼 조회
+- 여러 페이지가 필요하면 거래소별 동시 조회 수와 초당 요청 수 안에서 페이지를 동시에 받음
+
+- 시리즈마다 저장 구간(first_ts ~ last_ts)은 항상 연속 (뒤쪽 갱신, 앞쪽 채우기로만 늘어남)
+- 오래 쉬어 빠진 구간이 요청 개수 + 한 페이지보다 길면 빈 구간을 다 받지 않고 최근 구간으로 시리즈를 교체
+- 타임스탬프는 캔들 시작 시각 (UTC epoch ms)
+- 거래소가 더 오래된 캔들을 주지 않으면 complete로 표시하고 다시 요청하지 않음
+- 여러 스크립트 프로세스가 같은 파일을 써도 되도록 WAL 모드
+
+사용법 (다른 스킬 스크립트에서):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
+    from candle_store import get_candles
+
+    df = get_candles("upbit", "KRW-BTC", "day", 200)
+    df = get_candles("binance", "BTCUSDT", "1h", 500)
+    df = get_candles("kis", "005930", "D", 60)
+
+환경변수:
+    CANDLE_DB: 저장소 파일 (기본 <프로젝트 루트>/.cache/candles.db)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+
+from market_client import MarketDataError, find_project_root, market_call
+
+# 이 시간(초) 안에 갱신한 시리즈는 거래소를 다시 부르지 않음
+REFRESH_AGE = 10.0
+
+MINUTE = 60_000
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+KST = timezone(timedelta(hours=9))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    ts INTEGER NOT NULL,            -- 캔들 시작 시각 (UTC epoch ms)
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume REAL NOT NULL,
+    value REAL,                     -- 거래대금 (업비트/한투: 원, 바이낸스: quote 자산)
+    PRIMARY KEY (exchange, symbol, interval, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS candle_series (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    first_ts INTEGER NOT NULL,
+    last_ts INTEGER NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0,  -- 1이면 거래소에 더 오래된 캔들 없음
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (exchange, symbol, interval)
+);
+"""
+
+# (ts, open, high, low, close, volume, value)
+Candle = tuple[int, float, float, float, float, float, Optional[float]]
+
+
+# ===== 거래소별 페이지 조회 =====
+# fetch(symbol, interval, before, limit): before(ms) 이전 캔들 최대 limit개, 오래된 순
+# before가 None이면 최신 캔들부터
+
+
+def _fetch_upbit(symbol: str, interval: str, before: Optional[int], limit: int) -> list[Candle]:
+    kwargs = {"interval": interval, "count": limit}
+    if before is not None:
+        # 업비트 to는 해당 시각 미포함, UTC 기준
+        # (pyupbit는 시간대를 변환하지 않고 strftime만 하므로 UTC naive 문자열로 넘김)
+        kwargs["to"] = datetime.fromtimestamp(before / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    df = market_call("upbit", "get_ohlcv", symbol, **kwargs)
+    if df is None:
+        raise MarketDataError(f"{symbol} 캔들 조회 실패")
+    # pyupbit 인덱스는 KST 기준 naive datetime
+    index = df.index.tz_localize("Asia/Seoul")
+    return [
+        (int(ts.timestamp() * 1000), row.open, row.high, row.low, row.close, row.volume, row.value)
+        for ts, row in zip(index, df.itertuples())
+    ]
+
+
+def _fetch_binance(symbol: str, interval: str, before: Optional[int], limit: int) -> list[Candle]:
+    kwargs = {"symbol": symbol, "interval": interval, "limit": limit}
+    if before is not None:
+        kwargs["endTime"] = before - 1
+    klines = market_call("binance", "get_klines", **kwargs)
+    return [
+        (int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]), float(k[7]))
+        for k in klines
+    ]
+
+
+def _fetch_kis(symbol: str, interval: str, before: Optional[int], limit: int) -> list[Candle]:
+    end = datetime.now(KST) if before is None else datetime.fromtimestamp(before / 1000, KST) - timedelta(days=1)
+    resp = market_call(
+        "kis",
+        "fetch_ohlcv",
+        symbol=symbol,
+        timeframe=interval,
+        start_day="",
+        end_day=end.strftime("%Y%m%d"),
+        adj_price=True,
+    )
+    if resp.get("rt_cd") != "0":
+        raise MarketDataError(resp.get("msg1", "조회 실패"))
+
+    candles = []
+    for row in resp.get("output2") or []:
+        date = row.get("stck_bsop_date")
+        if not date:
+            continue
+        day = datetime.strptime(date, "%Y%m%d").replace(tzinfo=KST)
+        candles.append((
+            int(day.timestamp() * 1000),
+            float(row.get("stck_oprc") or 0),
+            float(row.get("stck_hgpr") or 0),
+            float(row.get("stck_lwpr") or 0),
+            float(row.get("stck_clpr") or 0),
+            float(row.get("acml_vol") or 0),
+            float(row.get("acml_tr_pbmn") or 0),
+        ))
+    candles.sort()
+    return candles[-limit:]
+
+
+class _RateLimiter:
+    """초당 요청 수 제한 (스레드 공용, 요청 시작 간격을 1/rate 이상으로)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+# 거래소별 조회 함수, 페이지 크기, 출력 시간대, 간격(ms, 주/월봉은 대략값)
+# 페이지 동시 조회 수와 초당 요청 수는 공개 API 제한보다 낮게
+# (업비트 캔들 10회/초, 바이낸스 6000 weight/분 - 1000개 klines 5 weight, 한투 실전 20회/초)
+SOURCES: dict[str, dict] = {
+    "upbit": {
+        "fetch": _fetch_upbit,
+        "page": 200,
+        "concurrency": 4,
+        "limiter": _RateLimiter(8),
+        "tz": "Asia/Seoul",
+        "intervals": {
+            "minute1": MINUTE,
+            "minute3": 3 * MINUTE,
+            "minute5": 5 * MINUTE,
+            "minute10": 10 * MINUTE,
+            "minute15": 15 * MINUTE,
+            "minute30": 30 * MINUTE,
+            "minute60": HOUR,
+            "minute240": 4 * HOUR,
+            "day": DAY,
+            "week": 7 * DAY,
+            "month": 30 * DAY,
+        },
+    },
+    "binance": {
+        "fetch": _fetch_binance,
+        "page": 1000,
+        "concurrency": 4,
+        "limiter": _RateLimiter(10),
+        "tz": "UTC",
+        "intervals": {
+            "1m": MINUTE,
+            "3m": 3 * MINUTE,
+            "5m": 5 * MINUTE,
+            "15m": 15 * MINUTE,
+            "30m": 30 * MINUTE,
+            "1h": HOUR,
+            "2h": 2 * HOUR,
+            "4h": 4 * HOUR,
+            "6h": 6 * HOUR,
+            "8h": 8 * HOUR,
+            "12h": 12 * HOUR,
+            "1d": DAY,
+            "3d": 3 * DAY,
+            "1w": 7 * DAY,
+            "1M": 30 * DAY,
+        },
+    },
+    "kis": {
+        "fetch": _fetch_kis,
+        "page": 100,
+        "concurrency": 2,
+        "limiter": _RateLimiter(5),
+        "tz": "Asia/Seoul",
+        # 일봉은 휴장일을 감안한 평균 거래일 간격
+        "intervals": {"D": DAY * 7 // 5, "W": 7 * DAY, "M": 30 * DAY},
+    },
+}
+
+
+def to_index(exchange: str, timestamps: list[int]) -> pd.DatetimeIndex:
+    """UTC epoch ms → 거래소 시간대 기준 naive datetime 인덱스"""
+    index = pd.to_datetime(timestamps, unit="ms", utc=True)
+    return index.tz_convert(SOURCES[exchange]["tz"]).tz_localize(None)
+
+
+def to_frame(exchange: str, candles: list[Candle]) -> pd.DataFrame:
+    """캔들 목록 → DataFrame (컬럼: open high low close volume value)"""
+    return pd.DataFrame(
+        [candle[1:] for candle in candles],
+        index=to_index(exchange, [candle[0] for candle in candles]),
+        columns=["open", "high", "low", "close", "volume", "value"],
+    )
+
+
+def default_path() -> Path:
+    path = os.environ.get("CANDLE_DB")
+    return Path(path) if path else find_project_root() / ".cache" / "candles.db"
+
+
+class CandleStore:
+    """SQLite 캔들 저장소"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else default_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def source(exchange: str, interval: str) -> dict:
+        source = SOURCES.get(exchange)
+        if source is None:
+            raise MarketDataError(f"지원하지 않는 거래소: {exchange}")
+        if interval not in source["intervals"]:
+            raise MarketDataError(f"지원하지 않는 간격: {exchange} {interval}")
+        return source
+
+    def series(self, exchange: str, symbol: str, interval: str) -> Optional[dict]:
+        """저장 구간 정보 (없으면 None)"""
+        row = self.conn.execute(
+            "SELECT first_ts, last_ts, complete, updated_at FROM candle_series "
+            "WHERE exchange = ? AND symbol = ? AND interval = ?",
+            (exchange, symbol, interval),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def count(self, exchange: str, symbol: str, interval: str) -> int:
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM candles WHERE exchange = ? AND symbol = ? AND interval = ?",
+            (exchange, symbol, interval),
+        ).fetchone()
+        return row[0]
+
+    def _save(
+        self,
+        key: tuple[str, str, str],
+        candles: list[Candle],
+        complete: Optional[bool] = None,
+        replace: bool = False,
+    ):
+        """캔들 저장 + 저장 구간 갱신 (한 트랜잭션, replace면 기존 시리즈를 지우고 저장)"""
+        now = time.time()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if replace:
+                for table in ("candles", "candle_series"):
+                    self.conn.execute(
+                        f"DELETE FROM {table} WHERE exchange = ? AND symbol = ? AND interval = ?", key
+                    )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO candles "
+                "(exchange, symbol, interval, ts, open, high, low, close, volume, value) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(*key, *candle) for candle in candles],
+            )
+            if candles:
+                self.conn.execute(
+                    "INSERT INTO candle_series (exchange, symbol, interval, first_ts, last_ts, complete, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, 0, ?) "
+                    "ON CONFLICT (exchange, symbol, interval) DO UPDATE SET "
+                    "first_ts = MIN(first_ts, excluded.first_ts), "
+                    "last_ts = MAX(last_ts, excluded.last_ts), "
+                    "updated_at = excluded.updated_at",
+                    (*key, candles[0][0], candles[-1][0], now),
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE candle_series SET updated_at = ? WHERE exchange = ? AND symbol = ? AND interval = ?",
+                    (now, *key),
+                )
+            if complete is not None:
+                self.conn.execute(
+                    "UPDATE candle_series SET complete = ? WHERE exchange = ? AND symbol = ? AND interval = ?",
+                    (int(complete), *key),
+                )
+
+    def _fetch_chain(
+        self, exchange: str, symbol: str, interval: str, before: Optional[int], pages: int, limit: int
+    ) -> tuple[list[Candle], bool]:
+        """before 이전 연속 구간을 pages개 페이지로 나눠 동시에 조회
+
+        페이지 경계는 간격 길이로 추정하고 한 캔들씩 겹치게 잡는다 (거래 없는 분봉, 휴장일, 월봉 길이 차이는
+        겹침으로 흡수). 앞 페이지와 이어지지 않는 페이지가 나오면 거기서 멈추고 이어진 부분만 돌려준다.
+
+        Returns:
+            (오래된 순 캔들, 거래소에 더 오래된 캔들이 없는지)
+        """
+        source = self.source(exchange, interval)
+        fetch: Callable = source["fetch"]
+        limiter: _RateLimiter = source["limiter"]
+        step = (limit - 1) * source["intervals"][interval]
+        start = before if before is not None else int(time.time() * 1000)
+        boundaries = [before] + [start - k * step for k in range(1, pages)]
+
+        def fetch_page(boundary: Optional[int]) -> list[Candle]:
+            limiter.wait()
+            return fetch(symbol, interval, boundary, limit)
+
+        if pages == 1:
+            results = [fetch_page(before)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(pages, source["concurrency"])) as pool:
+                futures = [pool.submit(fetch_page, boundary) for boundary in boundaries]
+                results = []
+                for k, future in enumerate(futures):
+                    try:
+                        results.append(future.result())
+                    except Exception:
+                        # 첫 페이지 실패는 그대로 에러, 이후 페이지는 이어진 부분까지만 사용
+                        if k == 0:
+                            for rest in futures:
+                                rest.cancel()
+                            raise
+                        break
+
+        chain: list[Candle] = []
+        exhausted = False
+        for k, page in enumerate(results):
+            candles = page
+            if boundaries[k] is not None:
+                candles = [c for c in page if c[0] < boundaries[k]]
+            # 이 페이지의 마지막 캔들이 앞 페이지 첫 캔들까지 닿아야 연속
+            if k > 0 and (not chain or boundaries[k] < chain[0][0]):
+                break
+            chain = [c for c in candles if not chain or c[0] < chain[0][0]] + chain
+            # 거래소가 limit개를 다 채우지 못했을 때만 끝 (경계 필터로 줄어든 것은 제외)
+            if len(page) < limit:
+                exhausted = True
+                break
+        return chain, exhausted
+
+    def refresh(self, exchange: str, symbol: str, interval: str, count: int, max_age: float = REFRESH_AGE):
+        """마지막 저장 캔들 이후만 조회 (처음이면 최근 count개)"""
+        source = self.source(exchange, interval)
+        page = source["page"]
+        key = (exchange, symbol, interval)
+        series = self.series(*key)
+
+        if series is not None:
+            if time.time() - series["updated_at"] < max_age:
+                return
+            # 빠진 개수 추정 (+ 진행 중이던 마지막 캔들 다시 받기)
+            missing = (int(time.time() * 1000) - series["last_ts"]) // source["intervals"][interval] + 2
+        else:
+            missing = None
+
+        if series is None or missing > count + page:
+            # 처음이거나 오래 쉬어 빈 구간이 길면 빈 구간 전체 대신 최근 count개만 받고 시리즈를 교체
+            # (저장 구간은 연속이어야 하므로 이전 캔들은 버리고, 앞쪽은 backfill이 필요한 만큼 채움)
+            limit = max(1, min(count, page))
+            candles, exhausted = self._fetch_chain(exchange, symbol, interval, None, 1, limit)
+            if not candles:
+                raise MarketDataError(f"{exchange} {symbol} {interval} 캔들 없음")
+            self._save(key, candles, complete=exhausted, replace=series is not None)
+            return
+
+        limit = max(2, min(missing, page))
+        pages = -(-missing // page)
+        before = None
+        candles: list[Candle] = []
+        while True:
+            chain, exhausted = self._fetch_chain(exchange, symbol, interval, before, pages, limit)
+            candles = [c for c in chain if not candles or c[0] < candles[0][0]] + candles
+            # 저장 구간과 겹치면 연속
+            if not chain or exhausted or chain[0][0] <= series["last_ts"]:
+                break
+            before = chain[0][0]
+            missing = (before - series["last_ts"]) // source["intervals"][interval] + 1
+            limit = page
+            pages = -(-missing // page)
+        # 저장 구간까지 닿지 못하면 저장하지 않음 (저장 구간에 빈틈이 생기지 않도록, 다음 갱신 때 다시 시도)
+        if candles and candles[0][0] > series["last_ts"]:
+            return
+        self._save(key, candles)
+
+    def backfill(self, exchange: str, symbol: str, interval: str, count: int):
+        """저장분이 count개보다 적으면 가장 오래된 캔들 앞쪽을 페이지 단위로 동시에 채움"""
+        page = self.source(exchange, interval)["page"]
+        key = (exchange, symbol, interval)
+
+        stored = self.count(*key)
+        series = self.series(*key)
+        while series and stored < count and not series["complete"]:
+            pages = -(-(count - stored) // (page - 1))
+            candles, exhausted = self._fetch_chain(exchange, symbol, interval, series["first_ts"], pages, page)
+            self._save(key, candles, complete=exhausted or None)
+            if not candles and not exhausted:
+                break
+            stored += len(candles)
+            series = self.series(*key)
+
+    def rows(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        count: Optional[int] = None,
+        after: Optional[int] = None,
+    ) -> list[Candle]:
+        """저장된 캔들 (오래된 순): 최근 count개, 또는 after(ms) 이후 전부"""
+        sql = (
+            "SELECT ts, open, high, low, close, volume, value FROM candles "
+            "WHERE exchange = ? AND symbol = ? AND interval = ?"
+        )
+        params: tuple = (exchange, symbol, interval)
+        if after is not None:
+            sql += " AND ts > ?"
+            params += (after,)
+        sql += " ORDER BY ts DESC"
+        if count is not None:
+            sql += " LIMIT ?"
+            params += (count,)
+        rows = [tuple(row) for row in self.conn.execute(sql, params).fetchall()]
+        rows.reverse()
+        return rows
+
+    def load(self, exchange: str, symbol: str, interval: str, count: int) -> pd.DataFrame:
+        """저장된 최근 count개 (오래된 순 DataFrame, 인덱스는 거래소 시간대 기준 naive datetime)"""
+        return to_frame(exchange, self.rows(exchange, symbol, interval, count))
+
+    def get(
+        self, exchange: str, symbol: str, interval: str, count: int, max_age: float = REFRESH_AGE
+    ) -> pd.DataFrame:
+        """최근 count개 캔들 (뒤쪽 갱신 + 필요하면 앞쪽 채우기)"""
+        self.refresh(exchange, symbol, interval, count, max_age)
+        self.backfill(exchange, symbol, interval, count)
+        return self.load(exchange, symbol, interval, count)
+
+
+def get_candles(
+    exchange: str, symbol: str, interval: str, count: int, max_age: float = REFRESH_AGE
+) -> pd.DataFrame:
+    """최근 count개 캔들 (오래된 순, 컬럼: open high low close volume value)
+
+    Raises:
+        MarketDataError: 지원하지 않는 거래소/간격, 거래소 에러
+    """
+    store = CandleStore()
+    try:
+        return store.get(exchange, symbol, interval, count, max_age)
+    finally:
+        store.close()
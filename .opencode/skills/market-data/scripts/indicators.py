@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""증분 보조지표 엔진 - 캔들 하나당 O(1) 갱신, 상태는 캔들 저장소 옆에 체크포인트
+
+차트/알림/분석이 매번 전체 구간을 pandas로 다시 계산하지 않도록, 지표마다 마지막 확정 캔들까지의
+상태와 캔들별 값을 candles.db(candle_store와 같은 파일)에 저장해 두고 새 캔들만 반영한다.
+
+- 지표: SMA, EMA, MACD, RSI(Wilder), 볼린저 밴드, ATR(Wilder)
+- 마지막 캔들은 진행 중일 수 있으므로 저장 상태에 반영하지 않고 복사본으로만 계산
+- 처음 계산하거나 저장된 값보다 앞 구간을 요청하면 워밍업 캔들을 포함해 처음부터 다시 계산
+  (워밍업 캔들 값은 수렴 전이므로 저장하지 않음)
+
+지표 표기 (spec):
+    sma:20  ema:20  rsi:14  macd:12:26:9  bb:20:2  atr:14  (숫자를 빼면 기본값)
+
+사용법:
+    uv run python .opencode/skills/market-data/scripts/indicators.py upbit KRW-BTC day --spec rsi --spec macd
+    uv run python .opencode/skills/market-data/scripts/indicators.py binance BTCUSDT 1h --spec bb:20:2 --count 5 --json
+
+    # 다른 스킬 스크립트에서
+    from indicators import get_indicators
+    df = get_indicators("upbit", "KRW-BTC", "day", 120, ["sma:20", "macd:12:26:9"])
+    df["sma:20"], df["macd:12:26:9.signal"]
+"""
+
+import argparse
+import copy
+import json
+import math
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pandas as pd  # noqa: E402
+
+from candle_store import Candle, CandleStore, to_frame  # noqa: E402
+from market_client import MarketDataError  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS indicator_state (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    first_ts INTEGER NOT NULL,      -- 값을 계산한 첫 캔들
+    ts INTEGER NOT NULL,            -- 상태에 반영된 마지막 확정 캔들
+    state TEXT NOT NULL,            -- JSON
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (exchange, symbol, interval, spec)
+);
+CREATE TABLE IF NOT EXISTS indicator_values (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    v1 REAL,
+    v2 REAL,
+    v3 REAL,
+    PRIMARY KEY (exchange, symbol, interval, spec, ts)
+) WITHOUT ROWID;
+"""
+
+Values = tuple[Optional[float], ...]
+
+# 저장 상태 형식/의미가 바뀌면 올림 (다른 버전 상태는 버리고 다시 계산)
+# 2: 워밍업 캔들 값을 저장하지 않고 first_ts를 수렴 이후 첫 캔들로
+STATE_VERSION = 2
+
+
+# ===== 지표 =====
+
+
+class _Rolling:
+    """고정 길이 구간의 평균/분산 (Welford 방식 추가/제거, period마다 다시 합산해 오차 누적 방지)"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window: deque[float] = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+
+    def push(self, x: float):
+        if len(self.window) == self.period:
+            old = self.window.popleft()
+            n = len(self.window)
+            if n:
+                delta = old - self.mean
+                self.mean -= delta / n
+                self.m2 -= delta * (old - self.mean)
+            else:
+                self.mean = self.m2 = 0.0
+        self.window.append(x)
+        n = len(self.window)
+        delta = x - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (x - self.mean)
+
+        self.updates += 1
+        if self.updates >= self.period:
+            self.updates = 0
+            self.mean = math.fsum(self.window) / n
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in self.window)
+
+    @property
+    def full(self) -> bool:
+        return len(self.window) == self.period
+
+    @property
+    def std(self) -> float:
+        """모표준편차 (볼린저 밴드 기준)"""
+        return math.sqrt(max(self.m2, 0.0) / len(self.window)) if self.window else 0.0
+
+    def to_state(self) -> dict:
+        return {"window": list(self.window), "updates": self.updates}
+
+    @classmethod
+    def from_state(cls, period: int, state: dict) -> "_Rolling":
+        rolling = cls(period)
+        rolling.window = deque(state["window"])
+        rolling.updates = state["updates"]
+        if rolling.window:
+            rolling.mean = math.fsum(rolling.window) / len(rolling.window)
+            rolling.m2 = math.fsum((v - rolling.mean) ** 2 for v in rolling.window)
+        return rolling
+
+
+class Indicator:
+    """증분 지표 기본형: update(candle)로 캔들 하나 반영하고 출력값 튜플 반환"""
+
+    kind = ""
+    outputs: tuple[str, ...] = ()
+    defaults: tuple[float, ...] = ()
+
+    def __init__(self, *params: float):
+        self.params = params
+
+    @property
+    def spec(self) -> str:
+        return ":".join([self.kind, *(f"{p:g}" for p in self.params)])
+
+    def warmup(self) -> int:
+        """첫 값이 안정되기까지 필요한 앞쪽 캔들 수"""
+        return int(self.params[0])
+
+    def update(self, candle: Candle) -> Values:
+        raise NotImplementedError
+
+    def to_state(self) -> dict:
+        return {k: v for k, v in vars(self).items() if k != "params"}
+
+    def load_state(self, state: dict):
+        vars(self).update(state)
+
+
+class SMA(Indicator):
+    kind = "sma"
+    outputs = ("sma",)
+    defaults = (20,)
+
+    def __init__(self, period: float = 20):
+        super().__init__(period)
+        self.rolling = _Rolling(int(period))
+
+    def update(self, candle: Candle) -> Values:
+        self.rolling.push(candle[4])
+        return (self.rolling.mean if self.rolling.full else None,)
+
+    def to_state(self) -> dict:
+        return self.rolling.to_state()
+
+    def load_state(self, state: dict):
+        self.rolling = _Rolling.from_state(int(self.params[0]), state)
+
+
+class EMA(Indicator):
+    """지수이동평균 (첫 값에서 시작, pandas ewm(adjust=False)와 같음)"""
+
+    kind = "ema"
+    outputs = ("ema",)
+    defaults = (20,)
+
+    def __init__(self, period: float = 20):
+        super().__init__(period)
+        self.alpha = 2 / (period + 1)
+        self.value: Optional[float] = None
+
+    def warmup(self) -> int:
+        return int(self.params[0]) * 4
+
+    def push(self, x: float) -> float:
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+    def update(self, candle: Candle) -> Values:
+        return (self.push(candle[4]),)
+
+
+class MACD(Indicator):
+    kind = "macd"
+    outputs = ("macd", "signal", "histogram")
+    defaults = (12, 26, 9)
+
+    def __init__(self, fast: float = 12, slow: float = 26, signal: float = 9):
+        super().__init__(fast, slow, signal)
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def warmup(self) -> int:
+        return int(self.params[1]) * 4 + int(self.params[2])
+
+    def update(self, candle: Candle) -> Values:
+        macd = self.fast.push(candle[4]) - self.slow.push(candle[4])
+        signal = self.signal.push(macd)
+        return (macd, signal, macd - signal)
+
+    def to_state(self) -> dict:
+        return {"fast": self.fast.value, "slow": self.slow.value, "signal": self.signal.value}
+
+    def load_state(self, state: dict):
+        self.fast.value, self.slow.value, self.signal.value = state["fast"], state["slow"], state["signal"]
+
+
+class RSI(Indicator):
+    """RSI (Wilder 평활: 첫 평균은 단순평균, 이후 (이전 * (n-1) + 현재) / n)"""
+
+    kind = "rsi"
+    outputs = ("rsi",)
+    defaults = (14,)
+
+    def __init__(self, period: float = 14):
+        super().__init__(period)
+        self.prev_close: Optional[float] = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.count = 0
+
+    def warmup(self) -> int:
+        # Wilder 평활(1/n)은 EMA(2/(n+1))보다 절반 느리게 잊으므로 EMA 4배와 같은 수렴에 8배
+        return int(self.params[0]) * 8
+
+    def update(self, candle: Candle) -> Values:
+        close, period = candle[4], int(self.params[0])
+        if self.prev_close is None:
+            self.prev_close = close
+            return (None,)
+        change = close - self.prev_close
+        self.prev_close = close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+
+        self.count += 1
+        if self.count <= period:
+            # 처음 period개는 단순평균 누적
+            self.avg_gain += (gain - self.avg_gain) / self.count
+            self.avg_loss += (loss - self.avg_loss) / self.count
+            if self.count < period:
+                return (None,)
+        else:
+            self.avg_gain = (self.avg_gain * (period - 1) + gain) / period
+            self.avg_loss = (self.avg_loss * (period - 1) + loss) / period
+
+        if self.avg_loss == 0:
+            return (100.0 if self.avg_gain > 0 else 50.0,)
+        return (100 - 100 / (1 + self.avg_gain / self.avg_loss),)
+
+
+class BollingerBands(Indicator):
+    kind = "bb"
+    outputs = ("middle", "upper", "lower")
+    defaults = (20, 2)
+
+    def __init__(self, period: float = 20, width: float = 2):
+        super().__init__(period, width)
+        self.rolling = _Rolling(int(period))
+
+    def update(self, candle: Candle) -> Values:
+        self.rolling.push(candle[4])
+        if not self.rolling.full:
+            return (None, None, None)
+        middle, band = self.rolling.mean, self.params[1] * self.rolling.std
+        return (middle, middle + band, middle - band)
+
+    def to_state(self) -> dict:
+        return self.rolling.to_state()
+
+    def load_state(self, state: dict):
+        self.rolling = _Rolling.from_state(int(self.params[0]), state)
+
+
+class ATR(Indicator):
+    """ATR (Wilder 평활)"""
+
+    kind = "atr"
+    outputs = ("atr",)
+    defaults = (14,)
+
+    def __init__(self, period: float = 14):
+        super().__init__(period)
+        self.prev_close: Optional[float] = None
+        self.value = 0.0
+        self.count = 0
+
+    def warmup(self) -> int:
+        return int(self.params[0]) * 8
+
+    def update(self, candle: Candle) -> Values:
+        high, low, close, period = candle[2], candle[3], candle[4], int(self.params[0])
+        if self.prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+
+        self.count += 1
+        if self.count <= period:
+            self.value += (true_range - self.value) / self.count
+            return (self.value if self.count == period else None,)
+        self.value = (self.value * (period - 1) + true_range) / period
+        return (self.value,)
+
+
+INDICATORS: dict[str, type[Indicator]] = {
+    cls.kind: cls for cls in (SMA, EMA, MACD, RSI, BollingerBands, ATR)
+}
+
+
+def parse_spec(spec: str) -> Indicator:
+    """"macd:12:26:9" → MACD(12, 26, 9) (숫자를 빼면 기본값)"""
+    kind, *params = spec.strip().lower().split(":")
+    cls = INDICATORS.get(kind)
+    if cls is None:
+        raise MarketDataError(f"지원하지 않는 지표: {kind} (가능: {', '.join(INDICATORS)})")
+    try:
+        values = [float(p) for p in params if p]
+    except ValueError:
+        raise MarketDataError(f"지표 파라미터 오류: {spec}")
+    if len(values) > len(cls.defaults) or any(v <= 0 for v in values):
+        raise MarketDataError(f"지표 파라미터 오류: {spec}")
+    return cls(*values, *cls.defaults[len(values):])
+
+
+def columns(indicator: Indicator) -> list[str]:
+    """출력 컬럼 이름 (출력이 하나면 spec, 여러 개면 spec.출력)"""
+    if len(indicator.outputs) == 1:
+        return [indicator.spec]
+    return [f"{indicator.spec}.{name}" for name in indicator.outputs]
+
+
+# ===== 엔진 =====
+
+
+class IndicatorEngine:
+    """캔들 저장소의 캔들로 지표를 증분 계산하고 상태/값을 같은 DB에 저장"""
+
+    def __init__(self, store: CandleStore):
+        self.store = store
+        self.conn = store.conn
+        self.conn.executescript(SCHEMA)
+
+    def _state(self, key: tuple[str, str, str], spec: str) -> Optional[dict]:
+        row = self.conn.execute(
+            "SELECT first_ts, ts, state FROM indicator_state "
+            "WHERE exchange = ? AND symbol = ? AND interval = ? AND spec = ?",
+            (*key, spec),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def _save(
+        self,
+        key: tuple[str, str, str],
+        indicator: Indicator,
+        first_ts: int,
+        ts: int,
+        values: list[tuple[int, Values]],
+        reset: bool,
+    ):
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if reset:
+                self.conn.execute(
+                    "DELETE FROM indicator_values WHERE exchange = ? AND symbol = ? AND interval = ? AND spec = ?",
+                    (*key, indicator.spec),
+                )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO indicator_values (exchange, symbol, interval, spec, ts, v1, v2, v3) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(*key, indicator.spec, t, *(list(v) + [None] * 3)[:3]) for t, v in values],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO indicator_state "
+                "(exchange, symbol, interval, spec, first_ts, ts, state, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    *key,
+                    indicator.spec,
+                    first_ts,
+                    ts,
+                    json.dumps({"version": STATE_VERSION, "state": indicator.to_state()}),
+                    time.time(),
+                ),
+            )
+
+    def _advance(
+        self, key: tuple[str, str, str], indicator: Indicator, count: int, window_start: int
+    ) -> Optional[Values]:
+        """저장 상태를 마지막 확정 캔들까지 진행하고, 마지막(진행 중일 수 있는) 캔들 값 반환"""
+        state = self._state(key, indicator.spec)
+        saved = json.loads(state["state"]) if state else {}
+        series = self.store.series(*key)
+        reset = (
+            state is None
+            or state["first_ts"] > window_start
+            or saved.get("version") != STATE_VERSION
+            # 캔들 저장소가 긴 공백 뒤 시리즈를 교체해 상태 이후 캔들이 이어지지 않음
+            or (series is not None and series["first_ts"] > state["ts"])
+        )
+        if reset:
+            # 처음부터: 창 앞쪽 워밍업 캔들 포함
+            candles = self.store.rows(*key, count=count + indicator.warmup())
+        else:
+            indicator.load_state(saved["state"])
+            candles = self.store.rows(*key, after=state["ts"])
+        if not candles:
+            return None
+
+        closed, last = candles[:-1], candles[-1]
+        values = [(candle[0], indicator.update(candle)) for candle in closed]
+        # 다시 계산할 때 앞쪽 워밍업 캔들 값은 수렴 전이므로 저장하지 않고, first_ts도 창 시작부터로 잡음
+        # (이후 워밍업 구간까지 넓힌 요청은 first_ts보다 앞이라 다시 계산)
+        skip = max(0, len(candles) - count) if reset else 0
+        if closed:
+            first_ts = candles[skip][0] if reset else state["first_ts"]
+            self._save(key, indicator, first_ts, closed[-1][0], values[skip:], reset)
+        # 진행 중 캔들은 복사본으로만 계산 (다음 갱신 때 덮어쓸 수 있도록)
+        return copy.deepcopy(indicator).update(last)
+
+    def frame(self, exchange: str, symbol: str, interval: str, count: int, specs: list[str]) -> pd.DataFrame:
+        """최근 count개 캔들 + 지표 컬럼 DataFrame"""
+        indicators = [parse_spec(spec) for spec in specs]
+        warmup = max((i.warmup() for i in indicators), default=0)
+        # 캔들 갱신 + 처음 계산할 때 쓸 워밍업 캔들까지 확보
+        self.store.refresh(exchange, symbol, interval, count + warmup)
+        self.store.backfill(exchange, symbol, interval, count + warmup)
+
+        key = (exchange, symbol, interval)
+        candles = self.store.rows(*key, count=count)
+        df = to_frame(exchange, candles)
+        if not candles:
+            return df
+
+        timestamps = [c[0] for c in candles]
+        for indicator in indicators:
+            last = self._advance(key, indicator, count, timestamps[0])
+            rows = self.conn.execute(
+                "SELECT ts, v1, v2, v3 FROM indicator_values "
+                "WHERE exchange = ? AND symbol = ? AND interval = ? AND spec = ? AND ts >= ?",
+                (*key, indicator.spec, timestamps[0]),
+            ).fetchall()
+            by_ts = {row["ts"]: tuple(row)[1:] for row in rows}
+            if last is not None:
+                by_ts[timestamps[-1]] = last
+            for i, column in enumerate(columns(indicator)):
+                df[column] = [
+                    float("nan") if by_ts.get(t) is None or by_ts[t][i] is None else by_ts[t][i]
+                    for t in timestamps
+                ]
+        return df
+
+
+def get_indicators(exchange: str, symbol: str, interval: str, count: int, specs: list[str]) -> pd.DataFrame:
+    """최근 count개 캔들과 지표 (컬럼: open high low close volume value + 지표)
+
+    Raises:
+        MarketDataError: 지원하지 않는 거래소/간격/지표, 거래소 에러
+    """
+    store = CandleStore()
+    try:
+        return IndicatorEngine(store).frame(exchange, symbol, interval, count, specs)
+    finally:
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="보조지표 조회 (캔들 저장소 + 증분 계산)")
+    parser.add_argument("exchange", choices=["upbit", "binance", "kis"], help="거래소")
+    parser.add_argument("symbol", help="심볼 (예: KRW-BTC, BTCUSDT, 005930)")
+    parser.add_argument("interval", help="간격 (업비트 day/minute60, 바이낸스 1d/1h, 한투 D/W/M)")
+    parser.add_argument(
+        "--spec",
+        "-s",
+        action="append",
+        help="지표 (여러 번 지정, 예: rsi:14 macd:12:26:9 bb:20:2, 기본: rsi macd)",
+    )
+    parser.add_argument("--count", "-c", type=int, default=1, help="출력할 최근 캔들 수 (기본: 1)")
+    parser.add_argument("--json", action="store_true", help="JSON 형식 출력")
+    args = parser.parse_args()
+
+    specs = args.spec or ["rsi", "macd"]
+    try:
+        df = get_indicators(args.exchange, args.symbol, args.interval, max(1, args.count), specs)
+    except MarketDataError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    df = df.drop(columns=["open", "high", "low", "value"])
+    if args.json:
+        df.index = df.index.strftime("%Y-%m-%d %H:%M:%S")
+        print(df.round(6).to_json(orient="index", indent=2))
+        return
+
+    print(f"📐 {args.symbol} {args.interval} 보조지표")
+    print("━" * 60)
+    for idx, row in df.iterrows():
+        print(idx.strftime("%Y-%m-%d %H:%M"))
+        for column, value in row.items():
+            print(f"   {column:24}: {value:,.4f}" if pd.notna(value) else f"   {column:24}: -")
+    print("━" * 60)
+
+
+if __name__ == "__main__":
+    main()
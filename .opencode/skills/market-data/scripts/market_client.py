@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+시세 조회 클라이언트 - market-data 데몬(marketd.py) 경유, 없으면 직접 호출
+
+업비트/바이낸스/한투 시세 스크립트는 매번 새 프로세스에서 거래소 클라이언트를 만들고
+같은 BTC 시세도 매번 다시 조회한다. 데몬이 떠 있으면 데몬의 warm 클라이언트와
+TTL 캐시를 쓰고, 데몬이 없으면 이 프로세스에서 같은 메서드를 직접 호출한다.
+
+- 허용한 조회 메서드만 사용 (잔고/주문 등 계정 API는 데몬을 거치지 않음)
+- pandas DataFrame 결과는 JSON으로 직렬화해 주고받음
+- 무거운 거래소 라이브러리는 직접 호출할 때만 import
+
+사용법 (다른 스킬 스크립트에서):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
+    from market_client import market_call
+
+    prices = market_call("upbit", "get_current_price", ["KRW-BTC", "KRW-ETH"])
+    df = market_call("upbit", "get_ohlcv", "KRW-BTC", interval="day", count=10)
+
+환경변수:
+    MARKETD_URL: 데몬 주소 (기본 http://127.0.0.1:8765, Unix 소켓은 unix:///경로)
+    MARKETD_DISABLE=true: 항상 직접 호출
+"""
+
+import http.client
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+# 데몬 연결 타임아웃 (초) - 데몬이 없으면 빨리 직접 호출로 넘어감
+CONNECT_TIMEOUT = 0.3
+# 데몬 응답 타임아웃 (초)
+REQUEST_TIMEOUT = 30.0
+
+# 거래소별 허용 메서드와 캐시 TTL (초)
+ENDPOINTS: dict[str, dict[str, float]] = {
+    "upbit": {
+        "get_current_price": 2,
+        "get_orderbook": 1,
+        "get_ohlcv": 10,
+        "get_tickers": 3600,
+    },
+    "binance": {
+        "get_ticker": 2,
+        "get_symbol_ticker": 2,
+        "get_all_tickers": 5,
+        "get_order_book": 1,
+        "get_klines": 10,
+        "get_exchange_info": 3600,
+    },
+    "kis": {
+        "fetch_price": 2,
+        "fetch_orderbook": 1,
+        "fetch_ohlcv": 30,
+    },
+}
+
+
+class MarketDataError(Exception):
+    """시세 조회 실패 (허용되지 않은 메서드, 거래소 에러)"""
+
+
+def find_project_root() -> Path:
+    """프로젝트 루트 찾기 (.git 또는 .env 기준)"""
+    current = Path(__file__).resolve().parent
+    while current != current.parent:
+        if (current / ".git").exists() or (current / ".env").exists():
+            return current
+        current = current.parent
+    return Path.cwd()
+
+
+def load_env():
+    """프로젝트 루트의 .env 파일 로드"""
+    if load_dotenv:
+        env_path = find_project_root() / ".env"
+        if env_path.exists():
+            load_dotenv(env_path)
+
+
+def ttl_for(exchange: str, method: str) -> float:
+    """허용된 메서드의 캐시 TTL (허용되지 않으면 MarketDataError)"""
+    ttl = ENDPOINTS.get(exchange, {}).get(method)
+    if ttl is None:
+        raise MarketDataError(f"허용되지 않은 시세 메서드: {exchange}.{method}")
+    return ttl
+
+
+# ===== 직렬화 (DataFrame ↔ JSON) =====
+
+def encode(value: Any) -> Any:
+    """JSON으로 보낼 수 있게 변환 (DataFrame은 index/columns/data 구조)"""
+    if hasattr(value, "to_dict") and hasattr(value, "columns") and hasattr(value, "index"):
+        index = [i.isoformat() if hasattr(i, "isoformat") else i for i in value.index]
+        return {
+            "__dataframe__": {
+                "index": index,
+                "index_name": value.index.name,
+                "columns": [str(c) for c in value.columns],
+                "data": json.loads(value.to_json(orient="values", double_precision=15)),
+            }
+        }
+    return value
+
+
+def decode(value: Any) -> Any:
+    """encode() 결과 복원"""
+    if isinstance(value, dict) and "__dataframe__" in value:
+        import pandas as pd
+
+        frame = value["__dataframe__"]
+        index = frame["index"]
+        if index and isinstance(index[0], str):
+            index = pd.to_datetime(index)
+        df = pd.DataFrame(frame["data"], index=index, columns=frame["columns"])
+        df.index.name = frame.get("index_name")
+        return df
+    return value
+
+
+# ===== 직접 호출 =====
+
+_clients: dict[str, Any] = {}
+
+
+def get_client(exchange: str) -> Any:
+    """거래소 클라이언트 (프로세스당 하나, 데몬에서는 계속 재사용)"""
+    client = _clients.get(exchange)
+    if client is not None:
+        return client
+
+    if exchange == "upbit":
+        import pyupbit
+
+        client = pyupbit
+    elif exchange == "binance":
+        from binance.client import Client
+
+        load_env()
+        client = Client()  # 공개 API는 키 불필요
+    elif exchange == "kis":
+        import mojito
+
+        load_env()
+        app_key = os.getenv("KIS_APP_KEY")
+        app_secret = os.getenv("KIS_APP_SECRET")
+        cano = os.getenv("KIS_CANO")
+        acnt_prdt_cd = os.getenv("KIS_ACNT_PRDT_CD")
+        if not app_key or not app_secret:
+            raise MarketDataError("KIS_APP_KEY, KIS_APP_SECRET 환경변수를 설정해주세요.")
+        if not cano or not acnt_prdt_cd:
+            raise MarketDataError("KIS_CANO, KIS_ACNT_PRDT_CD 환경변수를 설정해주세요.")
+        client = mojito.KoreaInvestment(
+            api_key=app_key,
+            api_secret=app_secret,
+            acc_no=f"{cano}-{acnt_prdt_cd}",
+        )
+    else:
+        raise MarketDataError(f"지원하지 않는 거래소: {exchange}")
+
+    _clients[exchange] = client
+    return client
+
+
+def loaded_clients() -> list[str]:
+    """이미 생성된 클라이언트 (거래소 이름)"""
+    return sorted(_clients)
+
+
+def call_local(exchange: str, method: str, *args, **kwargs) -> Any:
+    """이 프로세스에서 직접 호출"""
+    ttl_for(exchange, method)
+    return getattr(get_client(exchange), method)(*args, **kwargs)
+
+
+# ===== 데몬 호출 =====
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """Unix 소켓 HTTP 연결"""
+
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def _connection(url: str, timeout: float) -> http.client.HTTPConnection:
+    parsed = urlparse(url)
+    if parsed.scheme == "unix":
+        return _UnixHTTPConnection(parsed.path, timeout)
+    return http.client.HTTPConnection(parsed.hostname or "127.0.0.1", parsed.port or 80, timeout=timeout)
+
+
+def daemon_url() -> Optional[str]:
+    """데몬 주소 (MARKETD_DISABLE이면 None)"""
+    load_env()
+    if os.environ.get("MARKETD_DISABLE", "").strip().lower() in ("1", "true", "yes", "on"):
+        return None
+    return os.environ.get("MARKETD_URL", DEFAULT_URL)
+
+
+def request_daemon(url: str, path: str, payload: Optional[dict] = None) -> Optional[dict]:
+    """데몬에 요청. 연결할 수 없으면 None"""
+    conn = _connection(url, CONNECT_TIMEOUT)
+    try:
+        try:
+            conn.connect()
+        except OSError:
+            return None
+        conn.sock.settimeout(REQUEST_TIMEOUT)
+        if payload is None:
+            conn.request("GET", path)
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return json.loads(response.read().decode("utf-8"))
+    finally:
+        conn.close()
+
+
+def market_call(exchange: str, method: str, *args, **kwargs) -> Any:
+    """시세 조회 (데몬 우선, 데몬이 없으면 직접 호출)
+
+    Raises:
+        MarketDataError: 허용되지 않은 메서드, 거래소 에러
+    """
+    ttl_for(exchange, method)
+
+    url = daemon_url()
+    if url:
+        try:
+            response = request_daemon(
+                url, "/call", {"exchange": exchange, "method": method, "args": list(args), "kwargs": kwargs}
+            )
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            print(f"Warning: market-data 데몬 요청 실패, 직접 조회: {e}", file=sys.stderr)
+            response = None
+        if response is not None:
+            if not response.get("ok"):
+                raise MarketDataError(response.get("error", "알 수 없는 에러"))
+            return decode(response["result"])
+
+    try:
+        return call_local(exchange, method, *args, **kwargs)
+    except MarketDataError:
+        raise
+    except Exception as e:
+        raise MarketDataError(str(e)) from e
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Market-data 데몬 - 거래소 클라이언트를 띄워두고 시세 조회 결과를 TTL 캐시로 공유
+
+시세 스크립트(get_ticker.py, get_ohlcv.py, get_price.py 등)는 market_client.market_call()로
+이 데몬을 먼저 찾는다. 에이전트가 한 대화에서 같은 BTC 시세를 세 번 물어도 거래소 호출은 한 번이다.
+
+- 거래소별 클라이언트를 한 번만 생성 (한투 접근 토큰 재발급 방지)
+- 메서드별 TTL 캐시 (market_client.ENDPOINTS), 같은 요청이 동시에 오면 한 번만 호출 (single-flight)
+- 거래소별 동시 호출 상한 (레이트 리밋 보호)
+- 허용한 조회 메서드만 처리, 계정 API(잔고/주문)는 받지 않음
+- localhost TCP 또는 Unix 소켓에서만 대기
+
+사용법:
+    uv run python .opencode/skills/market-data/scripts/marketd.py
+    uv run python .opencode/skills/market-data/scripts/marketd.py --port 8765
+    uv run python .opencode/skills/market-data/scripts/marketd.py --socket /tmp/marketd.sock
+
+엔드포인트:
+    POST /call   {"exchange", "method", "args", "kwargs"} → {"ok", "result", "cached", "age"}
+    GET  /stats  캐시 적중률, 거래소 호출 수
+    GET  /health
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from market_client import (  # noqa: E402
+    ENDPOINTS,
+    MarketDataError,
+    call_local,
+    encode,
+    get_client,
+    load_env,
+    loaded_clients,
+    ttl_for,
+)
+
+try:
+    import uvicorn
+    from fastapi import FastAPI
+    from pydantic import BaseModel
+except ImportError:
+    print("Error: fastapi, uvicorn이 설치되어 있지 않습니다.")
+    print("설치: uv sync")
+    exit(1)
+
+DEFAULT_PORT = 8765
+DEFAULT_CONCURRENCY = 4
+# 캐시 항목 정리 기준 크기
+MAX_CACHE_ENTRIES = 2000
+
+
+class CallRequest(BaseModel):
+    """시세 조회 요청"""
+    exchange: str
+    method: str
+    args: list = []
+    kwargs: dict = {}
+
+
+class MarketDataService:
+    """warm 클라이언트 + TTL 캐시 + single-flight"""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY):
+        # 키 → (조회 시각, 인코딩된 결과)
+        self.cache: dict[str, tuple[float, Any]] = {}
+        self.inflight: dict[str, asyncio.Future] = {}
+        self.semaphores = {exchange: asyncio.Semaphore(max(1, concurrency)) for exchange in ENDPOINTS}
+        self.started_at = time.time()
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.errors = 0
+        self.upstream: dict[str, int] = {}
+
+    @staticmethod
+    def key(exchange: str, method: str, args: list, kwargs: dict) -> str:
+        return json.dumps([exchange, method, args, kwargs], sort_keys=True, ensure_ascii=False, default=str)
+
+    def _prune(self, now: float):
+        if len(self.cache) < MAX_CACHE_ENTRIES:
+            return
+        for key, (fetched_at, _) in list(self.cache.items()):
+            exchange, method = json.loads(key)[:2]
+            if now - fetched_at > ttl_for(exchange, method):
+                del self.cache[key]
+
+    async def _fetch(self, exchange: str, method: str, args: list, kwargs: dict) -> Any:
+        async with self.semaphores[exchange]:
+            name = f"{exchange}.{method}"
+            self.upstream[name] = self.upstream.get(name, 0) + 1
+            result = await asyncio.to_thread(call_local, exchange, method, *args, **kwargs)
+            return encode(result)
+
+    async def call(self, exchange: str, method: str, args: list, kwargs: dict) -> dict:
+        ttl = ttl_for(exchange, method)
+        key = self.key(exchange, method, args, kwargs)
+        now = time.time()
+
+        cached = self.cache.get(key)
+        if cached and now - cached[0] <= ttl:
+            self.hits += 1
+            return {"ok": True, "result": cached[1], "cached": True, "age": round(now - cached[0], 3)}
+
+        future = self.inflight.get(key)
+        if future is not None:
+            self.shared += 1
+            result = await asyncio.shield(future)
+            return {"ok": True, "result": result, "cached": True, "age": 0.0}
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            result = await self._fetch(exchange, method, args, kwargs)
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 요청이 없으면 "exception never retrieved" 경고 방지
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self.inflight.pop(key, None)
+
+        future.set_result(result)
+        # None은 조회 실패(pyupbit 등)일 수 있어 캐시하지 않음
+        if result is not None:
+            self._prune(now)
+            self.cache[key] = (time.time(), result)
+        return {"ok": True, "result": result, "cached": False, "age": 0.0}
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses + self.shared
+        return {
+            "uptime": round(time.time() - self.started_at, 1),
+            "cache_entries": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "errors": self.errors,
+            "hit_rate": round((self.hits + self.shared) / total, 3) if total else 0.0,
+            "upstream_calls": self.upstream,
+            "clients": loaded_clients(),
+        }
+
+
+def create_app(service: MarketDataService, warm: list[str]) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # 클라이언트를 미리 생성 (실패해도 첫 요청 때 다시 시도)
+        for exchange in warm:
+            try:
+                await asyncio.to_thread(get_client, exchange)
+                print(f"[marketd] {exchange} 클라이언트 준비됨")
+            except Exception as e:
+                print(f"[marketd] {exchange} 클라이언트 생성 실패: {e}")
+        yield
+
+    app = FastAPI(title="market-data", docs_url=None, redoc_url=None, lifespan=lifespan)
+
+    @app.post("/call")
+    async def call(req: CallRequest) -> dict:
+        try:
+            return await service.call(req.exchange, req.method, req.args, req.kwargs)
+        except MarketDataError as e:
+            return {"ok": False, "error": str(e)}
+        except Exception as e:
+            service.errors += 1
+            print(f"[marketd] {req.exchange}.{req.method} 실패: {e}")
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    @app.get("/stats")
+    async def stats() -> dict:
+        return service.stats()
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Market-data 데몬 (시세 TTL 캐시)")
+    parser.add_argument("--host", default="127.0.0.1", help="호스트 (기본: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"포트 (기본: {DEFAULT_PORT})")
+    parser.add_argument("--socket", help="Unix 소켓 경로 (지정하면 TCP 대신 사용)")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"거래소별 동시 호출 수 (기본: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--warm",
+        nargs="*",
+        default=["upbit", "binance"],
+        help="시작할 때 미리 만들 클라이언트 (기본: upbit binance, 한투는 키가 있을 때 kis 추가)",
+    )
+    args = parser.parse_args()
+
+    load_env()
+    service = MarketDataService(args.concurrency)
+    app = create_app(service, args.warm)
+
+    if args.socket:
+        socket_path = Path(args.socket)
+        socket_path.unlink(missing_ok=True)
+        print(f"[marketd] 시작: unix://{socket_path}")
+        uvicorn.run(app, uds=str(socket_path), log_level="warning")
+    else:
+        print(f"[marketd] 시작: http://{args.host}:{args.port}")
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n[marketd] 종료")
@@ -88,6 +88,34 @@ def trigger_job(job_id: str):
         print(f"오류: {result.get('detail', result)}")
 
 
+def list_runs(job_id: str = None, limit: int = 20):
+    """실행 기록 조회"""
+    params = {"limit": limit}
+    if job_id:
+        params["job_id"] = job_id
+    response = httpx.get(f"{BASE_URL}/runs", params=params)
+    result = response.json()
+
+    if result.get("running"):
+        print(f"\n실행 중: {', '.join(f'{k}({v})' for k, v in result['running'].items())}")
+
+    runs = result.get("runs", [])
+    if not runs:
+        print("실행 기록이 없습니다.")
+        return
+
+    print(f"\n{'ID':<20} {'시작':<22} {'구분':<9} {'상태':<12} {'대기':>7} {'실행':>7}")
+    print("-" * 82)
+    for run in runs:
+        wait = f"{run['wait_time']:.1f}s" if run.get("wait_time") is not None else "-"
+        duration = f"{run['duration']:.1f}s" if run.get("duration") is not None else "-"
+        print(
+            f"{run['job_id']:<20} {run['queued_at']:<22} {run['source']:<9} "
+            f"{run['status']:<12} {wait:>7} {duration:>7}"
+        )
+    print()
+
+
 def add_once_job(job_id: str, run_at: str, content: str):
     """일회성 작업 추가"""
     payload = {
@@ -137,6 +165,11 @@ def main():
     trigger_parser = subparsers.add_parser("trigger", help="작업 수동 실행")
     trigger_parser.add_argument("job_id", help="작업 ID")
 
+    # runs
+    runs_parser = subparsers.add_parser("runs", help="실행 기록 조회")
+    runs_parser.add_argument("job_id", nargs="?", help="작업 ID (미지정시 전체)")
+    runs_parser.add_argument("--limit", type=int, default=20, help="최대 개수 (기본: 20)")
+
     args = parser.parse_args()
 
     if args.command == "list":
@@ -151,6 +184,8 @@ def main():
         remove_job(args.job_id)
     elif args.command == "trigger":
         trigger_job(args.job_id)
+    elif args.command == "runs":
+        list_runs(args.job_id, args.limit)
     else:
         parser.print_help()
 
@@ -2,30 +2,50 @@
 """
 Telegram 메시지 수집기 - Telethon 기반
 지정된 그룹/채널에서 최근 24시간 메시지를 수집하여 Markdown으로 저장
+
+수집한 메시지는 로컬 저장소(message_store.py)에 쌓고 채팅별 커서(last_id)를 남긴다.
+- collector_daemon.py가 실행 중이면 텔레그램 연결 없이 로컬 쿼리로 처리
+- 아니면 커서 이후(min_id) 새 메시지만 받아 저장소를 갱신한 뒤 쿼리
 """
 
 import asyncio
 import argparse
 import os
 import json
+import sys
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from dedup import DEFAULT_MAX_DISTANCE, deduplicate  # noqa: E402
+from entity_cache import EntityCache, default_cache_path, describe_entity  # noqa: E402
+from message_archive import MessageArchive, default_archive_path, pyarrow_available  # noqa: E402
+from message_store import MessageStore, default_db_path  # noqa: E402
+
 try:
     from dotenv import load_dotenv
 except ImportError:
     load_dotenv = None
 
 try:
-    from telethon import TelegramClient
+    from telethon import TelegramClient, utils
+    from telethon.errors import FloodWaitError
     from telethon.sessions import StringSession
-    from telethon.tl.types import User, Channel, Chat
 except ImportError:
     print("Error: telethon이 설치되어 있지 않습니다.")
     print("설치: pip install telethon")
     exit(1)
 
 
+# 동시에 수집할 채팅 수 (너무 크면 FloodWait 발생)
+DEFAULT_CONCURRENCY = 4
+
+# 이보다 긴 FloodWait는 기다리지 않고 해당 채팅을 건너뜀 (초)
+MAX_FLOOD_WAIT = 120
+
+
 def find_project_root() -> Path:
     """프로젝트 루트 찾기 (.git 또는 .env 기준)"""
     current = Path(__file__).resolve().parent
@@ -87,93 +107,115 @@ def load_targets(project_root: Path) -> list[str]:
     return targets
 
 
-async def get_entity_info(client: TelegramClient, entity) -> dict:
-    """엔티티(그룹/채널/사용자) 정보 추출"""
-    if isinstance(entity, User):
-        return {
-            "type": "user",
-            "id": entity.id,
-            "name": f"{entity.first_name or ''} {entity.last_name or ''}".strip(),
-            "username": entity.username,
-        }
-    elif isinstance(entity, (Channel, Chat)):
-        return {
-            "type": "channel" if isinstance(entity, Channel) else "group",
-            "id": entity.id,
-            "name": entity.title,
-            "username": getattr(entity, "username", None),
-        }
-    return {"type": "unknown", "id": getattr(entity, "id", None)}
-
-
-async def collect_messages(
-    client: TelegramClient,
-    chat_identifier: str,
-    hours: int = 24,
-    user_ids: list[int] | None = None,
-) -> list[dict]:
-    """
-    지정된 채팅에서 메시지 수집
+def message_to_dict(message, sender_info: dict) -> dict:
+    """Telethon 메시지 → 저장/출력용 dict"""
+    return {
+        "id": message.id,
+        "date": message.date.isoformat(),
+        "sender_id": message.sender_id,
+        "sender_name": sender_info.get("name", "Unknown"),
+        "sender_username": sender_info.get("username"),
+        "text": message.text or "",
+        "has_media": message.media is not None,
+        "reply_to": message.reply_to_msg_id,
+    }
+
 
-    Args:
-        client: Telethon 클라이언트
-        chat_identifier: 채팅 ID, username, 또는 invite link
-        hours: 수집할 시간 범위 (기본 24시간)
-        user_ids: 필터링할 사용자 ID 목록 (None이면 전체)
+async def resolve_chat(client: TelegramClient, store: MessageStore, chat_identifier: str):
+    """채팅 엔티티 조회 후 저장소에 메타데이터 기록
 
     Returns:
-        수집된 메시지 목록
+        (entity, chat_id, chat_info) 또는 실패시 None
     """
-    messages = []
-    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
-
     try:
         entity = await client.get_entity(chat_identifier)
-        chat_info = await get_entity_info(client, entity)
+        chat_info = describe_entity(entity)
     except Exception as e:
         print(f"Error: 채팅을 찾을 수 없습니다 - {chat_identifier}: {e}")
-        return messages
+        return None
+
+    # targets.json과 같은 형식의 id (채널은 -100...)
+    chat_id = utils.get_peer_id(entity)
+    store.upsert_chat(chat_id, chat_info.get("name"), chat_info["type"], chat_info.get("username"))
+    return entity, chat_id, chat_info
+
+
+async def fetch_messages(
+    client: TelegramClient,
+    entity,
+    cutoff_time: datetime,
+    min_id: int = 0,
+    cache: EntityCache | None = None,
+) -> tuple[list[dict], bool]:
+    """
+    min_id 이후, cutoff_time 이후 메시지를 최신순으로 수집
 
-    print(f"수집 중: {chat_info['name']} ({chat_info['type']})")
+    발신자는 배치에 포함된 엔티티 → 캐시 순으로 찾고, 둘 다 없을 때만 API를 호출한다.
 
-    async for message in client.iter_messages(entity):
+    Returns:
+        (메시지 목록, cutoff_time에 도달해 멈췄는지 여부)
+    """
+    cache = cache if cache is not None else EntityCache()
+    messages = []
+    async for message in client.iter_messages(entity, min_id=min_id):
         if message.date < cutoff_time:
-            break
+            return messages, True
+
+        sender_info = await cache.resolve_sender(message)
+        messages.append(message_to_dict(message, sender_info))
+    return messages, False
+
+
+async def sync_chat(
+    client: TelegramClient,
+    store: MessageStore,
+    entity,
+    chat_id: int,
+    hours: int = 24,
+    cache: EntityCache | None = None,
+) -> int:
+    """
+    저장소를 원격과 동기화 (커서 이후 새 메시지만 수집)
 
-        # 사용자 필터링
-        if user_ids and message.sender_id not in user_ids:
-            continue
+    - 저장소가 hours 구간을 이미 연속으로 갖고 있으면 min_id=last_id부터만 받음
+    - 아니면 hours 구간 전체를 받고 연속 구간 시작점을 cutoff로 설정
 
-        # 메시지 정보 추출
-        sender = await message.get_sender()
-        sender_info = await get_entity_info(client, sender) if sender else {"name": "Unknown"}
+    Returns:
+        새로 저장된 메시지 수
+    """
+    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+    chat = store.get_chat(chat_id) or {}
+    covered_since = chat.get("covered_since")
+    incremental = chat.get("last_id") and covered_since is not None and covered_since <= cutoff_time.timestamp()
 
-        msg_data = {
-            "id": message.id,
-            "date": message.date.isoformat(),
-            "sender_id": message.sender_id,
-            "sender_name": sender_info.get("name", "Unknown"),
-            "sender_username": sender_info.get("username"),
-            "text": message.text or "",
-            "has_media": message.media is not None,
-            "reply_to": message.reply_to_msg_id,
-        }
-        messages.append(msg_data)
+    min_id = chat["last_id"] if incremental else 0
+    messages, reached_cutoff = await fetch_messages(client, entity, cutoff_time, min_id=min_id, cache=cache)
+    added = store.add_messages(chat_id, messages)
 
-    print(f"  수집 완료: {len(messages)}개 메시지")
-    return messages
+    if incremental and not reached_cutoff:
+        # 커서부터 빠짐없이 이어받음 → 연속 구간 유지
+        store.mark_synced(chat_id)
+    else:
+        # 전체 구간을 받았거나, 커서와 cutoff 사이가 끊겨 cutoff부터 새로 연속 구간 시작
+        store.mark_synced(chat_id, covered_since=cutoff_time, reset=incremental)
+    return added
 
 
 def format_markdown(messages: list[dict], chat_name: str, hours: int) -> str:
-    """메시지를 Markdown 형식으로 포맷팅"""
+    """메시지를 Markdown 형식으로 포맷팅 (중복 묶음이면 대표 메시지에 중복 수 표시)"""
     now = datetime.now()
+    total = len(messages) + sum(m.get("duplicate_count", 0) for m in messages)
 
     lines = [
         f"# {chat_name} 메시지 수집",
         f"",
         f"- 수집 시간: {now.strftime('%Y-%m-%d %H:%M:%S')}",
         f"- 기간: 최근 {hours}시간",
-        f"- 총 메시지: {len(messages)}개",
+        f"- 총 메시지: {total}개",
+    ]
+    if total != len(messages):
+        lines.append(f"- 유사 중복 제외: {len(messages)}개 (중복 {total - len(messages)}개)")
+    lines += [
         f"",
         "---",
         "",
@@ -201,6 +243,12 @@ def format_markdown(messages: list[dict], chat_name: str, hours: int) -> str:
 
         text = msg["text"] if msg["text"] else "[미디어]" if msg["has_media"] else "[빈 메시지]"
 
+        if msg.get("duplicate_count"):
+            repeated = f"중복 {msg['duplicate_count']}건"
+            if msg.get("duplicate_chats"):
+                repeated += f": {', '.join(msg['duplicate_chats'])}"
+            sender = f"{sender} [{repeated}]"
+
         # 멀티라인 텍스트 처리
         if "\n" in text:
             lines.append(f"**[{time_str}] {sender}:**")
@@ -239,6 +287,48 @@ async def main():
         default=None,
         help="출력 파일 경로 (기본: collected_messages/YYYY-MM-DD.md)",
     )
+    parser.add_argument(
+        "--source",
+        choices=["auto", "store", "sync"],
+        default="auto",
+        help="auto: 저장소가 최신이면 로컬 조회, 아니면 동기화 / store: 로컬만 / sync: 항상 동기화 (기본: auto)",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=600,
+        help="auto 모드에서 저장소를 최신으로 볼 마지막 동기화 경과 시간(초) (기본: 600)",
+    )
+    parser.add_argument(
+        "--db",
+        type=str,
+        default=None,
+        help="메시지 저장소 경로 (기본: TELEGRAM_MESSAGE_DB 또는 .cache/telegram_messages.db)",
+    )
+    parser.add_argument(
+        "--no-archive",
+        dest="archive",
+        action="store_false",
+        help="Parquet 아카이브에 추가하지 않음",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"동시에 수집할 채팅 수 (기본: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        dest="dedup",
+        action="store_false",
+        help="유사 중복 메시지를 묶지 않음",
+    )
+    parser.add_argument(
+        "--dedup-distance",
+        type=int,
+        default=DEFAULT_MAX_DISTANCE,
+        help=f"같은 메시지로 볼 SimHash 해밍 거리 (64비트 중, 기본: {DEFAULT_MAX_DISTANCE})",
+    )
     parser.add_argument(
         "--api-id",
         type=str,
@@ -275,14 +365,140 @@ async def main():
             exit(1)
         print(f"telegram-targets.json에서 {len(chats)}개 대상 로드")
 
-    # 클라이언트 생성 및 연결
+    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=args.hours)
+    db_path = Path(args.db) if args.db else default_db_path(config["project_root"])
+    started_at = time.perf_counter()
+
+    with MessageStore(db_path) as store:
+        # 데몬이 최신 상태로 유지 중이면 텔레그램 연결 없이 로컬 쿼리
+        known = [store.resolve(chat) for chat in chats]
+        fresh = all(c and store.covers(c["chat_id"], cutoff_time, args.max_age) for c in known)
+
+        if args.source == "store" or (args.source == "auto" and fresh):
+            if not fresh:
+                print("Warning: 저장소가 최신이 아니거나 요청 구간을 모두 갖고 있지 않습니다.")
+            chat_ids = [c["chat_id"] for c in known if c]
+            print(f"로컬 저장소에서 조회: {db_path}")
+        else:
+            chat_ids = await sync_chats(config, api_id, api_hash, store, chats, args.hours, args.concurrency)
+
+        all_messages = store.query(chat_ids, since=cutoff_time, user_ids=args.users) if chat_ids else []
+
+        # Parquet 아카이브에 새 메시지 추가 (pyarrow가 없으면 경고만 하고 수집은 계속)
+        if args.archive and not pyarrow_available():
+            print("경고: pyarrow가 설치되어 있지 않아 Parquet 아카이브를 건너뜁니다 (uv sync)", file=sys.stderr)
+        elif args.archive:
+            archive = MessageArchive(default_archive_path(config["project_root"]))
+            archived = archive.export_from_store(store)
+            if archived:
+                print(f"아카이브에 {archived}개 메시지 추가: {archive.root}")
+
+    if not all_messages:
+        print("수집된 메시지가 없습니다.")
+        return
+
+    # Markdown 생성
+    chat_names = list(dict.fromkeys(m["chat_name"] for m in all_messages if m["chat_name"]))
+    chat_title = ", ".join(chat_names) if len(chat_names) <= 3 else f"{len(chat_names)}개 채팅"
+    messages = deduplicate(all_messages, args.dedup_distance) if args.dedup else all_messages
+    markdown = format_markdown(messages, chat_title, args.hours)
+
+    # 출력 경로 결정
+    if args.output:
+        output_path = Path(args.output)
+    else:
+        today = datetime.now().strftime("%Y-%m-%d")
+        output_path = config["project_root"] / "collected_messages" / f"{today}.md"
+
+    # 파일 저장
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(markdown, encoding="utf-8")
+
+    print(f"\n저장 완료: {output_path}")
+    print(f"총 {len(all_messages)}개 메시지 수집 ({time.perf_counter() - started_at:.2f}초)")
+    if len(messages) != len(all_messages):
+        print(f"유사 중복 {len(all_messages) - len(messages)}개를 묶어 {len(messages)}개로 출력")
+
+
+def create_client(config: dict, api_id: str, api_hash: str) -> TelegramClient:
+    """세션 문자열 또는 세션 파일로 클라이언트 생성"""
     session_string = config.get("session_string")
     if session_string:
         session = StringSession(session_string)
     else:
         session = config["session_name"]
+    return TelegramClient(session, int(api_id), api_hash)
+
 
-    client = TelegramClient(session, int(api_id), api_hash)
+async def sync_with_report(
+    client: TelegramClient,
+    store: MessageStore,
+    entity,
+    chat_id: int,
+    name: str,
+    hours: int,
+    semaphore: asyncio.Semaphore,
+    cache: EntityCache | None = None,
+) -> dict:
+    """동시 실행 상한 안에서 채팅 하나 동기화 (FloodWait는 기다렸다가 한 번 재시도)
+
+    Returns:
+        {"chat_id", "name", "added", "elapsed", "error"}
+    """
+    report = {"chat_id": chat_id, "name": name, "added": 0, "elapsed": 0.0, "error": None}
+    async with semaphore:
+        started_at = time.perf_counter()
+        for attempt in range(2):
+            try:
+                report["added"] = await sync_chat(client, store, entity, chat_id, hours=hours, cache=cache)
+                report["error"] = None
+                break
+            except FloodWaitError as e:
+                report["error"] = f"FloodWait {e.seconds}s"
+                if attempt or e.seconds > MAX_FLOOD_WAIT:
+                    break
+                print(f"  {name}: FloodWait {e.seconds}초 대기")
+                await asyncio.sleep(e.seconds)
+            except Exception as e:
+                report["error"] = str(e)
+                break
+        report["elapsed"] = time.perf_counter() - started_at
+    return report
+
+
+def print_report(reports: list[dict], total_elapsed: float):
+    """채널별 수집 시간 리포트"""
+    print(f"\n{'채널':<30} {'새 메시지':>8} {'소요(초)':>9}  상태")
+    print("-" * 64)
+    for r in sorted(reports, key=lambda r: -r["elapsed"]):
+        status = r["error"] or "ok"
+        print(f"{(r['name'] or str(r['chat_id']))[:30]:<30} {r['added']:>8} {r['elapsed']:>9.2f}  {status}")
+    print("-" * 64)
+    serial = sum(r["elapsed"] for r in reports)
+    print(f"{'합계':<30} {sum(r['added'] for r in reports):>8} {total_elapsed:>9.2f}  (순차 합계 {serial:.2f}초)")
+
+
+async def sync_chats(
+    config: dict,
+    api_id: str,
+    api_hash: str,
+    store: MessageStore,
+    chats: list[str],
+    hours: int,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> list[int]:
+    """텔레그램에 연결해 각 채팅의 새 메시지를 저장소에 반영 (동시 실행). 조회된 chat_id 목록 반환
+
+    동기화에 실패한 채팅도 저장소에 이미 있는 메시지는 결과에 포함한다.
+    """
+    client = create_client(config, api_id, api_hash)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    cache = EntityCache(path=default_cache_path(config["project_root"]))
+    cache.load()
+
+    async def resolve(chat: str):
+        async with semaphore:
+            return await resolve_chat(client, store, chat)
 
     async with client:
         if not await client.is_user_authorized():
@@ -290,47 +506,26 @@ async def main():
             print("먼저 scripts/generate_session.py를 실행하여 세션을 생성하세요.")
             exit(1)
 
-        all_messages = []
-        chat_names = []
-
-        for chat in chats:
-            messages = await collect_messages(
-                client,
-                chat,
-                hours=args.hours,
-                user_ids=args.users,
-            )
-            if messages:
-                all_messages.extend(messages)
-                # 채팅 이름 추출
-                try:
-                    entity = await client.get_entity(chat)
-                    chat_info = await get_entity_info(client, entity)
-                    chat_names.append(chat_info["name"])
-                except:
-                    chat_names.append(chat)
-
-        if not all_messages:
-            print("수집된 메시지가 없습니다.")
-            return
-
-        # Markdown 생성
-        chat_title = ", ".join(chat_names) if len(chat_names) <= 3 else f"{len(chat_names)}개 채팅"
-        markdown = format_markdown(all_messages, chat_title, args.hours)
-
-        # 출력 경로 결정
-        if args.output:
-            output_path = Path(args.output)
-        else:
-            today = datetime.now().strftime("%Y-%m-%d")
-            output_path = config["project_root"] / "collected_messages" / f"{today}.md"
+        started_at = time.perf_counter()
+
+        # 엔티티는 대상마다 한 번만 조회
+        resolved = [r for r in await asyncio.gather(*(resolve(chat) for chat in chats)) if r]
+        print(f"수집 중: {len(resolved)}개 채팅 (동시 {concurrency}개)")
 
-        # 파일 저장
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(markdown, encoding="utf-8")
+        reports = await asyncio.gather(*(
+            sync_with_report(client, store, entity, chat_id, info.get("name"), hours, semaphore, cache)
+            for entity, chat_id, info in resolved
+        ))
+        print_report(reports, time.perf_counter() - started_at)
+
+    cache.save()
+    stats = cache.stats()
+    print(
+        f"발신자 조회: 배치 {stats['batch_hits']}, 캐시 {stats['cache_hits']}, "
+        f"API {stats['api_calls']} (캐시 {stats['size']}개)"
+    )
 
-        print(f"\n저장 완료: {output_path}")
-        print(f"총 {len(all_messages)}개 메시지 수집")
+    return [r["chat_id"] for r in reports]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Telegram 수집 데몬 - 상주하며 대상 채널을 로컬 저장소에 계속 기록
+
+- 시작 시 채팅별 커서(last_id) 이후 메시지를 따라잡음 (첫 실행은 --backfill-hours 구간)
+- 이후 NewMessage 이벤트로 실시간 저장
+- --poll-interval마다 min_id 동기화로 놓친 업데이트를 메우고 커서/heartbeat 갱신
+- telegram-targets.json이 바뀌면 다음 폴링 때 대상 목록 다시 로드
+
+collect_messages.py는 저장소가 최신이면 텔레그램 연결 없이 로컬 쿼리로 처리한다.
+
+사용법:
+    uv run python .opencode/skills/telegram-collector/scripts/collector_daemon.py
+    uv run python .opencode/skills/telegram-collector/scripts/collector_daemon.py --poll-interval 120
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from collect_messages import (  # noqa: E402
+    DEFAULT_CONCURRENCY,
+    create_client,
+    load_config,
+    load_targets,
+    message_to_dict,
+    resolve_chat,
+    sync_with_report,
+)
+from entity_cache import EntityCache, default_cache_path  # noqa: E402
+from message_store import MessageStore, default_db_path  # noqa: E402
+
+try:
+    from telethon import events
+except ImportError:
+    print("Error: telethon이 설치되어 있지 않습니다.")
+    print("설치: pip install telethon")
+    exit(1)
+
+
+class CollectorDaemon:
+    """대상 채널을 따라가며 저장소에 기록"""
+
+    def __init__(
+        self,
+        client,
+        store: MessageStore,
+        project_root: Path,
+        backfill_hours: int,
+        poll_interval: float,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ):
+        self.client = client
+        self.store = store
+        self.project_root = project_root
+        self.backfill_hours = backfill_hours
+        self.poll_interval = poll_interval
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.cache = EntityCache(path=default_cache_path(project_root))
+        # chat_id -> (entity, 이름)
+        self.entities: dict[int, tuple[object, str]] = {}
+        self._targets: list[str] = []
+
+    async def refresh_targets(self):
+        """telegram-targets.json 다시 로드 (바뀐 경우에만 엔티티 재조회)"""
+        targets = load_targets(self.project_root)
+        if targets == self._targets:
+            return
+        self._targets = targets
+
+        entities = {}
+        for target in targets:
+            resolved = await resolve_chat(self.client, self.store, target)
+            if resolved:
+                entity, chat_id, info = resolved
+                entities[chat_id] = (entity, info.get("name"))
+        self.entities = entities
+        print(f"[collector] 대상 {len(entities)}개")
+
+    async def sync_all(self):
+        """모든 대상을 커서 이후로 동기화 (동시 실행 상한 적용)"""
+        reports = await asyncio.gather(*(
+            sync_with_report(
+                self.client, self.store, entity, chat_id, name, self.backfill_hours, self.semaphore, self.cache
+            )
+            for chat_id, (entity, name) in list(self.entities.items())
+        ))
+        self.cache.save()
+        for r in reports:
+            if r["error"]:
+                print(f"[collector] {r['name']} 동기화 실패: {r['error']}")
+            elif r["added"]:
+                print(f"[collector] {r['name']} 새 메시지 {r['added']}개 ({r['elapsed']:.1f}초)")
+
+    async def on_new_message(self, event):
+        """실시간 메시지 저장 (커서는 다음 폴링에서 전진)"""
+        chat_id = event.chat_id
+        if chat_id not in self.entities:
+            return
+        message = event.message
+        sender_info = await self.cache.resolve_sender(message)
+        self.store.add_messages(chat_id, [message_to_dict(message, sender_info)], advance=False)
+
+    async def poll_loop(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh_targets()
+            except Exception as e:
+                print(f"[collector] 대상 로드 실패: {e}")
+            await self.sync_all()
+
+    async def run(self):
+        restored = self.cache.load()
+        if restored:
+            print(f"[collector] 발신자 캐시 {restored}개 복원")
+        await self.refresh_targets()
+        await self.sync_all()
+        print(f"[collector] 초기 동기화 완료, 실시간 수집 시작 (폴링 {self.poll_interval:.0f}초)")
+
+        self.client.add_event_handler(self.on_new_message, events.NewMessage())
+        poller = asyncio.create_task(self.poll_loop())
+        try:
+            await self.client.run_until_disconnected()
+        finally:
+            poller.cancel()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Telegram 수집 데몬")
+    parser.add_argument(
+        "--backfill-hours",
+        type=int,
+        default=48,
+        help="커서가 없거나 끊겼을 때 받아올 시간 범위 (기본: 48)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=300,
+        help="min_id 동기화 주기(초) (기본: 300)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"동시에 동기화할 채팅 수 (기본: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--db",
+        type=str,
+        default=None,
+        help="메시지 저장소 경로 (기본: TELEGRAM_MESSAGE_DB 또는 .cache/telegram_messages.db)",
+    )
+    args = parser.parse_args()
+
+    config = load_config()
+    api_id = config.get("api_id")
+    api_hash = config.get("api_hash")
+    if not api_id or not api_hash:
+        print("Error: TELEGRAM_API_ID, TELEGRAM_API_HASH가 필요합니다.")
+        exit(1)
+
+    db_path = Path(args.db) if args.db else default_db_path(config["project_root"])
+    client = create_client(config, api_id, api_hash)
+
+    with MessageStore(db_path) as store:
+        async with client:
+            if not await client.is_user_authorized():
+                print("Error: 로그인이 필요합니다.")
+                print("먼저 scripts/generate_session.py를 실행하여 세션을 생성하세요.")
+                exit(1)
+
+            print(f"[collector] 저장소: {db_path}")
+            daemon = CollectorDaemon(
+                client, store, config["project_root"], args.backfill_hours, args.poll_interval, args.concurrency
+            )
+            await daemon.run()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n[collector] 종료")
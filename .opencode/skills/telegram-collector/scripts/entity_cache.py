@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+발신자/엔티티 정보 캐시 (LRU, 선택적으로 파일 저장)
+
+메시지마다 `await message.get_sender()`를 호출하면 발신자가 배치에 없을 때
+메시지 하나당 API 왕복이 생긴다. iter_messages는 한 번의 요청으로 받은
+users/chats를 각 메시지의 `message.sender`에 채워주므로 이를 먼저 사용하고,
+없을 때만 캐시 → API 순으로 조회한다.
+
+- 배치에 발신자가 있으면 항상 그 값으로 캐시 갱신 (이름 변경 반영, 네트워크 없음)
+- 캐시 크기 상한 초과시 가장 오래 안 쓴 항목부터 제거
+- 저장 경로: TELEGRAM_ENTITY_CACHE 환경변수 (기본: .cache/telegram_entities.json)
+"""
+
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    from telethon.tl.types import User, Channel, Chat
+except ImportError:
+    print("Error: telethon이 설치되어 있지 않습니다.")
+    print("설치: pip install telethon")
+    exit(1)
+
+DEFAULT_CACHE_PATH = ".cache/telegram_entities.json"
+
+
+def default_cache_path(project_root: Path) -> Path:
+    """캐시 파일 경로 (상대 경로는 프로젝트 루트 기준)"""
+    path = Path(os.environ.get("TELEGRAM_ENTITY_CACHE", DEFAULT_CACHE_PATH))
+    return path if path.is_absolute() else project_root / path
+
+
+def describe_entity(entity) -> dict:
+    """엔티티(그룹/채널/사용자) 정보 추출"""
+    if isinstance(entity, User):
+        return {
+            "type": "user",
+            "id": entity.id,
+            "name": f"{entity.first_name or ''} {entity.last_name or ''}".strip(),
+            "username": entity.username,
+            "bot": bool(entity.bot),
+        }
+    elif isinstance(entity, (Channel, Chat)):
+        return {
+            "type": "channel" if isinstance(entity, Channel) else "group",
+            "id": entity.id,
+            "name": entity.title,
+            "username": getattr(entity, "username", None),
+        }
+    return {"type": "unknown", "id": getattr(entity, "id", None)}
+
+
+class EntityCache:
+    """sender_id → 엔티티 정보 LRU 캐시"""
+
+    def __init__(self, max_size: int = 5000, path: Path | None = None):
+        self.max_size = max(1, max_size)
+        self.path = Path(path) if path else None
+        self._entries: OrderedDict[int, dict] = OrderedDict()
+        self.batch_hits = 0
+        self.cache_hits = 0
+        self.api_calls = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, entity_id: int) -> dict | None:
+        info = self._entries.get(entity_id)
+        if info is not None:
+            self._entries.move_to_end(entity_id)
+        return info
+
+    def put(self, entity_id: int, info: dict):
+        self._entries[entity_id] = info
+        self._entries.move_to_end(entity_id)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def resolve_sender(self, message) -> dict:
+        """메시지 발신자 정보 (배치 엔티티 → 캐시 → API 순)"""
+        sender_id = message.sender_id
+        if sender_id is None:
+            return {"name": "Unknown"}
+
+        sender = message.sender
+        if sender is not None:
+            self.batch_hits += 1
+        else:
+            info = self.get(sender_id)
+            if info is not None:
+                self.cache_hits += 1
+                return info
+            self.api_calls += 1
+            sender = await message.get_sender()
+            if sender is None:
+                return {"name": "Unknown"}
+
+        info = describe_entity(sender)
+        self.put(sender_id, info)
+        return info
+
+    def load(self) -> int:
+        """캐시 파일에서 복원. 복원된 개수 반환"""
+        if not self.path or not self.path.exists():
+            return 0
+        try:
+            items = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"[entity-cache] 캐시 파일 로드 실패: {e}")
+            return 0
+        for entity_id, info in items[-self.max_size:]:
+            self._entries[int(entity_id)] = info
+        return len(self._entries)
+
+    def save(self):
+        """캐시 파일에 기록 (임시 파일에 쓴 뒤 교체, LRU 순서 유지)"""
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(list(self._entries.items()), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "batch_hits": self.batch_hits,
+            "cache_hits": self.cache_hits,
+            "api_calls": self.api_calls,
+        }
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+텔레그램 메시지 아카이브 (Parquet, 날짜/채널 파티션)
+
+수집할 때마다 메시지 저장소(message_store.py)에 새로 추가된 메시지를 Parquet 파일로 덧붙인다.
+날짜/채널/키워드/발신자 조건으로 조회하고, Markdown은 조회 결과로 필요할 때 생성한다.
+
+디렉토리 구조 (hive 파티션, 날짜는 UTC 기준):
+    collected_messages/archive/day=2024-01-15/chat=-1001386345244/part-<ts>-0.parquet
+    collected_messages/archive/_manifest.json   # 마지막으로 내보낸 저장소 rowid
+
+pyarrow가 필요하다 (프로젝트 의존성, uv sync로 설치)
+
+사용법:
+    # 저장소 → 아카이브 (collect_messages.py가 수집 후 자동으로 호출)
+    python message_archive.py export
+
+    # 조회 (기본: Markdown 출력)
+    python message_archive.py query --from 2024-01-10 --to 2024-01-15 --keyword 비트코인 --keyword 금리
+    python message_archive.py query --hours 24 --chat -1001386345244 --sender 홍길동 --json
+    python message_archive.py query --from 2024-01-15 -o collected_messages/2024-01-15.md
+
+    # 파티션별 작은 파일 합치기
+    python message_archive.py compact
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from message_store import MessageStore, default_db_path  # noqa: E402
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+DEFAULT_ARCHIVE_PATH = "collected_messages/archive"
+MANIFEST_NAME = "_manifest.json"
+
+
+def pyarrow_available() -> bool:
+    return pa is not None
+
+
+def require_pyarrow():
+    if pa is None:
+        print("Error: pyarrow가 설치되어 있지 않습니다.")
+        print("설치: uv sync")
+        sys.exit(1)
+
+
+def default_archive_path(project_root: Path) -> Path:
+    """아카이브 경로 (상대 경로는 프로젝트 루트 기준)"""
+    path = Path(os.environ.get("TELEGRAM_MESSAGE_ARCHIVE", DEFAULT_ARCHIVE_PATH))
+    return path if path.is_absolute() else project_root / path
+
+
+def _schema() -> "pa.Schema":
+    return pa.schema([
+        ("chat_id", pa.int64()),
+        ("id", pa.int64()),
+        ("date", pa.timestamp("s", tz="UTC")),
+        ("chat_name", pa.string()),
+        ("sender_id", pa.int64()),
+        ("sender_name", pa.string()),
+        ("sender_username", pa.string()),
+        ("text", pa.string()),
+        ("has_media", pa.bool_()),
+        ("reply_to", pa.int64()),
+    ])
+
+
+def _partitioning() -> "ds.Partitioning":
+    return ds.partitioning(pa.schema([("day", pa.string()), ("chat", pa.int64())]), flavor="hive")
+
+
+class MessageArchive:
+    """날짜/채널 파티션 Parquet 아카이브"""
+
+    def __init__(self, root: Path):
+        require_pyarrow()
+        self.root = Path(root)
+        self.manifest_path = self.root / MANIFEST_NAME
+
+    # ===== 쓰기 =====
+
+    def append(self, messages: list[dict]) -> int:
+        """메시지를 새 파트 파일로 추가. 추가된 개수 반환"""
+        if not messages:
+            return 0
+        dates = [datetime.fromisoformat(m["date"]).astimezone(timezone.utc) for m in messages]
+        columns = {name: [m.get(name) for m in messages] for name in _schema().names if name != "date"}
+        columns["date"] = dates
+        table = pa.table(columns, schema=_schema())
+        table = table.append_column("day", pa.array([d.strftime("%Y-%m-%d") for d in dates]))
+        table = table.append_column("chat", table["chat_id"])
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        ds.write_dataset(
+            table,
+            self.root,
+            format="parquet",
+            partitioning=_partitioning(),
+            basename_template=f"part-{time.time_ns()}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        return table.num_rows
+
+    def _load_manifest(self) -> dict:
+        if not self.manifest_path.exists():
+            return {"last_rowid": 0}
+        return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+
+    def _save_manifest(self, manifest: dict):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+    def export_from_store(self, store: MessageStore) -> int:
+        """저장소에 마지막 내보내기 이후 추가된 메시지만 아카이브에 추가"""
+        manifest = self._load_manifest()
+        messages, last_rowid = store.changes_since(manifest.get("last_rowid", 0))
+        added = self.append(messages)
+        if last_rowid != manifest.get("last_rowid"):
+            manifest["last_rowid"] = last_rowid
+            manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+            self._save_manifest(manifest)
+        return added
+
+    def compact(self) -> int:
+        """파티션마다 파트 파일을 하나로 합침. 합친 파티션 수 반환"""
+        compacted = 0
+        for partition in sorted(self.root.glob("day=*/chat=*")):
+            parts = sorted(partition.glob("*.parquet"))
+            if len(parts) < 2:
+                continue
+            table = ds.dataset([str(p) for p in parts], format="parquet").to_table()
+            table = table.sort_by([("date", "ascending"), ("id", "ascending")])
+            merged = partition / f"part-{time.time_ns()}-compact.parquet"
+            tmp_path = merged.with_suffix(".tmp")
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, merged)
+            for part in parts:
+                part.unlink()
+            compacted += 1
+        return compacted
+
+    # ===== 조회 =====
+
+    def _dataset(self):
+        if not self.root.exists() or not any(self.root.glob("day=*")):
+            return None
+        return ds.dataset(self.root, format="parquet", partitioning=_partitioning())
+
+    def query(
+        self,
+        start: date | None = None,
+        end: date | None = None,
+        since: datetime | None = None,
+        chats: list[str] | None = None,
+        keywords: list[str] | None = None,
+        sender: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """
+        조건에 맞는 메시지 (시간순, 중복 제거)
+
+        Args:
+            start, end: 날짜 범위 (UTC 날짜, 양끝 포함). 파티션 단위로 걸러 필요한 파일만 읽음
+            since: 이 시각 이후
+            chats: chat_id 또는 채팅 이름 일부
+            keywords: 본문에 하나라도 포함 (대소문자 무시)
+            sender: 발신자 id, 이름 일부 또는 @username
+            limit: 최근 N개만
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return []
+
+        expr = None
+
+        def both(e):
+            return e if expr is None else expr & e
+
+        if start:
+            expr = both(ds.field("day") >= start.isoformat())
+        if end:
+            expr = both(ds.field("day") <= end.isoformat())
+        if since:
+            expr = both(ds.field("date") >= pa.scalar(since.astimezone(timezone.utc), pa.timestamp("s", tz="UTC")))
+
+        if chats:
+            ids = [int(c) for c in chats if _is_int(c)]
+            names = [c for c in chats if not _is_int(c)]
+            chat_expr = ds.field("chat").isin(ids) if ids else None
+            for name in names:
+                e = pc.match_substring(ds.field("chat_name"), name.lstrip("@"), ignore_case=True)
+                chat_expr = e if chat_expr is None else chat_expr | e
+            expr = both(chat_expr)
+
+        if keywords:
+            kw_expr = None
+            for keyword in keywords:
+                e = pc.match_substring(ds.field("text"), keyword, ignore_case=True)
+                kw_expr = e if kw_expr is None else kw_expr | e
+            expr = both(kw_expr)
+
+        if sender:
+            if _is_int(sender):
+                expr = both(ds.field("sender_id") == int(sender))
+            elif sender.startswith("@"):
+                expr = both(pc.equal(pc.utf8_lower(ds.field("sender_username")), sender[1:].lower()))
+            else:
+                expr = both(pc.match_substring(ds.field("sender_name"), sender, ignore_case=True))
+
+        table = dataset.to_table(filter=expr, columns=_schema().names)
+        if table.num_rows == 0:
+            return []
+        table = table.sort_by([("date", "ascending"), ("chat_id", "ascending"), ("id", "ascending")])
+
+        messages = []
+        seen = set()
+        for row in table.to_pylist():
+            key = (row["chat_id"], row["id"])
+            if key in seen:
+                continue
+            seen.add(key)
+            row["date"] = row["date"].isoformat()
+            row["sender_name"] = row["sender_name"] or "Unknown"
+            messages.append(row)
+        return messages[-limit:] if limit else messages
+
+    def stats(self) -> dict:
+        """파티션/파일/행 수"""
+        dataset = self._dataset()
+        if dataset is None:
+            return {"days": 0, "chats": 0, "partitions": 0, "files": 0, "rows": 0}
+        return {
+            "days": len(list(self.root.glob("day=*"))),
+            "chats": len({p.name for p in self.root.glob("day=*/chat=*")}),
+            "partitions": len(list(self.root.glob("day=*/chat=*"))),
+            "files": len(dataset.files),
+            "rows": dataset.count_rows(),
+        }
+
+
+def _is_int(value: str) -> bool:
+    try:
+        int(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="텔레그램 메시지 아카이브 (Parquet)")
+    parser.add_argument("--archive", type=str, default=None, help="아카이브 경로 (기본: collected_messages/archive)")
+    parser.add_argument("--db", type=str, default=None, help="메시지 저장소 경로 (export용)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("export", help="저장소의 새 메시지를 아카이브에 추가")
+    sub.add_parser("compact", help="파티션별 파트 파일 합치기")
+    sub.add_parser("stats", help="아카이브 현황")
+
+    q = sub.add_parser("query", help="메시지 조회")
+    q.add_argument("--from", dest="start", type=date.fromisoformat, help="시작 날짜 (YYYY-MM-DD, UTC)")
+    q.add_argument("--to", dest="end", type=date.fromisoformat, help="끝 날짜 (YYYY-MM-DD, UTC, 포함)")
+    q.add_argument("--hours", type=int, help="최근 N시간")
+    q.add_argument("--chat", action="append", help="chat_id 또는 채팅 이름 일부 (여러 번 지정 가능)")
+    q.add_argument("--keyword", "-k", action="append", help="키워드 (여러 번 지정시 하나라도 포함)")
+    q.add_argument("--sender", type=str, help="발신자 id, 이름 일부 또는 @username")
+    q.add_argument("--limit", type=int, help="최근 N개만")
+    q.add_argument("--json", action="store_true", help="JSON 출력")
+    q.add_argument("--output", "-o", type=str, help="출력 파일 (기본: stdout)")
+
+    args = parser.parse_args()
+    require_pyarrow()
+
+    from collect_messages import find_project_root, format_markdown, load_config
+
+    load_config()
+    project_root = find_project_root()
+    archive = MessageArchive(Path(args.archive) if args.archive else default_archive_path(project_root))
+
+    if args.command == "export":
+        db_path = Path(args.db) if args.db else default_db_path(project_root)
+        with MessageStore(db_path) as store:
+            added = archive.export_from_store(store)
+        print(f"아카이브에 {added}개 메시지 추가: {archive.root}")
+        return
+
+    if args.command == "compact":
+        print(f"파티션 {archive.compact()}개 합침")
+        return
+
+    if args.command == "stats":
+        print(json.dumps(archive.stats(), ensure_ascii=False, indent=2))
+        return
+
+    started_at = time.perf_counter()
+    since = datetime.now(timezone.utc) - timedelta(hours=args.hours) if args.hours else None
+    start = args.start or (since.date() if since else None)
+    messages = archive.query(
+        start=start,
+        end=args.end,
+        since=since,
+        chats=args.chat,
+        keywords=args.keyword,
+        sender=args.sender,
+        limit=args.limit,
+    )
+    elapsed = time.perf_counter() - started_at
+
+    if args.json:
+        output = json.dumps(messages, ensure_ascii=False, indent=2)
+    else:
+        chat_names = list(dict.fromkeys(m["chat_name"] for m in messages if m["chat_name"]))
+        chat_title = ", ".join(chat_names) if len(chat_names) <= 3 else f"{len(chat_names)}개 채팅"
+        output = format_markdown(messages, chat_title or "아카이브", args.hours or 24)
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(output, encoding="utf-8")
+        print(f"{len(messages)}개 메시지 ({elapsed * 1000:.0f}ms) → {output_path}")
+    else:
+        print(output)
+        print(f"\n{len(messages)}개 메시지 ({elapsed * 1000:.0f}ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+메시지 전문 검색 인덱스 (SQLite FTS5, 한국어 바이그램)
+
+SQLite 기본 토크나이저는 띄어쓰기 단위라 "비트코인이", "금리를"처럼 조사가 붙은 단어를
+"비트코인", "금리"로 찾지 못한다. 그래서 본문을 직접 토큰화해 FTS5에 넣는다.
+
+- 한글/한자/가나: 2글자씩 겹쳐 자름 (비트코인 → 비트 트코 코인), 한 글자 단어는 그대로
+- 영문/숫자: 소문자 단어
+- 검색어도 같은 방식으로 잘라 구(phrase) 검색 → 단어 중간 일치도 찾음
+
+인덱스는 메시지 저장소와 같은 DB 파일에 있으며(messages_fts), rowid가 messages.rowid와 같다.
+저장소에 메시지가 추가될 때마다 아직 색인되지 않은 rowid만 색인한다.
+"""
+
+import re
+import sqlite3
+
+# 본문은 messages 테이블에 있으므로 토큰만 저장 (contentless)
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    tokens,
+    content = '',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS fts_state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_CJK = "぀-ヿ㐀-䶿一-鿿가-힣"
+_TOKEN_RE = re.compile(f"[{_CJK}]+|[0-9A-Za-zÀ-ɏ]+")
+_CJK_RE = re.compile(f"^[{_CJK}]+$")
+
+# 검색어: "따옴표 구", OR, -제외어, 일반 단어
+_QUERY_RE = re.compile(r'(-?)"([^"]+)"|(\S+)')
+
+
+def _word_tokens(word: str) -> list[str]:
+    """단어 하나 → 토큰 목록"""
+    if _CJK_RE.match(word):
+        if len(word) == 1:
+            return [word]
+        return [word[i:i + 2] for i in range(len(word) - 1)]
+    return [word.lower()]
+
+
+def tokenize(text: str) -> list[str]:
+    """본문 → 색인 토큰 (등장 순서 유지)"""
+    tokens = []
+    for word in _TOKEN_RE.findall(text or ""):
+        tokens.extend(_word_tokens(word))
+    return tokens
+
+
+# 따옴표 구의 단어 사이에 허용하는 토큰 수 (조사: "금리를 인상" → 금리 [리를] 인상)
+_NEAR_DISTANCE = 3
+
+
+def _word_match(word: str) -> str:
+    """단어 하나 → FTS5 구 (단어 안의 바이그램은 연속으로 일치)"""
+    # 한 글자 한글 검색어는 접두어 검색 (금 → 금리, 금값 ...)
+    if _CJK_RE.match(word) and len(word) == 1:
+        return f'"{word}" *'
+    return '"' + " ".join(_word_tokens(word)) + '"'
+
+
+def _phrase(text: str) -> str | None:
+    """검색어 조각 → FTS5 검색식 (여러 단어면 가까이 붙어 있는 것만)"""
+    words = _TOKEN_RE.findall(text)
+    if not words:
+        return None
+    if len(words) == 1:
+        return _word_match(words[0])
+    return f"NEAR({' '.join(_word_match(w) for w in words)}, {_NEAR_DISTANCE * (len(words) - 1)})"
+
+
+def build_match(query: str) -> str | None:
+    """
+    검색어 → FTS5 MATCH 식
+
+    - 공백으로 구분된 단어: 모두 포함 (AND)
+    - "따옴표": 가까이 붙어 있는 단어들 (사이에 조사 정도만 허용)
+    - OR: 양쪽 중 하나
+    - -단어: 제외
+    """
+    include: list[str] = []
+    exclude: list[str] = []
+    pending_or = False
+
+    for negate, quoted, word in _QUERY_RE.findall(query):
+        if word == "OR":
+            pending_or = bool(include)
+            continue
+        if word.startswith("-") and len(word) > 1:
+            negate, word = "-", word[1:]
+        phrase = _phrase(quoted or word)
+        if phrase is None:
+            continue
+        if negate:
+            exclude.append(phrase)
+        elif pending_or:
+            include[-1] = f"({include[-1]} OR {phrase})"
+            pending_or = False
+        else:
+            include.append(phrase)
+
+    if not include:
+        return None
+    expr = " AND ".join(include)
+    for phrase in exclude:
+        expr = f"({expr}) NOT {phrase}"
+    return expr
+
+
+def ensure_index(conn: sqlite3.Connection):
+    """인덱스 테이블 생성"""
+    conn.executescript(SCHEMA)
+
+
+def index_pending(conn: sqlite3.Connection) -> int:
+    """아직 색인되지 않은 메시지(rowid 기준) 색인. 색인한 개수 반환
+
+    데몬과 CLI가 동시에 색인해도 같은 행을 두 번 넣지 않도록 쓰기 잠금 안에서 진행한다.
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT value FROM fts_state WHERE key = 'last_rowid'").fetchone()
+        last_rowid = row[0] if row else 0
+        rows = conn.execute(
+            "SELECT rowid, text FROM messages WHERE rowid > ? ORDER BY rowid",
+            (last_rowid,),
+        ).fetchall()
+        if not rows:
+            return 0
+
+        conn.executemany(
+            "INSERT INTO messages_fts (rowid, tokens) VALUES (?, ?)",
+            ((r[0], " ".join(tokenize(r[1]))) for r in rows),
+        )
+        conn.execute(
+            "INSERT INTO fts_state (key, value) VALUES ('last_rowid', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (rows[-1][0],),
+        )
+    return len(rows)
+
+
+def search(
+    conn: sqlite3.Connection,
+    query: str,
+    chat_ids: list[int] | None = None,
+    since: int | None = None,
+    until: int | None = None,
+    order: str = "recent",
+    limit: int = 50,
+) -> list[sqlite3.Row]:
+    """
+    전문 검색
+
+    Args:
+        since, until: epoch 초 범위
+        order: "recent" (최신순) 또는 "relevance" (bm25)
+
+    Returns:
+        messages 행 (+ chat_name)
+    """
+    match = build_match(query)
+    if match is None:
+        return []
+
+    sql = [
+        "SELECT m.*, c.name AS chat_name FROM messages_fts f",
+        "JOIN messages m ON m.rowid = f.rowid",
+        "LEFT JOIN chats c ON c.chat_id = m.chat_id",
+        "WHERE messages_fts MATCH ?",
+    ]
+    params: list = [match]
+    if chat_ids:
+        sql.append(f"AND m.chat_id IN ({','.join('?' * len(chat_ids))})")
+        params.extend(chat_ids)
+    if since is not None:
+        sql.append("AND m.date >= ?")
+        params.append(since)
+    if until is not None:
+        sql.append("AND m.date < ?")
+        params.append(until)
+    sql.append("ORDER BY f.rank" if order == "relevance" else "ORDER BY m.date DESC")
+    sql.append("LIMIT ?")
+    params.append(limit)
+    return conn.execute(" ".join(sql), params).fetchall()
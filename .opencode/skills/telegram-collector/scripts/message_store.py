@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+텔레그램 메시지 로컬 저장소 (SQLite, append-only)
+
+collector_daemon.py가 채널을 따라가며 기록하고, collect_messages.py는
+"최근 N시간" 요청을 네트워크 없이 로컬 쿼리로 처리한다.
+
+- messages: (chat_id, id) 기준 중복 없이 추가만 함 (INSERT OR IGNORE)
+- chats: 채팅별 커서
+    - last_id: 저장된 마지막 메시지 id (다음 수집은 min_id=last_id부터)
+    - covered_since: 이 시각 이후 ~ last_id까지는 빠짐없이 저장됨
+    - synced_at: 마지막으로 원격과 동기화한 시각 (데몬 heartbeat)
+- WAL 모드라 데몬이 쓰는 동안 CLI가 읽을 수 있음
+- 추가된 메시지는 전문 검색 인덱스(message_index.py)에 바로 색인
+
+저장 경로: TELEGRAM_MESSAGE_DB 환경변수 (기본: .cache/telegram_messages.db)
+"""
+
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from message_index import ensure_index, index_pending, search
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    chat_id INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    date INTEGER NOT NULL,
+    sender_id INTEGER,
+    sender_name TEXT,
+    sender_username TEXT,
+    text TEXT NOT NULL DEFAULT '',
+    has_media INTEGER NOT NULL DEFAULT 0,
+    reply_to INTEGER,
+    PRIMARY KEY (chat_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_messages_date ON messages (date);
+
+CREATE TABLE IF NOT EXISTS chats (
+    chat_id INTEGER PRIMARY KEY,
+    name TEXT,
+    type TEXT,
+    username TEXT,
+    last_id INTEGER NOT NULL DEFAULT 0,
+    covered_since INTEGER,
+    synced_at INTEGER
+);
+"""
+
+DEFAULT_DB_PATH = ".cache/telegram_messages.db"
+
+
+def default_db_path(project_root: Path) -> Path:
+    """저장소 경로 (상대 경로는 프로젝트 루트 기준)"""
+    path = Path(os.environ.get("TELEGRAM_MESSAGE_DB", DEFAULT_DB_PATH))
+    return path if path.is_absolute() else project_root / path
+
+
+def _epoch(value: datetime) -> int:
+    return int(value.timestamp())
+
+
+def _row_to_dict(row: sqlite3.Row) -> dict:
+    """DB 행 → collect_messages와 같은 dict 형식 + chat_id/chat_name"""
+    return {
+        "id": row["id"],
+        "chat_id": row["chat_id"],
+        "chat_name": row["chat_name"],
+        "date": datetime.fromtimestamp(row["date"], timezone.utc).isoformat(),
+        "sender_id": row["sender_id"],
+        "sender_name": row["sender_name"] or "Unknown",
+        "sender_username": row["sender_username"],
+        "text": row["text"],
+        "has_media": bool(row["has_media"]),
+        "reply_to": row["reply_to"],
+    }
+
+
+class MessageStore:
+    """채팅별 커서가 있는 append-only 메시지 저장소"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        # 전문 검색 인덱스 (다른 프로세스가 추가한 메시지도 여기서 따라잡음)
+        ensure_index(self.conn)
+        index_pending(self.conn)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ===== 채팅/커서 =====
+
+    def upsert_chat(self, chat_id: int, name: str, chat_type: str, username: str | None):
+        """채팅 메타데이터 기록 (커서는 유지)"""
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO chats (chat_id, name, type, username) VALUES (?, ?, ?, ?)
+                ON CONFLICT(chat_id) DO UPDATE SET
+                    name = excluded.name, type = excluded.type, username = excluded.username
+                """,
+                (chat_id, name, chat_type, username),
+            )
+
+    def get_chat(self, chat_id: int) -> dict | None:
+        row = self.conn.execute("SELECT * FROM chats WHERE chat_id = ?", (chat_id,)).fetchone()
+        return dict(row) if row else None
+
+    def resolve(self, identifier: str) -> dict | None:
+        """@username 또는 chat_id 문자열로 저장된 채팅 찾기"""
+        identifier = str(identifier).strip()
+        try:
+            return self.get_chat(int(identifier))
+        except ValueError:
+            pass
+        username = identifier.lstrip("@").lower()
+        row = self.conn.execute(
+            "SELECT * FROM chats WHERE lower(username) = ?", (username,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def last_id(self, chat_id: int) -> int:
+        chat = self.get_chat(chat_id)
+        return chat["last_id"] if chat else 0
+
+    def mark_synced(self, chat_id: int, covered_since: datetime | None = None, reset: bool = False):
+        """동기화 완료 기록
+
+        Args:
+            covered_since: 이 시각부터 빠짐없이 저장됨 (기존 값보다 이르면 앞당김)
+            reset: 기존 연속 구간이 끊겼으면 True (covered_since로 덮어씀)
+        """
+        with self.conn:
+            self.conn.execute(
+                "UPDATE chats SET synced_at = ? WHERE chat_id = ?",
+                (int(time.time()), chat_id),
+            )
+            if covered_since is not None:
+                self.conn.execute(
+                    """
+                    UPDATE chats SET covered_since = ?
+                    WHERE chat_id = ? AND (? OR covered_since IS NULL OR covered_since > ?)
+                    """,
+                    (_epoch(covered_since), chat_id, int(reset), _epoch(covered_since)),
+                )
+
+    # ===== 메시지 =====
+
+    def add_messages(self, chat_id: int, messages: list[dict], advance: bool = True) -> int:
+        """메시지 추가 (이미 있는 id는 무시). 새로 추가된 개수 반환
+
+        Args:
+            advance: 커서(last_id) 전진 여부. 실시간 이벤트처럼 앞쪽에 빈틈이 있을 수 있는
+                메시지는 False로 저장하고, 다음 min_id 동기화에서 커서를 옮긴다.
+        """
+        if not messages:
+            return 0
+        rows = [
+            (
+                chat_id,
+                m["id"],
+                _epoch(datetime.fromisoformat(m["date"])),
+                m.get("sender_id"),
+                m.get("sender_name"),
+                m.get("sender_username"),
+                m.get("text") or "",
+                int(bool(m.get("has_media"))),
+                m.get("reply_to"),
+            )
+            for m in messages
+        ]
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            added = self.conn.total_changes - before
+            if advance:
+                self.conn.execute(
+                    "UPDATE chats SET last_id = max(last_id, ?) WHERE chat_id = ?",
+                    (max(m["id"] for m in messages), chat_id),
+                )
+        if added:
+            index_pending(self.conn)
+        return added
+
+    def query(
+        self,
+        chat_ids: list[int] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        user_ids: list[int] | None = None,
+    ) -> list[dict]:
+        """조건에 맞는 메시지 (시간순). collect_messages와 같은 dict 형식 + chat_id/chat_name"""
+        sql = [
+            "SELECT m.*, c.name AS chat_name FROM messages m",
+            "LEFT JOIN chats c ON c.chat_id = m.chat_id WHERE 1 = 1",
+        ]
+        params: list = []
+        if chat_ids:
+            sql.append(f"AND m.chat_id IN ({','.join('?' * len(chat_ids))})")
+            params.extend(chat_ids)
+        if since:
+            sql.append("AND m.date >= ?")
+            params.append(_epoch(since))
+        if until:
+            sql.append("AND m.date < ?")
+            params.append(_epoch(until))
+        if user_ids:
+            sql.append(f"AND m.sender_id IN ({','.join('?' * len(user_ids))})")
+            params.extend(user_ids)
+        sql.append("ORDER BY m.date, m.chat_id, m.id")
+
+        return [_row_to_dict(row) for row in self.conn.execute(" ".join(sql), params)]
+
+    def changes_since(self, rowid: int) -> tuple[list[dict], int]:
+        """rowid 이후에 추가된 메시지 (추가 순서). append-only라 rowid가 곧 추가 순서
+
+        Returns:
+            (메시지 목록, 마지막 rowid)
+        """
+        rows = self.conn.execute(
+            """
+            SELECT m.rowid, m.*, c.name AS chat_name FROM messages m
+            LEFT JOIN chats c ON c.chat_id = m.chat_id
+            WHERE m.rowid > ? ORDER BY m.rowid
+            """,
+            (rowid,),
+        ).fetchall()
+        if not rows:
+            return [], rowid
+        return [_row_to_dict(row) for row in rows], rows[-1]["rowid"]
+
+    def search(
+        self,
+        query: str,
+        chat_ids: list[int] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        order: str = "recent",
+        limit: int = 50,
+    ) -> list[dict]:
+        """전문 검색 (message_index.build_match 문법)"""
+        rows = search(
+            self.conn,
+            query,
+            chat_ids=chat_ids,
+            since=_epoch(since) if since else None,
+            until=_epoch(until) if until else None,
+            order=order,
+            limit=limit,
+        )
+        return [_row_to_dict(row) for row in rows]
+
+    def covers(self, chat_id: int, since: datetime, max_age: float) -> bool:
+        """since 이후 구간이 빠짐없이 저장되어 있고 max_age초 이내에 동기화되었는지"""
+        chat = self.get_chat(chat_id)
+        if not chat or chat["covered_since"] is None or chat["synced_at"] is None:
+            return False
+        return chat["covered_since"] <= _epoch(since) and time.time() - chat["synced_at"] <= max_age
+
+    def stats(self) -> list[dict]:
+        """채팅별 저장 현황"""
+        rows = self.conn.execute(
+            """
+            SELECT c.*, count(m.id) AS messages, min(m.date) AS oldest, max(m.date) AS newest
+            FROM chats c LEFT JOIN messages m ON m.chat_id = c.chat_id
+            GROUP BY c.chat_id ORDER BY c.name
+            """
+        ).fetchall()
+        return [dict(row) for row in rows]
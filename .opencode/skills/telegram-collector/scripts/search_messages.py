@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+수집된 텔레그램 메시지 전문 검색
+
+메시지 저장소(collect_messages.py / collector_daemon.py가 채움)의 FTS5 인덱스를 조회한다.
+Markdown 파일을 처음부터 훑지 않고 몇 주치 기록에서 바로 찾는다.
+
+검색어 문법:
+    비트코인 금리        두 단어 모두 포함 (조사가 붙어도 일치: "비트코인이", "금리를")
+    "금리 인상"          붙어 있는 구
+    비트코인 OR 이더리움  둘 중 하나
+    공시 -정정           "정정"이 없는 것만
+
+사용법:
+    uv run python .opencode/skills/telegram-collector/scripts/search_messages.py 비트코인
+    uv run python .opencode/skills/telegram-collector/scripts/search_messages.py '"금리 인상" OR 금리인상' --days 14
+    uv run python .opencode/skills/telegram-collector/scripts/search_messages.py 공시 --chat @mk_giant --limit 20 --json
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from message_store import MessageStore, default_db_path  # noqa: E402
+
+
+def find_project_root() -> Path:
+    """프로젝트 루트 찾기 (.git 또는 .env 기준)"""
+    current = Path(__file__).resolve().parent
+    while current != current.parent:
+        if (current / ".git").exists() or (current / ".env").exists():
+            return current
+        current = current.parent
+    return Path.cwd()
+
+
+def snippet(text: str, query: str, width: int = 80) -> str:
+    """검색어 주변 본문 일부"""
+    text = " ".join(text.split())
+    lowered = text.lower()
+    positions = [
+        lowered.find(word.lower())
+        for word in query.replace('"', " ").split()
+        if word != "OR" and not word.startswith("-")
+    ]
+    positions = [p for p in positions if p >= 0]
+    start = max(0, min(positions) - width // 4) if positions else 0
+    end = start + width
+    return ("…" if start else "") + text[start:end] + ("…" if end < len(text) else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="텔레그램 메시지 전문 검색")
+    parser.add_argument("query", help="검색어 (예: 비트코인, '\"금리 인상\"', '공시 -정정')")
+    parser.add_argument("--chat", action="append", help="채팅 (@username 또는 chat_id, 여러 번 지정 가능)")
+    parser.add_argument("--days", type=float, default=None, help="최근 N일 (기본: 전체)")
+    parser.add_argument("--limit", "-n", type=int, default=30, help="최대 결과 수 (기본: 30)")
+    parser.add_argument(
+        "--sort",
+        choices=["recent", "relevance"],
+        default="recent",
+        help="정렬 (기본: recent)",
+    )
+    parser.add_argument("--full", action="store_true", help="본문 전체 출력")
+    parser.add_argument("--json", action="store_true", help="JSON 출력")
+    parser.add_argument("--db", type=str, default=None, help="메시지 저장소 경로")
+    args = parser.parse_args()
+
+    db_path = Path(args.db) if args.db else default_db_path(find_project_root())
+    if not db_path.exists():
+        print(f"Error: 메시지 저장소가 없습니다: {db_path}")
+        print("먼저 collect_messages.py 또는 collector_daemon.py로 메시지를 수집하세요.")
+        sys.exit(1)
+
+    started_at = time.perf_counter()
+    with MessageStore(db_path) as store:
+        chat_ids = None
+        if args.chat:
+            chats = [store.resolve(chat) for chat in args.chat]
+            for identifier, chat in zip(args.chat, chats):
+                if not chat:
+                    print(f"Warning: 저장소에 없는 채팅: {identifier}", file=sys.stderr)
+            chat_ids = [c["chat_id"] for c in chats if c]
+            if not chat_ids:
+                sys.exit(1)
+
+        since = datetime.now(timezone.utc) - timedelta(days=args.days) if args.days else None
+        results = store.search(args.query, chat_ids=chat_ids, since=since, order=args.sort, limit=args.limit)
+    elapsed = time.perf_counter() - started_at
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    if not results:
+        print(f"검색 결과 없음: {args.query} ({elapsed * 1000:.0f}ms)")
+        return
+
+    print(f"검색 결과 {len(results)}개: {args.query} ({elapsed * 1000:.0f}ms)\n")
+    for msg in results:
+        date_str = datetime.fromisoformat(msg["date"]).astimezone().strftime("%m/%d %H:%M")
+        text = msg["text"] if args.full else snippet(msg["text"], args.query)
+        print(f"[{date_str}] {msg['chat_name']} | {msg['sender_name']}")
+        print(f"  {text}\n")
+
+
+if __name__ == "__main__":
+    main()
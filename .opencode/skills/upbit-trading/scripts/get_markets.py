@@ -3,14 +3,17 @@
 
 import argparse
 import sys
+from pathlib import Path
 
-import pyupbit
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
+
+from market_client import market_call  # noqa: E402
 
 
 def get_markets(quote: str | None = None, search: str | None = None) -> None:
     """거래 가능 마켓 목록 조회"""
     try:
-        tickers = pyupbit.get_tickers()
+        tickers = market_call("upbit", "get_tickers")
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -68,7 +71,7 @@ def main():
     if args.json:
         import json
 
-        tickers = pyupbit.get_tickers()
+        tickers = market_call("upbit", "get_tickers")
         if args.quote:
             tickers = [t for t in tickers if t.startswith(f"{args.quote.upper()}-")]
         if args.search:
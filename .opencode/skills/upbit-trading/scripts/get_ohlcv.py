@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
-"""업비트 캔들(OHLCV) 데이터 조회 스크립트"""
+"""업비트 캔들(OHLCV) 데이터 조회 스크립트 (로컬 캔들 저장소 경유)"""
 
 import argparse
 import sys
+from pathlib import Path
 
-import pyupbit
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
+
+from candle_store import get_candles  # noqa: E402
 
 
 def format_number(num: float) -> str:
@@ -19,7 +22,7 @@ def get_ohlcv(symbol: str, interval: str = "day", count: int = 10) -> None:
     market = f"KRW-{symbol.upper()}" if "-" not in symbol else symbol.upper()
 
     try:
-        df = pyupbit.get_ohlcv(market, interval=interval, count=count)
+        df = get_candles("upbit", market, interval, count)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -64,20 +67,20 @@ def main():
         choices=["minute1", "minute3", "minute5", "minute10", "minute15", "minute30", "minute60", "minute240", "day", "week", "month"],
         help="캔들 간격 (기본: day)",
     )
-    parser.add_argument("--count", "-c", type=int, default=10, help="조회할 캔들 개수 (기본: 10, 최대: 200)")
+    parser.add_argument("--count", "-c", type=int, default=10, help="조회할 캔들 개수 (기본: 10, 200개 초과는 페이지 나눠 조회)")
     parser.add_argument("--json", action="store_true", help="JSON 형식 출력")
     args = parser.parse_args()
 
-    if args.count > 200:
-        args.count = 200
-        print("Warning: 최대 200개까지 조회 가능. 200개로 제한됨.", file=sys.stderr)
-
     if args.json:
         import json
 
         market = f"KRW-{args.symbol.upper()}" if "-" not in args.symbol else args.symbol.upper()
-        df = pyupbit.get_ohlcv(market, interval=args.interval, count=args.count)
-        if df is not None:
+        try:
+            df = get_candles("upbit", market, args.interval, args.count)
+        except Exception as e:
+            print(json.dumps({"error": str(e)}, indent=2))
+            sys.exit(1)
+        if not df.empty:
             df.index = df.index.strftime("%Y-%m-%d %H:%M:%S")
             print(df.to_json(orient="index", indent=2))
     else:
@@ -3,8 +3,11 @@
 
 import argparse
 import sys
+from pathlib import Path
 
-import pyupbit
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
+
+from market_client import market_call  # noqa: E402
 
 
 def format_number(num: float) -> str:
@@ -19,7 +22,7 @@ def get_orderbook(symbol: str, depth: int = 5) -> None:
     market = f"KRW-{symbol.upper()}" if "-" not in symbol else symbol.upper()
 
     try:
-        orderbook = pyupbit.get_orderbook(market)
+        orderbook = market_call("upbit", "get_orderbook", market)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -69,7 +72,7 @@ def main():
         import json
 
         market = f"KRW-{args.symbol.upper()}" if "-" not in args.symbol else args.symbol.upper()
-        orderbook = pyupbit.get_orderbook(market)
+        orderbook = market_call("upbit", "get_orderbook", market)
         print(json.dumps(orderbook, indent=2, ensure_ascii=False))
     else:
         get_orderbook(args.symbol, args.depth)
@@ -1,10 +1,31 @@
 #!/usr/bin/env python3
-"""업비트 현재가 조회 스크립트"""
+"""업비트 현재가 조회 스크립트
+
+/v1/ticker는 여러 마켓을 한 번에 받고 전일 종가, 변동률, 24시간 거래량까지 함께 돌려주므로
+심볼이 몇 개든 요청 한 번(100개 단위)으로 조회한다.
+
+사용법:
+    get_ticker.py BTC ETH XRP
+    get_ticker.py --watchlist watchlist.txt
+    get_ticker.py BTC --watchlist majors.txt --watchlist alts.txt --json
+
+워치리스트 파일: 한 줄에 하나 또는 공백/쉼표로 구분, # 뒤는 주석
+    # 메이저
+    BTC ETH
+    XRP, SOL, KRW-DOGE
+"""
 
 import argparse
+import json
 import sys
+from pathlib import Path
 
-import pyupbit
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "market-data" / "scripts"))
+
+from market_client import MarketDataError, market_call  # noqa: E402
+
+# 한 요청에 담을 마켓 수 (URL 길이 제한 대비)
+BATCH_SIZE = 100
 
 
 def format_number(num: float) -> str:
@@ -14,65 +35,120 @@ def format_number(num: float) -> str:
     return f"{num:.8f}".rstrip("0").rstrip(".")
 
 
-def get_ticker(symbols: list[str]) -> None:
-    """현재가 조회"""
-    markets = [f"KRW-{s.upper()}" if "-" not in s else s.upper() for s in symbols]
+def to_market(symbol: str) -> str:
+    """BTC → KRW-BTC (이미 마켓 코드면 그대로)"""
+    symbol = symbol.strip().upper()
+    return symbol if "-" in symbol else f"KRW-{symbol}"
 
-    try:
-        tickers = pyupbit.get_current_price(markets)
-    except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
-        sys.exit(1)
 
-    if isinstance(tickers, dict):
-        for market, price in tickers.items():
-            if price is None:
-                print(f"  {market}: 조회 실패")
-                continue
-            symbol = market.split("-")[1]
-            print(f"📊 {symbol} 현재가: {format_number(price)}원")
-    else:
-        symbol = markets[0].split("-")[1]
-        print(f"📊 {symbol} 현재가: {format_number(tickers)}원")
+def read_watchlist(path: str) -> list[str]:
+    """워치리스트 파일에서 심볼 목록 읽기"""
+    file = Path(path).expanduser()
+    if not file.exists():
+        print(f"Error: 워치리스트 파일이 없습니다: {file}", file=sys.stderr)
+        sys.exit(1)
 
-    # 상세 정보 조회
-    details = pyupbit.get_ohlcv(markets[0], count=1)
-    if details is not None and len(details) > 0:
+    symbols = []
+    for line in file.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0]
+        symbols.extend(s for s in line.replace(",", " ").split() if s)
+    return symbols
+
+
+def _fetch_batch(markets: list[str]) -> list[dict]:
+    """마켓 묶음 한 번에 조회 (/v1/ticker 원본 응답)"""
+    data = market_call("upbit", "get_current_price", markets, verbose=True)
+    if data is None:
+        raise MarketDataError("현재가 조회 실패")
+    # 마켓이 하나면 dict 하나로 옴
+    return [data] if isinstance(data, dict) else list(data)
+
+
+def fetch_tickers(markets: list[str]) -> tuple[dict[str, dict], list[str]]:
+    """여러 마켓 현재가 조회
+
+    Returns:
+        ({마켓: 시세 정보}, 조회 실패한 마켓 목록)
+    """
+    rows: list[dict] = []
+    for i in range(0, len(markets), BATCH_SIZE):
+        batch = markets[i : i + BATCH_SIZE]
+        try:
+            rows.extend(_fetch_batch(batch))
+        except MarketDataError:
+            # 없는 마켓이 하나라도 섞이면 묶음 전체가 실패하므로 거래 가능한 마켓만 남겨 다시 조회
+            listed = set(market_call("upbit", "get_tickers") or [])
+            valid = [m for m in batch if m in listed]
+            if valid:
+                rows.extend(_fetch_batch(valid))
+
+    tickers = {}
+    for row in rows:
+        tickers[row["market"]] = {
+            "price": row["trade_price"],
+            "prev_close": row["prev_closing_price"],
+            "change": row["signed_change_price"],
+            "change_rate": row["signed_change_rate"],
+            "volume_24h": row["acc_trade_volume_24h"],
+            "value_24h": row["acc_trade_price_24h"],
+        }
+    missing = [m for m in markets if m not in tickers]
+    return tickers, missing
+
+
+def print_tickers(tickers: dict[str, dict], missing: list[str]) -> None:
+    """현재가 출력"""
+    for market, info in tickers.items():
+        quote, symbol = market.split("-", 1)
+        unit = "원" if quote == "KRW" else f" {quote}"
+        sign = "+" if info["change"] >= 0 else "-"
+        print(f"📊 {symbol} 현재가: {format_number(info['price'])}{unit}")
+        print(
+            f"   전일대비: {sign}{abs(info['change_rate']) * 100:.2f}% "
+            f"({sign}{format_number(abs(info['change']))}{unit})"
+        )
+        print(f"   거래량(24h): {format_number(info['volume_24h'])} {symbol}")
         print()
-        for market in markets:
-            try:
-                ticker_detail = pyupbit.get_current_price(market)
-                ohlcv = pyupbit.get_ohlcv(market, count=2)
-                if ohlcv is not None and len(ohlcv) >= 2:
-                    prev_close = ohlcv.iloc[-2]["close"]
-                    curr_price = ticker_detail
-                    change = curr_price - prev_close
-                    change_pct = (change / prev_close) * 100
-                    volume = ohlcv.iloc[-1]["volume"]
-
-                    symbol = market.split("-")[1]
-                    sign = "+" if change >= 0 else ""
-                    print(f"   {symbol} 전일대비: {sign}{change_pct:.2f}% ({sign}{format_number(change)}원)")
-                    print(f"   {symbol} 거래량(24h): {format_number(volume)} {symbol}")
-                    print()
-            except Exception:
-                pass
+
+    for market in missing:
+        print(f"  {market}: 조회 실패")
 
 
 def main():
     parser = argparse.ArgumentParser(description="업비트 현재가 조회")
-    parser.add_argument("symbols", nargs="+", help="조회할 심볼 (예: BTC ETH XRP)")
+    parser.add_argument("symbols", nargs="*", help="조회할 심볼 (예: BTC ETH XRP)")
+    parser.add_argument(
+        "--watchlist",
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="심볼 목록 파일 (여러 번 지정 가능)",
+    )
     parser.add_argument("--json", action="store_true", help="JSON 형식 출력")
     args = parser.parse_args()
 
-    if args.json:
-        import json
+    symbols = list(args.symbols)
+    for path in args.watchlist:
+        symbols.extend(read_watchlist(path))
+    if not symbols:
+        parser.error("조회할 심볼 또는 --watchlist를 지정하세요")
+
+    # 순서 유지 중복 제거
+    markets = list(dict.fromkeys(to_market(s) for s in symbols))
 
-        markets = [f"KRW-{s.upper()}" if "-" not in s else s.upper() for s in args.symbols]
-        tickers = pyupbit.get_current_price(markets)
-        print(json.dumps(tickers, indent=2, ensure_ascii=False))
+    try:
+        tickers, missing = fetch_tickers(markets)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps({**tickers, **{m: None for m in missing}}, indent=2, ensure_ascii=False))
     else:
-        get_ticker(args.symbols)
+        print_tickers(tickers, missing)
+
+    if not tickers:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -76,14 +76,22 @@ async def get_chat_history(limit: int = 10) -> list[dict]:
             print("Error: 봇을 찾을 수 없습니다.")
             return []
 
+        # 발신자 캐시 (봇 대화는 발신자가 나/봇 둘뿐이라 메시지마다 조회할 필요 없음)
+        senders: dict[int, tuple[str, bool]] = {}
+
         async for msg in client.iter_messages(target_entity, limit=limit):
-            sender = await msg.get_sender()
             sender_name = "Unknown"
             is_bot = False
 
-            if sender:
-                sender_name = f"{getattr(sender, 'first_name', '') or ''} {getattr(sender, 'last_name', '') or ''}".strip()
-                is_bot = getattr(sender, 'bot', False)
+            if msg.sender_id in senders:
+                sender_name, is_bot = senders[msg.sender_id]
+            else:
+                # 배치 응답에 포함된 엔티티 우선 사용 (없을 때만 API 호출)
+                sender = msg.sender or await msg.get_sender()
+                if sender:
+                    sender_name = f"{getattr(sender, 'first_name', '') or ''} {getattr(sender, 'last_name', '') or ''}".strip()
+                    is_bot = getattr(sender, 'bot', False)
+                    senders[msg.sender_id] = (sender_name, is_bot)
 
             messages.append({
                 "message_id": msg.id,
@@ -34,6 +34,82 @@ ZAI_API_KEY = os.environ.get("ZAI_API_KEY")
 # 타임존
 TIMEZONE = "Asia/Seoul"
 
+
+def _env_bool(name: str, default: bool) -> bool:
+    """불리언 환경변수 파싱 (1/true/yes/on)"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Telegram HTTP 클라이언트 (프로세스 전역 커넥션 풀)
+TELEGRAM_API_BASE = os.environ.get("TELEGRAM_API_BASE", "https://api.telegram.org").rstrip("/")
+TELEGRAM_HTTP2 = _env_bool("TELEGRAM_HTTP2", True)
+TELEGRAM_MAX_CONNECTIONS = int(os.environ.get("TELEGRAM_MAX_CONNECTIONS", "20"))
+TELEGRAM_MAX_KEEPALIVE = int(os.environ.get("TELEGRAM_MAX_KEEPALIVE", "10"))
+TELEGRAM_KEEPALIVE_EXPIRY = float(os.environ.get("TELEGRAM_KEEPALIVE_EXPIRY", "60"))
+TELEGRAM_TIMEOUT = float(os.environ.get("TELEGRAM_TIMEOUT", "15"))
+TELEGRAM_CONNECT_TIMEOUT = float(os.environ.get("TELEGRAM_CONNECT_TIMEOUT", "5"))
+
+# OpenCode 워커 풀
+OPENCODE_MODEL = os.environ.get("OPENCODE_MODEL", "zai-coding-plan/glm-4.7")
+OPENCODE_WORKERS = int(os.environ.get("OPENCODE_WORKERS", "2"))
+OPENCODE_WORKER_BASE_PORT = int(os.environ.get("OPENCODE_WORKER_BASE_PORT", "4096"))
+OPENCODE_MAX_PENDING = int(os.environ.get("OPENCODE_MAX_PENDING", "20"))
+# 실행 결과로 보관할 stdout/stderr 최대 글자 수 (넘으면 앞부분 버림)
+OPENCODE_OUTPUT_LIMIT = int(os.environ.get("OPENCODE_OUTPUT_LIMIT", "100000"))
+
+# 실행 중 진행 상황 메시지 (한 메시지를 editMessageText로 갱신, 끝나면 삭제)
+STREAM_PROGRESS = _env_bool("STREAM_PROGRESS", True)
+STREAM_FIRST_DELAY = float(os.environ.get("STREAM_FIRST_DELAY", "5"))   # 이보다 빨리 끝나면 메시지를 보내지 않음
+STREAM_EDIT_INTERVAL = float(os.environ.get("STREAM_EDIT_INTERVAL", "3"))  # 편집 최소 간격 (초)
+
+# 웹훅 디스패처 (채팅별 직렬 처리)
+DISPATCH_MAX_CONCURRENCY = int(os.environ.get("DISPATCH_MAX_CONCURRENCY", str(OPENCODE_WORKERS)))
+DISPATCH_LANE_LIMIT = int(os.environ.get("DISPATCH_LANE_LIMIT", "5"))
+DISPATCH_OVERFLOW = os.environ.get("DISPATCH_OVERFLOW", "coalesce")  # drop-oldest | coalesce | reject
+DISPATCH_DRAIN_TIMEOUT = float(os.environ.get("DISPATCH_DRAIN_TIMEOUT", "30"))
+
+# 웹훅 update_id 중복 제거 캐시
+DEDUP_MAX_SIZE = int(os.environ.get("DEDUP_MAX_SIZE", "10000"))
+DEDUP_TTL = float(os.environ.get("DEDUP_TTL", "86400"))  # 텔레그램은 최대 24시간 재전송
+# 설정하면 종료 시 저장, 시작 시 복원 (예: .cache/processed_updates.json)
+DEDUP_STATE_FILE = os.environ.get("DEDUP_STATE_FILE") or None
+if DEDUP_STATE_FILE and not os.path.isabs(DEDUP_STATE_FILE):
+    DEDUP_STATE_FILE = str(PROJECT_ROOT / DEDUP_STATE_FILE)
+
+# 발신 큐 (텔레그램 전송 속도 제한)
+OUTBOX_GLOBAL_RATE = float(os.environ.get("OUTBOX_GLOBAL_RATE", "30"))        # 봇 전체 초당 메시지
+OUTBOX_CHAT_RATE = float(os.environ.get("OUTBOX_CHAT_RATE", "1"))             # 개인 채팅 초당 메시지
+OUTBOX_GROUP_RATE = float(os.environ.get("OUTBOX_GROUP_RATE", str(20 / 60)))  # 그룹 초당 메시지 (분당 20)
+OUTBOX_CHAT_BURST = int(os.environ.get("OUTBOX_CHAT_BURST", "3"))
+OUTBOX_MAX_RETRIES = int(os.environ.get("OUTBOX_MAX_RETRIES", "3"))
+
+# 스케줄러 작업 저장소 (재시작 후에도 작업 유지)
+SCHEDULER_DB = os.environ.get("SCHEDULER_DB", ".cache/scheduler.db")
+if not os.path.isabs(SCHEDULER_DB):
+    SCHEDULER_DB = str(PROJECT_ROOT / SCHEDULER_DB)
+# 서버가 꺼져 있어 놓친 실행: 예정 시각에서 이 시간(초) 안에 재시작하면 실행
+SCHEDULER_MISFIRE_GRACE = int(os.environ.get("SCHEDULER_MISFIRE_GRACE", "3600"))
+# 여러 번 놓쳤으면 한 번만 실행
+SCHEDULER_COALESCE = _env_bool("SCHEDULER_COALESCE", True)
+# 작업별 동시 실행 수 (예약 실행 + 수동 실행 합계)
+SCHEDULER_MAX_INSTANCES = int(os.environ.get("SCHEDULER_MAX_INSTANCES", "1"))
+# 스케줄 실행 하나의 타임아웃 (초, 워커 대기 시간 제외)
+SCHEDULER_TIMEOUT = float(os.environ.get("SCHEDULER_TIMEOUT", "600"))
+# 보관할 실행 기록 수
+SCHEDULER_RUN_HISTORY = int(os.environ.get("SCHEDULER_RUN_HISTORY", "500"))
+# 사전 수집 단계 하나의 타임아웃 (초) / 프롬프트에 넣을 최대 글자 수
+PREFETCH_TIMEOUT = float(os.environ.get("PREFETCH_TIMEOUT", "180"))
+PREFETCH_MAX_CHARS = int(os.environ.get("PREFETCH_MAX_CHARS", "30000"))
+
+# 메트릭 (/metrics, Prometheus 텍스트 형식)
+# 기본은 localhost 전용, 토큰을 설정하면 Authorization: Bearer <토큰>으로 외부 수집 허용
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
+# 구간 시간을 JSON 한 줄씩 출력 (로그 수집기용)
+METRICS_SPAN_LOG = _env_bool("METRICS_SPAN_LOG", False)
+
 # 검증
 if not BOT_TOKEN:
     print("Error: TELEGRAM_BOT_TOKEN이 필요합니다.")
@@ -0,0 +1,94 @@
+"""update_id 중복 처리 방지 캐시
+
+텔레그램은 webhook 응답이 늦거나 실패하면 같은 update를 재전송한다.
+삽입 순서가 유지되는 OrderedDict로 최근 update_id를 보관한다.
+
+- 삽입/조회/제거 모두 O(1) (가장 오래된 항목부터 제거)
+- TTL이 지난 항목은 조회/삽입 시 앞에서부터 정리
+- 선택적으로 JSON 파일에 저장해 재시작 후에도 유지
+
+이 모듈은 app.config에 의존하지 않으므로 scripts/telegram_webhook.py에서도 사용한다.
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Hashable, Optional
+
+
+class DedupCache:
+    """크기 상한 + TTL이 있는 순서 보존 중복 제거 캐시"""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 86400.0, path: Optional[Path] = None):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        # key -> 처음 본 시각 (epoch). 삽입 순서 = 시간 순서
+        self._entries: OrderedDict[Hashable, float] = OrderedDict()
+        # 가장 오래된 항목이 만료되는 시각 (그 전에는 만료 검사 생략)
+        self._next_expiry = float("inf")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._expire(time.time())
+        return key in self._entries
+
+    def add(self, key: Hashable) -> bool:
+        """key 기록. 처음 보는 key면 True, 중복이면 False"""
+        now = time.time()
+        self._expire(now)
+        if key in self._entries:
+            return False
+
+        if not self._entries:
+            self._next_expiry = now + self.ttl
+        self._entries[key] = now
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return True
+
+    def _expire(self, now: float):
+        """TTL 지난 항목을 앞(가장 오래된 쪽)에서부터 제거"""
+        if self.ttl <= 0 or now < self._next_expiry:
+            return
+        cutoff = now - self.ttl
+        entries = self._entries
+        while entries:
+            _, seen_at = next(iter(entries.items()))
+            if seen_at >= cutoff:
+                self._next_expiry = seen_at + self.ttl
+                return
+            entries.popitem(last=False)
+        self._next_expiry = float("inf")
+
+    def load(self) -> int:
+        """저장 파일에서 복원 (만료된 항목은 제외). 복원된 개수 반환"""
+        if not self.path or not self.path.exists():
+            return 0
+        try:
+            items = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"[dedup] 상태 파일 로드 실패: {e}")
+            return 0
+
+        cutoff = time.time() - self.ttl if self.ttl > 0 else float("-inf")
+        self._entries.clear()
+        for key, seen_at in sorted(items, key=lambda x: x[1])[-self.max_size:]:
+            if seen_at >= cutoff:
+                self._entries[key] = seen_at
+        self._next_expiry = float("-inf")
+        return len(self._entries)
+
+    def save(self):
+        """저장 파일에 기록 (임시 파일에 쓴 뒤 교체)"""
+        if not self.path:
+            return
+        self._expire(time.time())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(list(self._entries.items())), encoding="utf-8")
+        os.replace(tmp_path, self.path)
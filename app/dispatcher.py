@@ -0,0 +1,191 @@
+"""채팅별 직렬 작업 디스패처
+
+FastAPI BackgroundTasks 대신 사용한다.
+
+- chat_id마다 레인(lane) 하나: 같은 채팅의 메시지는 도착 순서대로 하나씩 처리
+- 전역 동시 실행 상한 (세마포어)
+- 레인 대기열 상한 + 넘칠 때 정책
+    - drop-oldest: 가장 오래된 대기 메시지를 버리고 새 메시지 추가
+    - coalesce: 새 메시지를 마지막 대기 메시지에 합침
+    - reject: 새 메시지를 거절하고 "busy" 응답
+- 종료 시 남은 작업을 정해진 시간 동안 처리 후 취소 (graceful drain)
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from app.metrics import DISPATCH_QUEUE_WAIT
+
+# 넘침 정책
+OVERFLOW_POLICIES = ("drop-oldest", "coalesce", "reject")
+
+WorkHandler = Callable[[dict], Awaitable[None]]
+RejectHandler = Callable[[dict], Awaitable[None]]
+LaneHook = Callable[[object], None]
+
+
+def coalesce_messages(queued: dict, incoming: dict) -> dict:
+    """대기 중인 메시지에 새 메시지를 합침 (텍스트는 줄바꿈으로 연결, 나머지는 최신값)"""
+    merged = dict(incoming)
+    texts = [t for t in (queued.get("text"), incoming.get("text")) if t]
+    merged["text"] = "\n".join(texts)
+    merged["coalesced"] = queued.get("coalesced", 1) + incoming.get("coalesced", 1)
+    return merged
+
+
+class _Lane:
+    """채팅 하나의 대기열과 처리 태스크"""
+
+    def __init__(self):
+        self.queue: deque[tuple[float, dict]] = deque()
+        self.task: Optional[asyncio.Task] = None
+
+
+class ChatDispatcher:
+    """chat_id별 레인 + 전역 동시 실행 상한 디스패처"""
+
+    def __init__(
+        self,
+        handler: WorkHandler,
+        max_concurrency: int = 4,
+        lane_limit: int = 5,
+        overflow: str = "coalesce",
+        on_reject: Optional[RejectHandler] = None,
+        coalesce: Callable[[dict, dict], dict] = coalesce_messages,
+        on_lane_open: Optional[LaneHook] = None,
+        on_lane_close: Optional[LaneHook] = None,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"지원하지 않는 overflow 정책: {overflow} ({', '.join(OVERFLOW_POLICIES)})")
+        self.handler = handler
+        self.max_concurrency = max(1, max_concurrency)
+        self.lane_limit = max(1, lane_limit)
+        self.overflow = overflow
+        self.on_reject = on_reject
+        self.coalesce = coalesce
+        # 레인에 처리할 작업이 생기고/없어질 때 호출 (예: 타이핑 표시)
+        self.on_lane_open = on_lane_open
+        self.on_lane_close = on_lane_close
+
+        self._lanes: dict[object, _Lane] = {}
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._background: set[asyncio.Task] = set()
+        self._closed = False
+        self._active = 0
+
+        # 통계
+        self._accepted = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._rejected = 0
+        self._processed = 0
+
+    def submit(self, key: object, item: dict) -> str:
+        """작업 추가 (요청 경로에서 호출, 즉시 반환)
+
+        Returns:
+            "accepted" | "coalesced" | "dropped-oldest" | "rejected"
+        """
+        if self._closed:
+            self._reject(item)
+            return "rejected"
+
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane()
+
+        status = "accepted"
+        if len(lane.queue) >= self.lane_limit:
+            if self.overflow == "reject":
+                self._reject(item)
+                return "rejected"
+            if self.overflow == "coalesce":
+                queued_at, queued = lane.queue.pop()
+                lane.queue.append((queued_at, self.coalesce(queued, item)))
+                self._coalesced += 1
+                return "coalesced"
+            # drop-oldest
+            _, dropped = lane.queue.popleft()
+            self._dropped += 1
+            print(f"[dispatcher] 대기열 초과, 오래된 메시지 버림: update_id={dropped.get('update_id')}")
+            status = "dropped-oldest"
+
+        lane.queue.append((time.monotonic(), item))
+        self._accepted += 1
+        if lane.task is None:
+            if self.on_lane_open:
+                self.on_lane_open(key)
+            lane.task = asyncio.create_task(self._run_lane(key, lane))
+        return status
+
+    def _reject(self, item: dict):
+        """거절 처리 (busy 응답은 요청 경로 밖에서 전송)"""
+        self._rejected += 1
+        if self.on_reject:
+            task = asyncio.create_task(self.on_reject(item))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def _run_lane(self, key: object, lane: _Lane):
+        """레인 대기열을 순서대로 처리, 비면 레인 제거"""
+        try:
+            while lane.queue:
+                queued_at, item = lane.queue.popleft()
+                async with self._semaphore:
+                    # 레인 대기 + 전역 동시 실행 상한 대기
+                    DISPATCH_QUEUE_WAIT.observe(time.monotonic() - queued_at)
+                    self._active += 1
+                    try:
+                        await self.handler(item)
+                    except Exception as e:
+                        print(f"[dispatcher] 처리 에러 (key={key}): {e}")
+                    finally:
+                        self._active -= 1
+                        self._processed += 1
+        finally:
+            lane.task = None
+            if not lane.queue and self._lanes.get(key) is lane:
+                self._lanes.pop(key, None)
+            if self.on_lane_close:
+                self.on_lane_close(key)
+
+    async def drain(self, timeout: float = 30.0):
+        """새 작업을 받지 않고, 남은 작업을 timeout 동안 처리 후 취소"""
+        self._closed = True
+        tasks = [lane.task for lane in self._lanes.values() if lane.task]
+        if not tasks:
+            return
+
+        pending_items = sum(len(lane.queue) for lane in self._lanes.values())
+        print(f"[dispatcher] 종료 대기: 레인 {len(tasks)}개, 대기 {pending_items}개 (최대 {timeout:.0f}초)")
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            print(f"[dispatcher] 미완료 레인 {len(pending)}개 취소됨")
+
+    def stats(self) -> dict:
+        """디스패처 상태"""
+        now = time.monotonic()
+        oldest_wait = max(
+            (now - lane.queue[0][0] for lane in self._lanes.values() if lane.queue),
+            default=0.0,
+        )
+        return {
+            "lanes": len(self._lanes),
+            "queued": sum(len(lane.queue) for lane in self._lanes.values()),
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "lane_limit": self.lane_limit,
+            "overflow": self.overflow,
+            "oldest_wait": round(oldest_wait, 3),
+            "accepted": self._accepted,
+            "coalesced": self._coalesced,
+            "dropped": self._dropped,
+            "rejected": self._rejected,
+            "processed": self._processed,
+            "closed": self._closed,
+        }
@@ -1,14 +1,29 @@
 """웹훅 핸들러"""
 
-import asyncio
 from datetime import datetime
 from typing import Optional, Callable, Awaitable
 
-from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, Request, HTTPException
 from fastapi.responses import JSONResponse
 
-from app.config import PROJECT_ROOT, WEBHOOK_SECRET
-from app.telegram import send_message, send_chat_action
+from app.config import (
+    DEDUP_MAX_SIZE,
+    DEDUP_STATE_FILE,
+    DEDUP_TTL,
+    DISPATCH_LANE_LIMIT,
+    DISPATCH_MAX_CONCURRENCY,
+    DISPATCH_OVERFLOW,
+    STREAM_PROGRESS,
+    WEBHOOK_SECRET,
+)
+from app.dedup import DedupCache
+from app.dispatcher import ChatDispatcher
+from app.metrics import WEBHOOK_ACK, registry, span
+from app.outbox import send_message
+from app.security import local_only
+from app.streaming import ProgressMessage
+from app.typing_indicator import typing_manager
+from app.workers import PoolBusyError, pool, user_action_args
 
 # 라우터
 router = APIRouter(tags=["webhook"])
@@ -17,9 +32,12 @@ router = APIRouter(tags=["webhook"])
 MessageHandler = Callable[[dict], Awaitable[Optional[str]]]
 _message_handlers: list[MessageHandler] = []
 
-# 중복 처리 방지용
-_processed_updates: set[int] = set()
-_MAX_PROCESSED_UPDATES = 1000
+# 중복 처리 방지용 (순서 보존 LRU + TTL, 선택적으로 파일 저장)
+processed_updates = DedupCache(
+    max_size=DEDUP_MAX_SIZE,
+    ttl=DEDUP_TTL,
+    path=DEDUP_STATE_FILE,
+)
 
 
 def on_message(handler: MessageHandler):
@@ -29,13 +47,10 @@ def on_message(handler: MessageHandler):
 
 
 async def process_message(msg_info: dict):
-    """백그라운드에서 메시지 처리"""
+    """디스패처 레인에서 메시지 처리"""
     chat_id = msg_info.get("chat_id")
 
-    # 타이핑 표시
-    await send_chat_action(chat_id, "typing")
-
-    # 등록된 핸들러 실행
+    # 등록된 핸들러 실행 (타이핑 표시는 레인이 열려 있는 동안 typing_manager가 유지)
     for handler in _message_handlers:
         try:
             reply = await handler(msg_info)
@@ -45,9 +60,41 @@ async def process_message(msg_info: dict):
             print(f"Handler error: {e}")
 
 
+async def reject_message(msg_info: dict):
+    """대기열이 가득 차 거절된 메시지에 busy 응답"""
+    await send_message(msg_info.get("chat_id"), "이전 요청을 처리 중입니다. 잠시 후 다시 보내주세요.")
+
+
+# 채팅별 직렬 디스패처 (BackgroundTasks 대체)
+dispatcher = ChatDispatcher(
+    process_message,
+    max_concurrency=DISPATCH_MAX_CONCURRENCY,
+    lane_limit=DISPATCH_LANE_LIMIT,
+    overflow=DISPATCH_OVERFLOW,
+    on_reject=reject_message,
+    on_lane_open=typing_manager.begin,
+    on_lane_close=typing_manager.end,
+)
+
+
 @router.post("/webhook")
-async def webhook_handler(request: Request, background_tasks: BackgroundTasks):
-    """텔레그램 Webhook 엔드포인트"""
+async def webhook_handler(request: Request):
+    """텔레그램 Webhook 엔드포인트 (응답 지연을 webhook_ack_seconds에 기록)"""
+    with span("webhook.ack", WEBHOOK_ACK, result="error") as fields:
+        try:
+            fields["result"] = await _accept_update(request)
+        except HTTPException as e:
+            fields["result"] = f"http_{e.status_code}"
+            raise
+    return JSONResponse({"ok": True})
+
+
+async def _accept_update(request: Request) -> str:
+    """업데이트 검증 후 디스패처에 넣기
+
+    Returns:
+        "duplicate" | "ignored" | 디스패처 결과 ("accepted", "coalesced", ...)
+    """
     # Secret token 검증
     if WEBHOOK_SECRET:
         token = request.headers.get("X-Telegram-Bot-Api-Secret-Token")
@@ -62,21 +109,14 @@ async def webhook_handler(request: Request, background_tasks: BackgroundTasks):
 
     # 중복 처리 방지
     update_id = update.get("update_id")
-    if update_id in _processed_updates:
+    if not processed_updates.add(update_id):
         print(f"[중복] update_id={update_id} 이미 처리됨, 스킵")
-        return JSONResponse({"ok": True})
-
-    # 처리 완료 표시
-    _processed_updates.add(update_id)
-    if len(_processed_updates) > _MAX_PROCESSED_UPDATES:
-        to_remove = list(_processed_updates)[:_MAX_PROCESSED_UPDATES // 2]
-        for item in to_remove:
-            _processed_updates.discard(item)
+        return "duplicate"
 
     # 메시지 추출
     message = update.get("message")
     if not message:
-        return JSONResponse({"ok": True})
+        return "ignored"
 
     chat = message.get("chat", {})
     from_user = message.get("from", {})
@@ -98,27 +138,24 @@ async def webhook_handler(request: Request, background_tasks: BackgroundTasks):
     # 콘솔 로그
     print(f"\n[{msg_info['date']}] {msg_info['from_name']}: {text}")
 
-    # 즉시 타이핑 표시
+    # 채팅별 레인에 넣고 즉시 응답 (타이핑 표시는 레인이 열리면 백그라운드에서 전송)
     chat_id = chat.get("id")
-    print(f"[webhook] 타이핑 표시 시도: chat_id={chat_id}")
-    await send_chat_action(chat_id, "typing")
+    status = dispatcher.submit(chat_id, msg_info)
+    if status != "accepted":
+        print(f"[webhook] 디스패처: {status} (chat_id={chat_id})")
+    return status
 
-    # 백그라운드에서 처리
-    background_tasks.add_task(process_message, msg_info)
 
-    return JSONResponse({"ok": True})
+registry.gauge("dispatch_lanes", "처리 중인 채팅 레인 수").set_function(lambda: dispatcher.stats()["lanes"])
+registry.gauge("dispatch_queued", "레인 대기열에 쌓인 메시지 수").set_function(
+    lambda: dispatcher.stats()["queued"]
+)
 
 
-# ===== 타이핑 유지 =====
-
-async def keep_typing(chat_id: int, stop_event: asyncio.Event):
-    """OpenCode 실행 중 타이핑 표시 유지 (4초마다)"""
-    while not stop_event.is_set():
-        await send_chat_action(chat_id, "typing")
-        try:
-            await asyncio.wait_for(stop_event.wait(), timeout=4.0)
-        except asyncio.TimeoutError:
-            pass
+@router.get("/dispatcher/stats", dependencies=[Depends(local_only)])
+async def dispatcher_stats() -> dict:
+    """디스패처 상태 (레인 수, 대기 메시지, 넘침 통계, 타이핑 표시)"""
+    return {**dispatcher.stats(), "typing": typing_manager.stats()}
 
 
 # ===== OpenCode 핸들러 =====
@@ -143,40 +180,33 @@ async def opencode_handler(msg: dict) -> Optional[str]:
     # 일반 메시지 → OpenCode 실행
     print(f"\n>>> OpenCode 실행: /user-action")
 
-    # 타이핑 표시 시작
-    stop_typing = asyncio.Event()
-    typing_task = asyncio.create_task(keep_typing(chat_id, stop_typing))
-
+    # 실행 중 진행 상황을 메시지 하나로 갱신 (성공하면 삭제)
+    progress = ProgressMessage(chat_id) if STREAM_PROGRESS else None
+    result = None
     try:
-        process = await asyncio.create_subprocess_exec(
-            "opencode", "run", "/user-action", "-m", "zai-coding-plan/glm-4.7",
-            cwd=str(PROJECT_ROOT),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-
-        stdout, stderr = await asyncio.wait_for(
-            process.communicate(),
-            timeout=300.0  # 5분 타임아웃
+        # 워커 풀에서 실행 (같은 chat_id는 순서대로 하나씩)
+        result = await pool.run(
+            user_action_args(),
+            key=chat_id,
+            timeout=300.0,  # 5분 타임아웃
+            on_line=progress.feed if progress else None,
         )
 
-        if process.returncode == 0:
-            print(f">>> OpenCode 완료")
+        if result["ok"]:
+            print(f">>> OpenCode 완료 (대기 {result['wait_time']:.1f}s, 실행 {result['run_time']:.1f}s)")
+        elif result["timed_out"]:
+            print(">>> OpenCode 타임아웃")
         else:
-            print(f">>> OpenCode 에러: {stderr.decode()}")
+            print(f">>> OpenCode 에러: {result['stderr']}")
 
-    except asyncio.TimeoutError:
-        print(">>> OpenCode 타임아웃")
+    except PoolBusyError as e:
+        print(f">>> OpenCode 대기열 초과: {e}")
+        return "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요."
     except Exception as e:
         print(f">>> OpenCode 실행 실패: {e}")
     finally:
-        # 타이핑 표시 중지
-        stop_typing.set()
-        typing_task.cancel()
-        try:
-            await typing_task
-        except asyncio.CancelledError:
-            pass
+        if progress:
+            await progress.finish(result)
 
     # OpenCode가 직접 send_telegram.py로 응답하므로 여기선 None 반환
     return None
@@ -0,0 +1,286 @@
+"""스케줄러 작업 저장소 (SQLite)
+
+APScheduler 기본 MemoryJobStore는 재시작(Railway 재배포 포함)마다 사용자가 만든 작업을 잃는다.
+표준 라이브러리 sqlite3만으로 APScheduler 작업 상태와 작업 메타데이터를 한 파일에 저장한다.
+
+- apscheduler_jobs: APScheduler 작업 상태 (SQLAlchemyJobStore와 같은 구조, next_run_time 인덱스)
+- job_meta: 프롬프트(content), 일정 표현식, 마지막 실행 시각/결과
+- job_runs: 실행 기록 (대기/실행 시간, 결과), 최근 N개만 보관
+- prefetch_cache: 사전 수집 명령 결과 (TTL 캐시)
+
+시작 시에는 next_run_time만 읽어 다음 깨어날 시각을 정하고, 작업 상태는 실행할 때만 복원한다.
+"""
+
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from apscheduler.job import Job
+from apscheduler.jobstores.base import BaseJobStore, ConflictingIdError, JobLookupError
+from apscheduler.util import datetime_to_utc_timestamp, utc_timestamp_to_datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apscheduler_jobs (
+    id TEXT PRIMARY KEY,
+    next_run_time REAL,
+    job_state BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_apscheduler_next_run ON apscheduler_jobs (next_run_time);
+CREATE TABLE IF NOT EXISTS job_meta (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,             -- cron | once
+    schedule TEXT NOT NULL,         -- cron 표현식 또는 실행 시각
+    content TEXT NOT NULL,
+    prefetch TEXT,                  -- 사전 수집 단계 (JSON 목록)
+    created_at REAL NOT NULL,
+    last_run_at REAL,
+    last_status TEXT,               -- ok | failed | timeout | missed
+    last_duration REAL,
+    last_error TEXT
+);
+CREATE TABLE IF NOT EXISTS job_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    source TEXT NOT NULL,           -- schedule | manual
+    status TEXT NOT NULL,           -- running | ok | failed | timeout | missed | skipped | interrupted
+    queued_at REAL NOT NULL,
+    prefetch_time REAL,
+    wait_time REAL,
+    duration REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_job_runs_job ON job_runs (job_id, run_id);
+CREATE TABLE IF NOT EXISTS prefetch_cache (
+    key TEXT PRIMARY KEY,
+    output TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+# 이전 버전 DB에 없는 컬럼 (테이블, 컬럼, 타입)
+_ADDED_COLUMNS = [
+    ("job_meta", "prefetch", "TEXT"),
+    ("job_runs", "prefetch_time", "REAL"),
+]
+
+
+class SQLiteJobStore(BaseJobStore):
+    """sqlite3 기반 APScheduler 작업 저장소 + 작업 메타데이터"""
+
+    def __init__(self, path: Path, pickle_protocol: int = pickle.HIGHEST_PROTOCOL):
+        super().__init__()
+        self.path = Path(path)
+        self.pickle_protocol = pickle_protocol
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 스케줄러(이벤트 루프)와 API 핸들러가 같은 연결을 쓰므로 잠금으로 직렬화
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        for table, column, column_type in _ADDED_COLUMNS:
+            columns = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self.conn.execute(sql, params)
+
+    # ===== APScheduler BaseJobStore =====
+
+    def lookup_job(self, job_id):
+        row = self._execute("SELECT job_state FROM apscheduler_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._reconstitute_job(row["job_state"]) if row else None
+
+    def get_due_jobs(self, now):
+        return self._get_jobs("WHERE next_run_time <= ?", (datetime_to_utc_timestamp(now),))
+
+    def get_next_run_time(self):
+        row = self._execute(
+            "SELECT next_run_time FROM apscheduler_jobs "
+            "WHERE next_run_time IS NOT NULL ORDER BY next_run_time LIMIT 1"
+        ).fetchone()
+        return utc_timestamp_to_datetime(row["next_run_time"]) if row else None
+
+    def get_all_jobs(self):
+        jobs = self._get_jobs()
+        self._fix_paused_jobs_sorting(jobs)
+        return jobs
+
+    def add_job(self, job):
+        try:
+            self._execute(
+                "INSERT INTO apscheduler_jobs (id, next_run_time, job_state) VALUES (?, ?, ?)",
+                (job.id, datetime_to_utc_timestamp(job.next_run_time), self._dump(job)),
+            )
+        except sqlite3.IntegrityError:
+            raise ConflictingIdError(job.id)
+
+    def update_job(self, job):
+        cursor = self._execute(
+            "UPDATE apscheduler_jobs SET next_run_time = ?, job_state = ? WHERE id = ?",
+            (datetime_to_utc_timestamp(job.next_run_time), self._dump(job), job.id),
+        )
+        if cursor.rowcount == 0:
+            raise JobLookupError(job.id)
+
+    def remove_job(self, job_id):
+        cursor = self._execute("DELETE FROM apscheduler_jobs WHERE id = ?", (job_id,))
+        if cursor.rowcount == 0:
+            raise JobLookupError(job_id)
+
+    def remove_all_jobs(self):
+        self._execute("DELETE FROM apscheduler_jobs")
+
+    def shutdown(self):
+        with self._lock:
+            self.conn.close()
+
+    def _dump(self, job) -> bytes:
+        return pickle.dumps(job.__getstate__(), self.pickle_protocol)
+
+    def _reconstitute_job(self, job_state: bytes):
+        state = pickle.loads(job_state)
+        state["jobstore"] = self
+        job = Job.__new__(Job)
+        job.__setstate__(state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _get_jobs(self, where: str = "", params: tuple = ()) -> list:
+        rows = self._execute(
+            f"SELECT id, job_state FROM apscheduler_jobs {where} ORDER BY next_run_time", params
+        ).fetchall()
+
+        jobs, failed = [], []
+        for row in rows:
+            try:
+                jobs.append(self._reconstitute_job(row["job_state"]))
+            except BaseException:
+                # 함수 경로가 바뀌는 등 복원할 수 없는 작업은 제거
+                self._logger.exception('Unable to restore job "%s" -- removing it', row["id"])
+                failed.append(row["id"])
+
+        if failed:
+            self._execute(
+                f"DELETE FROM apscheduler_jobs WHERE id IN ({','.join('?' * len(failed))})", tuple(failed)
+            )
+        return jobs
+
+    # ===== 작업 메타데이터 =====
+
+    def set_meta(
+        self,
+        job_id: str,
+        kind: str,
+        schedule: str,
+        content: str,
+        prefetch: Optional[list[dict]] = None,
+    ):
+        """작업 메타데이터 기록 (같은 id면 일정/내용만 교체, 실행 기록은 유지)"""
+        self._execute(
+            "INSERT INTO job_meta (id, kind, schedule, content, prefetch, created_at) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET kind = excluded.kind, schedule = excluded.schedule, "
+            "content = excluded.content, prefetch = excluded.prefetch",
+            (job_id, kind, schedule, content, json.dumps(prefetch or [], ensure_ascii=False), time.time()),
+        )
+
+    @staticmethod
+    def _meta(row: sqlite3.Row) -> dict:
+        meta = dict(row)
+        meta["prefetch"] = json.loads(meta["prefetch"]) if meta.get("prefetch") else []
+        return meta
+
+    def get_meta(self, job_id: str) -> Optional[dict]:
+        row = self._execute("SELECT * FROM job_meta WHERE id = ?", (job_id,)).fetchone()
+        return self._meta(row) if row else None
+
+    def all_meta(self) -> dict[str, dict]:
+        return {row["id"]: self._meta(row) for row in self._execute("SELECT * FROM job_meta")}
+
+    def delete_meta(self, job_id: str):
+        self._execute("DELETE FROM job_meta WHERE id = ?", (job_id,))
+
+    # ===== 실행 기록 =====
+
+    def start_run(self, job_id: str, source: str, status: str = "running") -> int:
+        """실행 기록 추가. run_id 반환"""
+        cursor = self._execute(
+            "INSERT INTO job_runs (job_id, source, status, queued_at) VALUES (?, ?, ?, ?)",
+            (job_id, source, status, time.time()),
+        )
+        return cursor.lastrowid
+
+    def finish_run(
+        self,
+        run_id: int,
+        status: str,
+        wait_time: Optional[float] = None,
+        duration: Optional[float] = None,
+        error: Optional[str] = None,
+        prefetch_time: Optional[float] = None,
+    ):
+        self._execute(
+            "UPDATE job_runs SET status = ?, prefetch_time = ?, wait_time = ?, duration = ?, error = ? "
+            "WHERE run_id = ?",
+            (status, prefetch_time, wait_time, duration, error, run_id),
+        )
+
+    def runs(self, job_id: Optional[str] = None, limit: int = 50) -> list[dict]:
+        """최근 실행 기록 (최신순)"""
+        if job_id:
+            rows = self._execute(
+                "SELECT * FROM job_runs WHERE job_id = ? ORDER BY run_id DESC LIMIT ?", (job_id, limit)
+            )
+        else:
+            rows = self._execute("SELECT * FROM job_runs ORDER BY run_id DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
+
+    def interrupt_stale_runs(self) -> int:
+        """이전 프로세스에서 실행 중이던 기록 정리 (시작 시 호출)"""
+        return self._execute("UPDATE job_runs SET status = 'interrupted' WHERE status = 'running'").rowcount
+
+    def prune_runs(self, keep: int):
+        """최근 keep개만 남기고 삭제"""
+        self._execute(
+            "DELETE FROM job_runs WHERE run_id <= (SELECT MAX(run_id) FROM job_runs) - ?", (max(keep, 0),)
+        )
+
+    def record_run(
+        self,
+        job_id: str,
+        started_at: float,
+        status: str,
+        duration: Optional[float] = None,
+        error: Optional[str] = None,
+    ):
+        """마지막 실행 시각/결과 기록"""
+        self._execute(
+            "UPDATE job_meta SET last_run_at = ?, last_status = ?, last_duration = ?, last_error = ? "
+            "WHERE id = ?",
+            (started_at, status, duration, error, job_id),
+        )
+
+    # ===== 사전 수집 캐시 =====
+
+    def get_prefetch(self, key: str, ttl: float) -> Optional[dict]:
+        """TTL 안의 캐시 결과 ({"output", "fetched_at"})"""
+        row = self._execute(
+            "SELECT output, fetched_at FROM prefetch_cache WHERE key = ? AND fetched_at >= ?",
+            (key, time.time() - ttl),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def put_prefetch(self, key: str, output: str, fetched_at: float):
+        self._execute(
+            "INSERT INTO prefetch_cache (key, output, fetched_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET output = excluded.output, fetched_at = excluded.fetched_at",
+            (key, output, fetched_at),
+        )
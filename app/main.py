@@ -2,22 +2,38 @@
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 
-from app import scheduler
-from app.handlers import router as webhook_router
+from app import scheduler, telegram
+from app.handlers import dispatcher, processed_updates, router as webhook_router
+from app.metrics import registry as metrics_registry
+from app.outbox import router as outbox_router
 from app.scheduler import router as scheduler_router
-from app.config import BOT_TOKEN
+from app.security import local_only
+from app.typing_indicator import typing_manager
+from app.workers import pool as worker_pool, router as workers_router
+from app.config import BOT_TOKEN, DISPATCH_DRAIN_TIMEOUT, METRICS_TOKEN
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """앱 시작/종료 이벤트"""
     # 시작
+    restored = processed_updates.load()
+    if restored:
+        print(f"[dedup] update_id {restored}개 복원")
+    await telegram.start_client()
+    await worker_pool.start()
     scheduler.start()
     yield
     # 종료
     scheduler.shutdown()
+    await dispatcher.drain(DISPATCH_DRAIN_TIMEOUT)
+    await typing_manager.stop()
+    processed_updates.save()
+    await worker_pool.stop()
+    await telegram.close_client()
 
 
 # FastAPI 앱
@@ -28,8 +44,10 @@ app = FastAPI(
 )
 
 # 라우터 등록
-app.include_router(webhook_router)      # /webhook
+app.include_router(webhook_router)      # /webhook, /dispatcher/stats
 app.include_router(scheduler_router)    # /scheduler/*
+app.include_router(workers_router)      # /workers/*
+app.include_router(outbox_router)       # /outbox/*
 
 
 @app.get("/health")
@@ -41,15 +59,37 @@ async def health_check():
     }
 
 
+def metrics_access(request: Request):
+    """METRICS_TOKEN이 있으면 Bearer 토큰, 없으면 localhost만 허용"""
+    if METRICS_TOKEN:
+        if request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+            raise HTTPException(status_code=403, detail="Forbidden")
+        return
+    local_only(request)
+
+
+@app.get("/metrics", dependencies=[Depends(metrics_access)])
+async def metrics():
+    """Prometheus 메트릭 (텍스트 형식)"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 # CLI 실행용
 if __name__ == "__main__":
     import argparse
     import asyncio
     import uvicorn
 
-    from app.telegram import set_webhook, delete_webhook
+    from app.telegram import set_webhook, delete_webhook, close_client
     from app.config import WEBHOOK_SECRET
 
+    async def run_once(coro):
+        """단발성 API 호출 후 공유 클라이언트 정리"""
+        try:
+            return await coro
+        finally:
+            await close_client()
+
     parser = argparse.ArgumentParser(description="Actionable Finance Server")
     parser.add_argument("--host", default="127.0.0.1", help="호스트 (기본: 127.0.0.1)")
     parser.add_argument("--port", type=int, default=8000, help="포트 (기본: 8000)")
@@ -59,19 +99,22 @@ if __name__ == "__main__":
 
     # Webhook 삭제 모드
     if args.delete_webhook:
-        asyncio.run(delete_webhook())
+        asyncio.run(run_once(delete_webhook()))
         print("Webhook 삭제 완료")
     # Webhook 설정 모드
     elif args.webhook_url:
         webhook_url = args.webhook_url
         if not webhook_url.endswith("/webhook"):
             webhook_url = webhook_url.rstrip("/") + "/webhook"
-        asyncio.run(set_webhook(webhook_url, WEBHOOK_SECRET))
+        asyncio.run(run_once(set_webhook(webhook_url, WEBHOOK_SECRET)))
     # 서버 실행
     else:
         print(f"\n서버 시작: http://{args.host}:{args.port}")
         print("Webhook: /webhook")
         print("Scheduler: /scheduler/*")
+        print("Workers: /workers/stats")
+        print("Outbox: /outbox/*")
         print("Health: /health")
+        print("Metrics: /metrics")
         print("\nCtrl+C로 종료\n")
         uvicorn.run(app, host=args.host, port=args.port, log_level="info")
@@ -0,0 +1,258 @@
+"""Prometheus 형식 메트릭 + 타이밍 스팬
+
+외부 의존성 없이 프로세스 메모리에 카운터/게이지/히스토그램을 쌓고 /metrics 에서 텍스트 형식으로 내보낸다.
+기록은 dict 갱신뿐이라 이벤트 루프를 막지 않는다 (I/O는 스크레이프 시점의 문자열 생성뿐).
+
+- Counter: 누적 횟수 (inc)
+- Gauge: 현재 값 (set) 또는 스크레이프 때 호출할 함수 (set_function)
+- Histogram: 구간별 누적 개수 + 합계 (observe, time)
+- span(): 구간 시간을 히스토그램에 기록하고, METRICS_SPAN_LOG가 켜져 있으면 JSON 한 줄로 출력
+"""
+
+import json
+import math
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+
+from app.config import METRICS_SPAN_LOG
+
+# 짧은 지연 (웹훅 응답, 텔레그램 API, 프로세스 생성)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 긴 작업 (OpenCode 실행, 대기열, 스케줄 지연)
+DURATION_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._function: Optional[Callable[[], object]] = None
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], object]):
+        """스크레이프 때 값 계산. 레이블이 있으면 {레이블 값 튜플: 값} dict 반환"""
+        self._function = function
+
+    def samples(self) -> list[str]:
+        values = dict(self._values)
+        if self._function is not None:
+            try:
+                result = self._function()
+            except Exception as e:
+                print(f"[metrics] {self.name} 계산 실패: {e}")
+                result = {}
+            if isinstance(result, dict):
+                values.update({tuple(str(v) for v in k): val for k, val in result.items()})
+            else:
+                values[()] = result
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values.items()
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 레이블 → [구간별 개수..., +Inf 개수], 합계
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: dict[tuple, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(self._sums[key])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """메트릭 모음 (이름 중복 등록 방지)"""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"이미 등록된 메트릭: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, description, labelnames))
+
+    def gauge(self, name: str, description: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, description, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, description, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+# 프로세스 전역 레지스트리
+registry = Registry()
+
+
+@contextmanager
+def span(name: str, histogram: Optional[Histogram] = None, **labels):
+    """구간 시간 측정 (히스토그램 기록 + 선택적 구조화 로그)
+
+    with span("webhook.ack", WEBHOOK_ACK, result="error") as fields:
+        ...
+        fields["result"] = "accepted"   # 히스토그램 레이블이면 덮어쓰고, 아니면 로그에만 남음
+    """
+    fields: dict = {}
+    started_at = time.perf_counter()
+    error = None
+    try:
+        yield fields
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        elapsed = time.perf_counter() - started_at
+        if histogram is not None:
+            histogram.observe(elapsed, **{**labels, **fields})
+        if METRICS_SPAN_LOG:
+            record = {"span": name, "ms": round(elapsed * 1000, 2), **labels, **fields}
+            if error:
+                record["error"] = error
+            print(json.dumps(record, ensure_ascii=False, default=str))
+
+
+# ===== 앱 메트릭 =====
+
+WEBHOOK_ACK = registry.histogram(
+    "webhook_ack_seconds", "웹훅 요청 수신부터 200 응답까지", ["result"]
+)
+DISPATCH_QUEUE_WAIT = registry.histogram(
+    "dispatch_queue_wait_seconds", "채팅 레인 대기열에서 처리 시작까지", buckets=DURATION_BUCKETS
+)
+OPENCODE_QUEUE_WAIT = registry.histogram(
+    "opencode_queue_wait_seconds", "워커 풀에서 워커를 받기까지", ["priority"], buckets=DURATION_BUCKETS
+)
+OPENCODE_SPAWN = registry.histogram(
+    "opencode_spawn_seconds", "opencode run 프로세스 생성 시간", ["mode"]
+)
+OPENCODE_RUN = registry.histogram(
+    "opencode_run_seconds", "opencode run 실행 시간", ["priority", "outcome"], buckets=DURATION_BUCKETS
+)
+TELEGRAM_API = registry.histogram(
+    "telegram_api_seconds", "Bot API 응답 헤더 수신까지", ["method", "status"]
+)
+TELEGRAM_API_ERRORS = registry.counter(
+    "telegram_api_errors_total", "Bot API 호출 실패 (네트워크/타임아웃)", ["method"]
+)
+SCHEDULER_LATENESS = registry.histogram(
+    "scheduler_lateness_seconds", "예정 시각 대비 실행 제출 지연", ["job"], buckets=DURATION_BUCKETS
+)
+SCHEDULER_RUNS = registry.counter(
+    "scheduler_runs_total", "스케줄 작업 실행 결과", ["job", "status"]
+)
+SCHEDULER_PREFETCH = registry.histogram(
+    "scheduler_prefetch_seconds", "스케줄 작업 사전 수집 시간", ["job"], buckets=DURATION_BUCKETS
+)
@@ -0,0 +1,389 @@
+"""텔레그램 발신 큐
+
+모든 사용자 대상 전송(sendMessage, sendPhoto, editMessageText)을 한 곳에서 속도 제한한다.
+
+- 토큰 버킷: 봇 전체(초당 30) + 채팅별(개인 초당 1, 그룹 분당 20, 짧은 버스트 허용)
+- 429 응답의 retry_after 동안 해당 채팅 버킷을 멈추고 재시도
+- 긴 메시지는 4096자 단위로 나눠 같은 채팅에서 끊기지 않게 연속 전송
+- CLI 스크립트는 /outbox/sendMessage, /outbox/sendPhoto (localhost 전용)로 같은 큐 사용
+- /outbox/stats (localhost 전용) 에서 처리량, 대기 시간, 429 횟수 확인
+"""
+
+import asyncio
+import time
+from collections import deque
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+
+from app.config import (
+    OUTBOX_CHAT_BURST,
+    OUTBOX_CHAT_RATE,
+    OUTBOX_GLOBAL_RATE,
+    OUTBOX_GROUP_RATE,
+    OUTBOX_MAX_RETRIES,
+)
+from app.security import local_only
+from app.telegram import call_api
+
+# 내부 API 라우터
+router = APIRouter(prefix="/outbox", tags=["outbox"])
+
+# 텔레그램 메시지/캡션 길이 제한
+MAX_MESSAGE_LENGTH = 4096
+MAX_CAPTION_LENGTH = 1024
+
+# 처리량 계산 구간 (초)
+_THROUGHPUT_WINDOW = 60.0
+
+# 채팅 상태 정리 기준 크기
+_MAX_TRACKED_CHATS = 1000
+
+ApiCall = Callable[..., Awaitable[dict]]
+
+
+def split_text(text: str, max_length: int = MAX_MESSAGE_LENGTH) -> list[str]:
+    """긴 메시지를 줄바꿈 기준으로 분할"""
+    chunks = []
+    while text:
+        if len(text) <= max_length:
+            chunks.append(text)
+            break
+        split_pos = text.rfind("\n", 0, max_length)
+        if split_pos == -1:
+            split_pos = max_length
+        chunks.append(text[:split_pos])
+        text = text[split_pos:].lstrip("\n")
+    return chunks
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        # 429 retry_after 동안 토큰이 있어도 대기
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """토큰 하나를 쓸 수 있을 때까지 남은 시간 (초)"""
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1.0:
+            wait = max(wait, (1.0 - self.tokens) / self.rate)
+        return wait
+
+    def take(self):
+        self.tokens -= 1.0
+
+    def pause(self, seconds: float):
+        """seconds 동안 전송 중지 (버킷도 비움)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    def idle(self, now: float) -> bool:
+        """가득 차 있고 멈춤 상태가 아님 (정리해도 동작이 같음)"""
+        self._refill(now)
+        return self.tokens >= self.capacity and now >= self.blocked_until
+
+
+class _Chat:
+    """채팅 하나의 버킷과 전송 순서 락"""
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.lock = asyncio.Lock()
+
+
+class Outbox:
+    """전역 + 채팅별 토큰 버킷 발신 큐"""
+
+    def __init__(
+        self,
+        call: ApiCall = call_api,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        chat_burst: int = 3,
+        max_retries: int = 3,
+    ):
+        self.call = call
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max(0, max_retries)
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: dict[object, _Chat] = {}
+
+        # 통계
+        self._sent = 0
+        self._failed = 0
+        self._throttled = 0
+        self._retries = 0
+        self._waiting = 0
+        self._acquired = 0
+        self._sent_times: deque[float] = deque()
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _chat(self, chat_id: object) -> _Chat:
+        # 앱 내부(int)와 CLI 요청(str)이 같은 버킷을 쓰도록 문자열 키 사용
+        key = str(chat_id)
+        chat = self._chats.get(key)
+        if chat is None:
+            self._prune()
+            # 그룹/채널은 음수 chat_id
+            rate = self.group_rate if _is_group(chat_id) else self.chat_rate
+            chat = self._chats[key] = _Chat(TokenBucket(rate, self.chat_burst))
+        return chat
+
+    def _prune(self):
+        """버킷이 가득 찬 유휴 채팅 정리"""
+        if len(self._chats) < _MAX_TRACKED_CHATS:
+            return
+        now = time.monotonic()
+        for chat_id, chat in list(self._chats.items()):
+            if not chat.lock.locked() and chat.bucket.idle(now):
+                del self._chats[chat_id]
+
+    async def _acquire(self, chat: _Chat):
+        """전역/채팅 버킷 양쪽에서 토큰 하나씩 획득"""
+        started_at = time.monotonic()
+        self._waiting += 1
+        try:
+            while True:
+                now = time.monotonic()
+                wait = max(self._global.delay(now), chat.bucket.delay(now))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+        finally:
+            self._waiting -= 1
+        self._global.take()
+        chat.bucket.take()
+
+        waited = time.monotonic() - started_at
+        self._acquired += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    async def _send(self, chat: _Chat, method: str, **request) -> dict:
+        """토큰 획득 후 호출, 429면 retry_after만큼 멈춘 뒤 재시도"""
+        attempt = 0
+        while True:
+            await self._acquire(chat)
+            result = await self.call(method, **request)
+            if result.get("ok") or result.get("error_code") != 429 or attempt >= self.max_retries:
+                break
+            retry_after = (result.get("parameters") or {}).get("retry_after", 1)
+            print(f"[outbox] 429 {method}, {retry_after}초 후 재시도")
+            self._throttled += 1
+            self._retries += 1
+            attempt += 1
+            chat.bucket.pause(retry_after)
+
+        if result.get("ok"):
+            self._sent += 1
+            now = time.monotonic()
+            self._sent_times.append(now)
+            while self._sent_times and self._sent_times[0] < now - _THROUGHPUT_WINDOW:
+                self._sent_times.popleft()
+        elif not _is_parse_error(result):
+            # 파싱 실패는 plain text 재시도가 이어지므로 실패로 세지 않음
+            self._failed += 1
+        return result
+
+    async def send_text(self, chat_id: object, text: str, parse_mode: Optional[str] = "Markdown") -> dict:
+        """메시지 전송 (긴 메시지는 분할해 연속 전송)
+
+        Returns:
+            {"ok", "chunks", "sent", "description", "message_ids"}
+        """
+        chunks = split_text(text)
+        chat = self._chat(chat_id)
+        sent = 0
+        description = None
+        message_ids = []
+
+        # 락을 잡고 보내서 다른 전송이 청크 사이에 끼어들지 않게 함
+        async with chat.lock:
+            for chunk in chunks:
+                payload = {"chat_id": chat_id, "text": chunk, "parse_mode": parse_mode}
+                result = await self._send(chat, "sendMessage", json=payload)
+                # Markdown 파싱 실패시 plain text로 재시도
+                if not result.get("ok") and parse_mode and _is_parse_error(result):
+                    payload["parse_mode"] = None
+                    result = await self._send(chat, "sendMessage", json=payload)
+                if not result.get("ok"):
+                    description = result.get("description", "Unknown error")
+                    print(f"[outbox] chat_id={chat_id} 전송 실패: {description}")
+                    break
+                sent += 1
+                message_ids.append((result.get("result") or {}).get("message_id"))
+
+        return {
+            "ok": sent == len(chunks),
+            "chunks": len(chunks),
+            "sent": sent,
+            "description": description,
+            "message_ids": message_ids,
+        }
+
+    async def edit_text(
+        self,
+        chat_id: object,
+        message_id: int,
+        text: str,
+        parse_mode: Optional[str] = None,
+    ) -> dict:
+        """보낸 메시지 내용 교체 (진행 상황 표시용, 4096자 초과분은 잘라냄)
+
+        편집도 채팅별 전송 한도에 포함되므로 같은 버킷을 쓴다.
+        """
+        if len(text) > MAX_MESSAGE_LENGTH:
+            text = text[:MAX_MESSAGE_LENGTH - 3] + "..."
+        payload = {"chat_id": chat_id, "message_id": message_id, "text": text, "parse_mode": parse_mode}
+        chat = self._chat(chat_id)
+        async with chat.lock:
+            result = await self._send(chat, "editMessageText", json=payload)
+        # 같은 내용으로 편집하면 400이 오지만 결과는 같음
+        if not result.get("ok") and "not modified" in result.get("description", ""):
+            return {"ok": True, "description": None}
+        if not result.get("ok"):
+            print(f"[outbox] chat_id={chat_id} 편집 실패: {result.get('description')}")
+        return {"ok": bool(result.get("ok")), "description": result.get("description")}
+
+    async def delete_message(self, chat_id: object, message_id: int) -> bool:
+        """메시지 삭제 (속도 제한 대상이 아니므로 버킷을 거치지 않음)"""
+        result = await self.call("deleteMessage", json={"chat_id": chat_id, "message_id": message_id})
+        return bool(result.get("ok"))
+
+    async def send_photo(
+        self,
+        chat_id: object,
+        photo: bytes,
+        filename: str = "photo.png",
+        caption: Optional[str] = None,
+        parse_mode: Optional[str] = "Markdown",
+    ) -> dict:
+        """이미지 전송"""
+        data = {"chat_id": str(chat_id)}
+        if caption:
+            if len(caption) > MAX_CAPTION_LENGTH:
+                caption = caption[:MAX_CAPTION_LENGTH - 3] + "..."
+            data["caption"] = caption
+            if parse_mode:
+                data["parse_mode"] = parse_mode
+
+        chat = self._chat(chat_id)
+        async with chat.lock:
+            result = await self._send(chat, "sendPhoto", data=data, files={"photo": (filename, photo)})
+            if not result.get("ok") and "parse_mode" in data and _is_parse_error(result):
+                data.pop("parse_mode")
+                result = await self._send(chat, "sendPhoto", data=data, files={"photo": (filename, photo)})
+
+        if not result.get("ok"):
+            print(f"[outbox] chat_id={chat_id} 이미지 전송 실패: {result.get('description')}")
+        return {"ok": bool(result.get("ok")), "description": result.get("description")}
+
+    def stats(self) -> dict:
+        """발신 큐 상태 및 처리량"""
+        now = time.monotonic()
+        recent = sum(1 for t in self._sent_times if t >= now - _THROUGHPUT_WINDOW)
+        return {
+            "sent": self._sent,
+            "failed": self._failed,
+            "throttled": self._throttled,
+            "retries": self._retries,
+            "waiting": self._waiting,
+            "chats": len(self._chats),
+            "throughput_per_sec": round(recent / _THROUGHPUT_WINDOW, 3),
+            "sent_last_minute": recent,
+            "wait_time": {
+                "avg": round(self._wait_total / self._acquired, 3) if self._acquired else 0.0,
+                "max": round(self._wait_max, 3),
+            },
+            "limits": {
+                "global_rate": self._global.rate,
+                "chat_rate": self.chat_rate,
+                "group_rate": round(self.group_rate, 3),
+                "chat_burst": self.chat_burst,
+            },
+        }
+
+
+def _is_group(chat_id: object) -> bool:
+    try:
+        return int(chat_id) < 0
+    except (TypeError, ValueError):
+        # @channelusername
+        return True
+
+
+def _is_parse_error(result: dict) -> bool:
+    return "can't parse" in result.get("description", "").lower()
+
+
+# 프로세스 전역 발신 큐
+outbox = Outbox(
+    global_rate=OUTBOX_GLOBAL_RATE,
+    chat_rate=OUTBOX_CHAT_RATE,
+    group_rate=OUTBOX_GROUP_RATE,
+    chat_burst=OUTBOX_CHAT_BURST,
+    max_retries=OUTBOX_MAX_RETRIES,
+)
+
+
+async def send_message(chat_id: int, text: str, parse_mode: str = "Markdown") -> bool:
+    """텔레그램으로 메시지 전송 (발신 큐 경유)"""
+    result = await outbox.send_text(chat_id, text, parse_mode)
+    return result["ok"]
+
+
+# ===== 내부 API 엔드포인트 (CLI 스크립트용) =====
+
+class MessageRequest(BaseModel):
+    """메시지 전송 요청"""
+    chat_id: str
+    text: str
+    parse_mode: Optional[str] = "Markdown"
+
+
+class PhotoRequest(BaseModel):
+    """이미지 전송 요청 (같은 호스트의 파일 경로)"""
+    chat_id: str
+    path: str
+    caption: Optional[str] = None
+    parse_mode: Optional[str] = "Markdown"
+
+
+@router.post("/sendMessage", dependencies=[Depends(local_only)])
+async def outbox_send_message(req: MessageRequest) -> dict:
+    """메시지 전송 (분할/속도 제한/재시도 포함)"""
+    return await outbox.send_text(req.chat_id, req.text, req.parse_mode)
+
+
+@router.post("/sendPhoto", dependencies=[Depends(local_only)])
+async def outbox_send_photo(req: PhotoRequest) -> dict:
+    """이미지 파일 전송"""
+    photo_path = Path(req.path)
+    if not photo_path.is_file():
+        raise HTTPException(status_code=404, detail=f"파일을 찾을 수 없음: {req.path}")
+    photo = await asyncio.to_thread(photo_path.read_bytes)
+    return await outbox.send_photo(req.chat_id, photo, photo_path.name, req.caption, req.parse_mode)
+
+
+@router.get("/stats", dependencies=[Depends(local_only)])
+async def outbox_stats() -> dict:
+    """발신 큐 상태 (처리량, 대기 시간, 429 횟수)"""
+    return outbox.stats()
@@ -0,0 +1,185 @@
+"""스케줄 작업 사전 수집 (pre-fetch)
+
+스케줄 프롬프트(일일 요약 등)는 에이전트가 수집 → 파일 읽기 → 시세 조회 스크립트를 하나씩
+호출하느라 시간 대부분을 쓴다. 작업에 필요한 데이터 스크립트를 선언해 두면 OpenCode를
+띄우기 전에 병렬로 실행하고, 결과를 프롬프트에 붙여 도구 호출 왕복을 줄인다.
+
+단계 형식 (작업의 prefetch 목록):
+    {"name": "prices", "run": [".opencode/skills/upbit-trading/scripts/get_ticker.py", "BTC"], "ttl": 60}
+    {"name": "messages", "run": [...collect_messages.py, "--hours", "24"],
+     "file": "collected_messages/{date}.md", "ttl": 600}
+
+- run: 프로젝트 루트 기준 명령. 첫 항목은 .opencode/skills/*/scripts/ 또는 scripts/ 아래 .py만 허용,
+  서버와 같은 파이썬으로 실행
+- file: 있으면 stdout 대신 실행 후 이 파일 내용을 사용 (collected_messages/, .cache/ 아래만 허용)
+- {date}: 오늘 날짜 (YYYY-MM-DD, TIMEZONE 기준)
+- ttl: 같은 명령 결과를 재사용할 시간(초). 0이면 항상 실행. 실패한 결과는 캐시하지 않음
+"""
+
+import asyncio
+import hashlib
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from app.config import PREFETCH_MAX_CHARS, PREFETCH_TIMEOUT, PROJECT_ROOT, TIMEZONE
+
+
+# file로 읽을 수 있는 데이터 디렉토리 (프로젝트 루트 기준)
+DATA_DIRS = ("collected_messages", ".cache")
+
+
+def _expand(value: str, date: str) -> str:
+    return value.replace("{date}", date)
+
+
+def _resolve(value: str) -> Path:
+    # {date}는 경로 구분자를 만들지 않으므로 아무 날짜로 치환해 검사
+    return (PROJECT_ROOT / _expand(value, "0000-00-00")).resolve()
+
+
+def validate_script(script: str) -> str:
+    """run 첫 항목 검사: .opencode/skills/*/scripts/ 또는 scripts/ 아래 .py만 허용
+
+    Raises:
+        ValueError: 허용 범위 밖의 명령
+    """
+    path = _resolve(script)
+    try:
+        parts = path.relative_to(PROJECT_ROOT.resolve()).parts
+    except ValueError:
+        parts = ()
+    allowed = path.suffix == ".py" and (
+        (len(parts) >= 5 and parts[:2] == (".opencode", "skills") and parts[3] == "scripts")
+        or (len(parts) >= 2 and parts[0] == "scripts")
+    )
+    if not allowed:
+        raise ValueError(f"허용되지 않는 명령: {script} (.opencode/skills/*/scripts/ 또는 scripts/ 아래 .py만 가능)")
+    return script
+
+
+def validate_file(file: str) -> str:
+    """file 검사: 데이터 디렉토리(DATA_DIRS) 아래만 허용
+
+    Raises:
+        ValueError: 허용 범위 밖의 경로
+    """
+    path = _resolve(file)
+    root = PROJECT_ROOT.resolve()
+    if not any(path.is_relative_to(root / d) and path != root / d for d in DATA_DIRS):
+        raise ValueError(f"허용되지 않는 파일: {file} ({', '.join(DATA_DIRS)} 아래만 가능)")
+    return file
+
+
+def _command(run: list[str]) -> list[str]:
+    return [sys.executable, *run]
+
+
+def _cache_key(run: list[str], file: Optional[str]) -> str:
+    return hashlib.sha256(json.dumps([run, file], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _truncate(text: str, source: str) -> str:
+    if len(text) <= PREFETCH_MAX_CHARS:
+        return text
+    return text[:PREFETCH_MAX_CHARS] + f"\n... (이하 {len(text) - PREFETCH_MAX_CHARS:,}자 생략, 전체: {source})"
+
+
+async def run_step(step: dict, date: str, store) -> dict:
+    """단계 하나 실행 (TTL 캐시 우선)
+
+    Returns:
+        {"name", "ok", "output", "cached", "fetched_at", "elapsed"}
+    """
+    run = [_expand(arg, date) for arg in step["run"]]
+    file = _expand(step["file"], date) if step.get("file") else None
+    ttl = step.get("ttl", 0)
+    key = _cache_key(run, file)
+    started_at = time.monotonic()
+
+    cached = store.get_prefetch(key, ttl) if ttl > 0 else None
+    if cached:
+        return {
+            "name": step["name"],
+            "ok": True,
+            "output": cached["output"],
+            "cached": True,
+            "fetched_at": cached["fetched_at"],
+            "elapsed": time.monotonic() - started_at,
+        }
+
+    result = {"name": step["name"], "ok": False, "output": "", "cached": False, "fetched_at": time.time()}
+    process = None
+    try:
+        # 검사 도입 전에 저장된 작업도 실행 전에 다시 확인
+        if not run:
+            raise ValueError("run이 비어 있음")
+        validate_script(step["run"][0])
+        if step.get("file"):
+            validate_file(step["file"])
+        process = await asyncio.create_subprocess_exec(
+            *_command(run),
+            cwd=str(PROJECT_ROOT),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=PREFETCH_TIMEOUT)
+        if process.returncode != 0:
+            message = (stderr or stdout).decode(errors="replace").strip()[-500:]
+            result["output"] = f"실패 (exit {process.returncode}): {message}"
+        elif file:
+            path = PROJECT_ROOT / file
+            if path.exists():
+                result["output"] = _truncate(path.read_text(encoding="utf-8"), file)
+                result["ok"] = True
+            else:
+                result["output"] = f"실패: 파일이 생성되지 않음 ({file})"
+        else:
+            result["output"] = _truncate(stdout.decode(errors="replace").strip(), " ".join(run))
+            result["ok"] = True
+    except asyncio.TimeoutError:
+        result["output"] = f"실패: 타임아웃 ({PREFETCH_TIMEOUT:.0f}초)"
+        if process and process.returncode is None:
+            process.kill()
+            await process.wait()
+    except Exception as e:
+        result["output"] = f"실패: {e}"
+
+    if result["ok"] and ttl > 0:
+        store.put_prefetch(key, result["output"], result["fetched_at"])
+    result["elapsed"] = time.monotonic() - started_at
+    return result
+
+
+async def run_prefetch(steps: list[dict], store) -> tuple[str, list[dict]]:
+    """모든 단계를 병렬 실행해 프롬프트에 붙일 섹션 생성
+
+    Returns:
+        (프롬프트 섹션, 단계별 결과)
+    """
+    if not steps:
+        return "", []
+
+    tz = ZoneInfo(str(TIMEZONE))
+    date = datetime.now(tz).strftime("%Y-%m-%d")
+    results = await asyncio.gather(*(run_step(step, date, store) for step in steps))
+
+    lines = [
+        "## 사전 수집 데이터",
+        "",
+        "아래 데이터는 실행 전에 이미 수집했다. 같은 스크립트를 다시 실행하지 말고 이 내용을 사용한다 (실패한 항목만 직접 실행).",
+        "",
+    ]
+    for r in results:
+        fetched = datetime.fromtimestamp(r["fetched_at"], tz).strftime("%H:%M:%S")
+        lines.append(f"### {r['name']} ({fetched} 기준{', 캐시' if r['cached'] else ''})")
+        lines.append("")
+        lines.append("```")
+        lines.append(r["output"] or "(출력 없음)")
+        lines.append("```")
+        lines.append("")
+    return "\n".join(lines), results
@@ -1,25 +1,78 @@
-"""스케줄러 서비스"""
+"""스케줄러 서비스
+
+작업은 SQLite 작업 저장소(app.jobstore)에 저장되어 재시작 후에도 유지된다.
+서버가 꺼져 있는 동안 놓친 실행은 SCHEDULER_MISFIRE_GRACE 안이면 시작 직후 실행한다.
+
+실행은 웹훅과 같은 OpenCode 워커 풀을 낮은 우선순위로 사용하고, 작업별 동시 실행 수를
+SCHEDULER_MAX_INSTANCES로 제한한다. 실행 기록은 /scheduler/runs 에서 조회한다.
+예정 시각 대비 지연과 실행 결과는 /metrics 에도 기록한다.
+"""
 
 import asyncio
+import time
 from datetime import datetime
 from typing import Optional
 
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-
-from app.config import PROJECT_ROOT, TIMEZONE
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, field_validator
+
+from app.config import (
+    SCHEDULER_COALESCE,
+    SCHEDULER_DB,
+    SCHEDULER_MAX_INSTANCES,
+    SCHEDULER_MISFIRE_GRACE,
+    SCHEDULER_RUN_HISTORY,
+    SCHEDULER_TIMEOUT,
+    TIMEZONE,
+)
+from app.jobstore import SQLiteJobStore
+from app.metrics import SCHEDULER_LATENESS, SCHEDULER_PREFETCH, SCHEDULER_RUNS
+from app.prefetch import run_prefetch, validate_file, validate_script
+from app.security import local_only
+from app.streaming import parse_event
+from app.workers import PRIORITY_SCHEDULED, pool
+
+# 작업 저장소 (APScheduler 작업 상태 + content/실행 기록)
+job_store = SQLiteJobStore(SCHEDULER_DB)
 
 # 스케줄러 인스턴스
-scheduler = AsyncIOScheduler(timezone=TIMEZONE)
-
-# 작업별 content 저장소 (APScheduler는 kwargs 검증이 엄격해서 별도 저장)
-_job_content: dict[str, str] = {}
+scheduler = AsyncIOScheduler(
+    timezone=TIMEZONE,
+    jobstores={"default": job_store},
+    job_defaults={
+        "misfire_grace_time": SCHEDULER_MISFIRE_GRACE,
+        "coalesce": SCHEDULER_COALESCE,
+        "max_instances": SCHEDULER_MAX_INSTANCES,
+    },
+)
 
 # 내부 API 라우터 (localhost에서만 접근 가능)
-router = APIRouter(prefix="/scheduler", tags=["scheduler"])
+router = APIRouter(prefix="/scheduler", tags=["scheduler"], dependencies=[Depends(local_only)])
+
+
+class PrefetchStep(BaseModel):
+    """OpenCode 실행 전에 병렬로 돌릴 데이터 스크립트 (app.prefetch 참고)"""
+    name: str
+    run: list[str]  # 프로젝트 루트 기준 명령 (예: [".opencode/skills/upbit-trading/scripts/get_ticker.py", "BTC"])
+    file: Optional[str] = None  # 있으면 stdout 대신 이 파일 내용 사용 ({date} 치환)
+    ttl: float = 0  # 결과 재사용 시간 (초)
+
+    @field_validator("run")
+    @classmethod
+    def _check_run(cls, run: list[str]) -> list[str]:
+        if not run:
+            raise ValueError("run이 비어 있음")
+        validate_script(run[0])
+        return run
+
+    @field_validator("file")
+    @classmethod
+    def _check_file(cls, file: Optional[str]) -> Optional[str]:
+        return validate_file(file) if file else file
 
 
 class JobCreate(BaseModel):
@@ -27,6 +80,7 @@ class JobCreate(BaseModel):
     id: str
     cron: str  # "0 8 * * *" 형식
     content: str  # OpenCode에 전달할 프롬프트
+    prefetch: list[PrefetchStep] = []
 
 
 class OneTimeJobCreate(BaseModel):
@@ -34,6 +88,7 @@ class OneTimeJobCreate(BaseModel):
     id: str
     run_at: str  # "2024-01-15 15:30" 또는 "15:30" (오늘)
     content: str  # OpenCode에 전달할 프롬프트
+    prefetch: list[PrefetchStep] = []
 
 
 class JobResponse(BaseModel):
@@ -44,47 +99,180 @@ class JobResponse(BaseModel):
     next_run: Optional[str] = None
 
 
-async def run_scheduled_task(content: str) -> bool:
-    """스케줄 작업 실행 - content를 OpenCode에 전달"""
+def _log_progress(line: str):
+    """스케줄 실행 중 도구 호출/에러를 바로 로그에 남김 (끝날 때까지 기다리지 않음)"""
+    event = parse_event(line)
+    if event and event["kind"] in ("tool", "error"):
+        print(f">>> [Scheduler] {event['kind']}: {event['text'][:200]}")
+
+
+async def run_scheduled_task(content: str, prefetch: Optional[list[dict]] = None) -> dict:
+    """스케줄 작업 실행 - content를 OpenCode에 전달
+
+    prefetch 단계가 있으면 워커를 잡기 전에 병렬로 실행해 결과를 프롬프트 뒤에 붙인다.
+    웹훅과 같은 워커 풀에서 실행하므로 전체 opencode 프로세스 수는 OPENCODE_WORKERS를 넘지 않는다.
+    작업 안에서 부르는 사전 요약(presummarize.py)도 /workers/run으로 같은 풀을 쓴다.
+    워커가 모두 바쁘면 사용자 요청이 먼저 워커를 받는다 (PRIORITY_SCHEDULED).
+
+    Returns:
+        {"status", "error", "prefetch_time", "wait_time", "run_time"} - status는 ok | failed | timeout
+    """
     # 스케줄러에 의한 요청임을 명시
     prompt = f"[스케줄러에 의한 자동 실행]\n\n{content}"
 
+    prefetch_started = time.monotonic()
+    section, steps = await run_prefetch(prefetch or [], job_store)
+    prefetch_time = time.monotonic() - prefetch_started
+    if section:
+        prompt = f"{prompt}\n\n{section}"
+        summary = ", ".join(
+            f"{r['name']} {'캐시' if r['cached'] else ('성공' if r['ok'] else '실패')}" for r in steps
+        )
+        print(f"[Scheduler] 사전 수집 {prefetch_time:.1f}s ({summary})")
+
     print(f"\n>>> [Scheduler] OpenCode 실행")
     print(f">>> Content: {content[:100]}...")
 
-    try:
-        process = await asyncio.create_subprocess_exec(
-            "opencode", "run", prompt,
-            cwd=str(PROJECT_ROOT),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
+    result = await pool.run(
+        [prompt], timeout=SCHEDULER_TIMEOUT, priority=PRIORITY_SCHEDULED, on_line=_log_progress
+    )
 
-        stdout, stderr = await asyncio.wait_for(
-            process.communicate(),
-            timeout=600.0  # 10분 타임아웃
-        )
+    if result["ok"]:
+        print(f">>> [Scheduler] OpenCode 완료 (대기 {result['wait_time']:.1f}s, 실행 {result['run_time']:.1f}s)")
+        status, error = "ok", None
+    elif result["timed_out"]:
+        print(f">>> [Scheduler] OpenCode 타임아웃")
+        status, error = "timeout", None
+    else:
+        print(f">>> [Scheduler] OpenCode 에러: {result['stderr']}")
+        status, error = "failed", result["stderr"][-500:]
+    return {
+        "status": status,
+        "error": error,
+        "prefetch_time": prefetch_time,
+        "wait_time": result["wait_time"],
+        "run_time": result["run_time"],
+    }
 
-        if process.returncode == 0:
-            print(f">>> [Scheduler] OpenCode 완료")
-            return True
-        else:
-            print(f">>> [Scheduler] OpenCode 에러: {stderr.decode()}")
-            return False
 
-    except asyncio.TimeoutError:
-        print(f">>> [Scheduler] OpenCode 타임아웃")
+# 작업별 실행 중인 인스턴스 수 (예약 + 수동)
+_running: dict[str, int] = {}
+
+# 수동 실행 태스크 (참조를 유지해야 GC로 사라지지 않음)
+_manual_tasks: set[asyncio.Task] = set()
+
+
+def _claim(job_id: str) -> bool:
+    """실행 슬롯 확보 (작업별 SCHEDULER_MAX_INSTANCES개까지)"""
+    if _running.get(job_id, 0) >= SCHEDULER_MAX_INSTANCES:
         return False
+    _running[job_id] = _running.get(job_id, 0) + 1
+    return True
+
+
+def _release(job_id: str):
+    _running[job_id] -= 1
+    if _running[job_id] <= 0:
+        _running.pop(job_id, None)
+
+
+async def run_job(job_id: str, source: str = "schedule", claimed: bool = False):
+    """저장된 작업 실행 후 결과 기록
+
+    작업 저장소에 pickle로 저장되므로 클로저가 아닌 모듈 함수 + job_id 인자로 등록한다.
+    같은 작업이 SCHEDULER_MAX_INSTANCES개 실행 중이면 실행하지 않고 skipped로 기록한다.
+    """
+    meta = job_store.get_meta(job_id)
+    if not meta:
+        print(f"[Scheduler] 작업 내용 없음: {job_id}")
+        if claimed:
+            _release(job_id)
+        return
+
+    if not claimed and not _claim(job_id):
+        print(f"[Scheduler] 이미 실행 중이라 건너뜀: {job_id}")
+        job_store.start_run(job_id, source, status="skipped")
+        SCHEDULER_RUNS.inc(job=job_id, status="skipped")
+        return
+
+    run_id = job_store.start_run(job_id, source)
+    started_at = time.time()
+    result = {"status": "failed", "error": None, "prefetch_time": None, "wait_time": None, "run_time": None}
+    try:
+        result = await run_scheduled_task(meta["content"], meta["prefetch"])
+    except asyncio.CancelledError:
+        result["status"] = "interrupted"
+        raise
     except Exception as e:
         print(f">>> [Scheduler] OpenCode 실행 실패: {e}")
-        return False
+        result["error"] = str(e)
+    finally:
+        _release(job_id)
+        job_store.finish_run(
+            run_id,
+            result["status"],
+            result["wait_time"],
+            result["run_time"],
+            result["error"],
+            result["prefetch_time"],
+        )
+        job_store.record_run(job_id, started_at, result["status"], time.time() - started_at, result["error"])
+        job_store.prune_runs(SCHEDULER_RUN_HISTORY)
+        SCHEDULER_RUNS.inc(job=job_id, status=result["status"])
+        if meta["prefetch"] and result["prefetch_time"] is not None:
+            SCHEDULER_PREFETCH.observe(result["prefetch_time"], job=job_id)
+
+    # 일회성 작업은 실행 후 정리 (APScheduler 작업은 자동 삭제됨)
+    if meta["kind"] == "once" and source == "schedule":
+        job_store.delete_meta(job_id)
+
+
+def _on_job_missed(event):
+    """grace 시간을 넘겨 놓친 실행 기록"""
+    print(f"[Scheduler] 실행 놓침: {event.job_id} (예정 {event.scheduled_run_time})")
+    job_store.start_run(event.job_id, "schedule", status="missed")
+    job_store.record_run(event.job_id, time.time(), "missed")
+    SCHEDULER_RUNS.inc(job=event.job_id, status="missed")
+    meta = job_store.get_meta(event.job_id)
+    if meta and meta["kind"] == "once" and not scheduler.get_job(event.job_id):
+        job_store.delete_meta(event.job_id)
+
+
+def _on_max_instances(event):
+    """APScheduler가 이전 실행이 안 끝나 건너뛴 예약 실행 기록"""
+    print(f"[Scheduler] 이미 실행 중이라 건너뜀: {event.job_id}")
+    job_store.start_run(event.job_id, "schedule", status="skipped")
+    SCHEDULER_RUNS.inc(job=event.job_id, status="skipped")
+
+
+def _on_job_submitted(event):
+    """예정 시각 대비 실제 제출 지연 기록 (이벤트 루프 지연, 재시작 후 놓친 실행 포함)"""
+    if event.scheduled_run_times:
+        scheduled = max(event.scheduled_run_times)
+        lateness = (datetime.now(scheduled.tzinfo) - scheduled).total_seconds()
+        SCHEDULER_LATENESS.observe(max(lateness, 0.0), job=event.job_id)
+
+
+def _format_ts(value: Optional[float]) -> Optional[str]:
+    if value is None:
+        return None
+    from zoneinfo import ZoneInfo
+    return str(datetime.fromtimestamp(value, ZoneInfo(str(TIMEZONE))).replace(microsecond=0))
 
 
-def create_job_func(content: str):
-    """스케줄 작업 함수 생성"""
-    async def job_func():
-        await run_scheduled_task(content)
-    return job_func
+def _job_info(job, meta: Optional[dict]) -> dict:
+    """API 응답용 작업 정보"""
+    meta = meta or {}
+    return {
+        "id": job.id,
+        "next_run": str(job.next_run_time) if job.next_run_time else None,
+        "trigger": str(job.trigger),
+        "content": meta.get("content", ""),
+        "prefetch": meta.get("prefetch", []),
+        "last_run": _format_ts(meta.get("last_run_at")),
+        "last_status": meta.get("last_status"),
+        "last_duration": meta.get("last_duration"),
+    }
 
 
 # ===== 기본 스케줄 작업 =====
@@ -94,13 +282,43 @@ DEFAULT_JOBS = [
         "id": "daily-summary",
         "cron": "0 8 * * *",
         "content": "/daily-summary 스킬을 실행해서 24시간 텔레그램 메시지를 수집하고 요약해줘",
+        "prefetch": [
+            {
+                "name": "24시간 텔레그램 메시지 (collected_messages/{date}.md)",
+                "run": [
+                    ".opencode/skills/telegram-collector/scripts/collect_messages.py",
+                    "--hours", "24",
+                    "-o", "collected_messages/{date}.md",
+                ],
+                "file": "collected_messages/{date}.md",
+                "ttl": 600,
+            },
+            {
+                "name": "업비트 현재가",
+                "run": [".opencode/skills/upbit-trading/scripts/get_ticker.py", "BTC", "ETH", "XRP", "SOL"],
+                "ttl": 60,
+            },
+        ],
     }
 ]
 
 
 def register_default_jobs():
-    """기본 작업 등록"""
+    """기본 작업 등록
+
+    저장소에 이미 있고 일정/내용이 같으면 그대로 둔다 (다음 실행 시각과 놓친 실행 유지).
+    """
     for job in DEFAULT_JOBS:
+        meta = job_store.get_meta(job["id"])
+        if (
+            scheduler.get_job(job["id"])
+            and meta
+            and meta["schedule"] == job["cron"]
+            and meta["content"] == job["content"]
+            and meta["prefetch"] == job.get("prefetch", [])
+        ):
+            continue
+
         parts = job["cron"].split()
         minute, hour, day, month, day_of_week = parts
 
@@ -113,32 +331,36 @@ def register_default_jobs():
             timezone=TIMEZONE,
         )
 
-        # content를 별도 저장소에 저장
-        _job_content[job["id"]] = job["content"]
-
+        job_store.set_meta(job["id"], "cron", job["cron"], job["content"], job.get("prefetch"))
         scheduler.add_job(
-            create_job_func(job["content"]),
+            run_job,
             trigger,
+            args=[job["id"]],
             id=job["id"],
             replace_existing=True,
         )
         print(f"[Scheduler] 기본 작업 등록: {job['id']} ({job['cron']})")
 
 
+def apply_misfire_policy():
+    """저장된 작업에 현재 misfire/coalesce/동시 실행 설정 적용 (설정을 바꾼 뒤 재시작한 경우)"""
+    policy = {
+        "misfire_grace_time": SCHEDULER_MISFIRE_GRACE,
+        "coalesce": SCHEDULER_COALESCE,
+        "max_instances": SCHEDULER_MAX_INSTANCES,
+    }
+    for job in scheduler.get_jobs():
+        if any(getattr(job, name) != value for name, value in policy.items()):
+            job.modify(**policy)
+
+
 # ===== 내부 API 엔드포인트 =====
 
 @router.get("/jobs")
 async def list_jobs() -> list[dict]:
     """등록된 작업 목록"""
-    jobs = []
-    for job in scheduler.get_jobs():
-        jobs.append({
-            "id": job.id,
-            "next_run": str(job.next_run_time) if job.next_run_time else None,
-            "trigger": str(job.trigger),
-            "content": _job_content.get(job.id, ""),
-        })
-    return jobs
+    metas = job_store.all_meta()
+    return [_job_info(job, metas.get(job.id)) for job in scheduler.get_jobs()]
 
 
 @router.get("/jobs/{job_id}")
@@ -148,12 +370,7 @@ async def get_job(job_id: str) -> dict:
     if not job:
         raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없음: {job_id}")
 
-    return {
-        "id": job.id,
-        "next_run": str(job.next_run_time) if job.next_run_time else None,
-        "trigger": str(job.trigger),
-        "content": _job_content.get(job_id, ""),
-    }
+    return _job_info(job, job_store.get_meta(job_id))
 
 
 @router.post("/jobs")
@@ -176,12 +393,11 @@ async def add_job(job: JobCreate) -> dict:
             timezone=TIMEZONE,
         )
 
-        # content를 별도 저장소에 저장
-        _job_content[job.id] = job.content
-
+        job_store.set_meta(job.id, "cron", job.cron, job.content, [s.model_dump() for s in job.prefetch])
         scheduler.add_job(
-            create_job_func(job.content),
+            run_job,
             trigger,
+            args=[job.id],
             id=job.id,
             replace_existing=True,
         )
@@ -209,21 +425,12 @@ async def add_one_time_job(job: OneTimeJobCreate) -> dict:
 
         trigger = DateTrigger(run_date=run_at, timezone=TIMEZONE)
 
-        # content 저장
-        _job_content[job.id] = job.content
-
-        # 일회성 작업은 실행 후 자동 삭제됨
-        # content 저장소도 정리하기 위해 래퍼 함수 사용
-        def create_one_time_job_func(job_id: str, content: str):
-            async def job_func():
-                await run_scheduled_task(content)
-                # 실행 후 content 저장소에서 삭제
-                _job_content.pop(job_id, None)
-            return job_func
-
+        # 일회성 작업은 실행 후 자동 삭제됨 (메타데이터는 run_job에서 정리)
+        job_store.set_meta(job.id, "once", str(run_at), job.content, [s.model_dump() for s in job.prefetch])
         scheduler.add_job(
-            create_one_time_job_func(job.id, job.content),
+            run_job,
             trigger,
+            args=[job.id],
             id=job.id,
             replace_existing=True,
         )
@@ -272,7 +479,7 @@ async def remove_job(job_id: str) -> dict:
     """작업 삭제"""
     try:
         scheduler.remove_job(job_id)
-        _job_content.pop(job_id, None)  # content 저장소에서도 삭제
+        job_store.delete_meta(job_id)  # content/실행 기록도 삭제
         print(f"[Scheduler] 작업 삭제: {job_id}")
         return {"status": "ok", "id": job_id}
     except Exception as e:
@@ -286,23 +493,47 @@ async def trigger_job(job_id: str) -> dict:
     if not job:
         raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없음: {job_id}")
 
-    # content 추출하여 즉시 실행
-    content = _job_content.get(job_id, "")
-    if content:
-        asyncio.create_task(run_scheduled_task(content))
+    # 저장된 content로 즉시 실행
+    meta = job_store.get_meta(job_id)
+    if meta and meta["content"]:
+        if not _claim(job_id):
+            raise HTTPException(status_code=409, detail=f"이미 실행 중인 작업: {job_id}")
+        task = asyncio.create_task(run_job(job_id, source="manual", claimed=True))
+        _manual_tasks.add(task)
+        task.add_done_callback(_manual_tasks.discard)
         print(f"[Scheduler] 작업 수동 실행: {job_id}")
         return {"status": "triggered", "id": job_id}
     else:
         raise HTTPException(status_code=400, detail="작업에 content가 없음")
 
 
+@router.get("/runs")
+async def list_runs(job_id: Optional[str] = None, limit: int = 50) -> dict:
+    """실행 기록 (최신순) + 현재 실행 중인 작업"""
+    runs = job_store.runs(job_id, max(1, min(limit, 500)))
+    for run in runs:
+        run["queued_at"] = _format_ts(run["queued_at"])
+    return {"running": dict(_running), "runs": runs}
+
+
 # ===== 스케줄러 제어 =====
 
 def start():
-    """스케줄러 시작"""
+    """스케줄러 시작
+
+    일시정지 상태로 시작해 저장된 작업을 확인한 뒤 재개한다 (재개 시 놓친 실행 처리).
+    """
+    scheduler.add_listener(_on_job_missed, EVENT_JOB_MISSED)
+    scheduler.add_listener(_on_max_instances, EVENT_JOB_MAX_INSTANCES)
+    scheduler.add_listener(_on_job_submitted, EVENT_JOB_SUBMITTED)
+    interrupted = job_store.interrupt_stale_runs()
+    if interrupted:
+        print(f"[Scheduler] 이전 프로세스에서 중단된 실행 {interrupted}개")
+    scheduler.start(paused=True)
     register_default_jobs()
-    scheduler.start()
-    print("[Scheduler] 스케줄러 시작됨")
+    apply_misfire_policy()
+    scheduler.resume()
+    print(f"[Scheduler] 스케줄러 시작됨 (작업 {len(scheduler.get_jobs())}개, 저장소: {SCHEDULER_DB})")
 
 
 def shutdown():
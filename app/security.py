@@ -0,0 +1,21 @@
+"""내부 엔드포인트 접근 제한
+
+발신 큐, 스케줄러, 통계/메트릭처럼 봇 바깥에 노출되면 안 되는 엔드포인트에
+Depends(local_only)로 건다.
+"""
+
+import ipaddress
+
+from fastapi import HTTPException, Request
+
+
+def local_only(request: Request):
+    """localhost에서 직접 온 요청만 허용 (터널/프록시 경유 요청 거부)"""
+    host = request.client.host if request.client else ""
+    try:
+        loopback = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = False
+    forwarded = any(h in request.headers for h in ("cf-connecting-ip", "x-forwarded-for", "forwarded"))
+    if not loopback or forwarded:
+        raise HTTPException(status_code=403, detail="Forbidden")
@@ -0,0 +1,193 @@
+"""OpenCode 실행 진행 상황 스트리밍
+
+워커 풀이 stdout을 한 줄씩 넘겨주면 진행 이벤트(도구 호출, 본문, 에러)로 해석하고,
+채팅에 진행 상황 메시지 하나를 보내 editMessageText로 갱신한다.
+
+- 일반 출력과 `--format json` 이벤트 출력을 모두 해석 (모르는 줄은 본문으로 취급)
+- 첫 메시지는 STREAM_FIRST_DELAY 뒤에 전송 (짧은 응답은 메시지 없이 끝남)
+- 편집은 STREAM_EDIT_INTERVAL마다 최대 1회 (그 사이 이벤트는 모아서 한 번에 반영)
+- 전송/편집은 발신 큐를 거치므로 채팅별 속도 제한을 넘지 않음
+- 끝나면 성공 시 삭제 (답변은 에이전트가 send_telegram.py로 따로 보냄), 실패/타임아웃은 결과로 교체
+"""
+
+import asyncio
+import json
+import re
+import time
+from collections import deque
+from typing import Optional
+
+from app.config import STREAM_EDIT_INTERVAL, STREAM_FIRST_DELAY
+from app.outbox import Outbox, outbox as default_outbox
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+# 일반 출력의 도구 호출 줄 (예: "|  Bash     uv run python ...")
+_TOOL_LINE_RE = re.compile(r"^[|│]\s+(\S+)\s*(.*)$")
+
+# 메시지에 보여줄 최근 도구 호출 수 / 본문 길이
+_MAX_STEPS = 5
+_MAX_TEXT = 600
+
+
+def strip_ansi(text: str) -> str:
+    return _ANSI_RE.sub("", text)
+
+
+def _json_event(data: dict) -> Optional[dict]:
+    """`opencode run --format json` 이벤트 해석"""
+    kind = data.get("type")
+    part = data.get("part") or {}
+    if kind == "tool_use":
+        state = part.get("state") or {}
+        tool = part.get("tool") or "tool"
+        title = state.get("title") or ""
+        if not title:
+            inputs = state.get("input") or {}
+            title = inputs.get("command") or inputs.get("filePath") or inputs.get("description") or ""
+        return {"kind": "tool", "text": f"{tool} {title}".strip()}
+    if kind == "text":
+        text = part.get("text") or data.get("text") or ""
+        return {"kind": "text", "text": text} if text.strip() else None
+    if kind == "error":
+        error = data.get("error") or {}
+        message = error.get("message") or (error.get("data") or {}).get("message") or json.dumps(error)
+        return {"kind": "error", "text": str(message)}
+    return None
+
+
+def parse_event(line: str) -> Optional[dict]:
+    """stdout 한 줄을 진행 이벤트로 해석
+
+    Returns:
+        {"kind": "tool" | "text" | "error", "text"} 또는 None (빈 줄, 무시할 이벤트)
+    """
+    line = strip_ansi(line).rstrip()
+    if not line.strip():
+        return None
+    if line.startswith("{"):
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and "type" in data:
+            return _json_event(data)
+    match = _TOOL_LINE_RE.match(line)
+    if match:
+        return {"kind": "tool", "text": f"{match.group(1)} {match.group(2)}".strip()}
+    if line.lower().startswith("error"):
+        return {"kind": "error", "text": line}
+    return {"kind": "text", "text": line}
+
+
+class ProgressMessage:
+    """채팅 하나에 보여줄 진행 상황 메시지 (디바운스 편집)
+
+    progress = ProgressMessage(chat_id)
+    await pool.run(args, on_line=progress.feed)
+    await progress.finish(result)
+    """
+
+    def __init__(
+        self,
+        chat_id: object,
+        title: str = "분석",
+        first_delay: float = STREAM_FIRST_DELAY,
+        interval: float = STREAM_EDIT_INTERVAL,
+        outbox: Outbox = default_outbox,
+    ):
+        self.chat_id = chat_id
+        self.title = title
+        self.first_delay = max(0.0, first_delay)
+        self.interval = max(1.0, interval)
+        self.outbox = outbox
+        self.started_at = time.monotonic()
+        self.message_id: Optional[int] = None
+        self.steps: deque[str] = deque(maxlen=_MAX_STEPS)
+        self.step_count = 0
+        self.text = ""
+        self.events = 0
+        self._rendered = ""
+        self._dirty = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._closed = False
+
+    def feed(self, line: str):
+        """stdout 한 줄 반영 (워커 풀 on_line 콜백, 즉시 반환)"""
+        event = parse_event(line)
+        if event is None or self._closed:
+            return
+        self.events += 1
+        if event["kind"] == "tool":
+            self.steps.append(event["text"][:120])
+            self.step_count += 1
+        elif event["kind"] == "error":
+            self.text = f"⚠️ {event['text']}"
+        else:
+            self.text = (self.text + "\n" + event["text"]).strip()[-_MAX_TEXT:]
+        self._dirty.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    def render(self) -> str:
+        elapsed = time.monotonic() - self.started_at
+        lines = [f"⏳ {self.title} 중... ({elapsed:.0f}초)"]
+        if self.steps:
+            lines.append("")
+            hidden = self.step_count - len(self.steps)
+            if hidden:
+                lines.append(f"… 이전 단계 {hidden}개")
+            lines.extend(f"• {step}" for step in self.steps)
+        if self.text:
+            lines.append("")
+            lines.append(self.text)
+        return "\n".join(lines)
+
+    async def _loop(self):
+        """첫 전송 지연 후, 변경이 있을 때만 interval 간격으로 편집"""
+        try:
+            await asyncio.sleep(self.first_delay)
+            while not self._closed:
+                await self._dirty.wait()
+                self._dirty.clear()
+                # 취소돼도 전송 중인 요청은 끝까지 (보낸 메시지 id를 잃지 않도록)
+                self._inflight = asyncio.ensure_future(self._publish())
+                await asyncio.shield(self._inflight)
+                await asyncio.sleep(self.interval)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"[progress] chat_id={self.chat_id} 갱신 에러: {e}")
+
+    async def _publish(self, text: Optional[str] = None):
+        text = text or self.render()
+        if text == self._rendered:
+            return
+        if self.message_id is None:
+            result = await self.outbox.send_text(self.chat_id, text, parse_mode=None)
+            ids = result.get("message_ids") or []
+            self.message_id = ids[0] if ids else None
+        else:
+            await self.outbox.edit_text(self.chat_id, self.message_id, text)
+        self._rendered = text
+
+    async def finish(self, result: Optional[dict] = None):
+        """실행 종료: 성공이면 메시지 삭제, 실패/타임아웃이면 결과로 교체"""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._inflight is not None:
+            await asyncio.gather(self._inflight, return_exceptions=True)
+        if self.message_id is None:
+            return
+        try:
+            if result and result.get("ok"):
+                await self.outbox.delete_message(self.chat_id, self.message_id)
+            elif result and result.get("timed_out"):
+                await self._publish(f"⌛ {self.title} 시간 초과 ({result.get('run_time', 0):.0f}초)")
+            else:
+                error = strip_ansi((result or {}).get("stderr", "")).strip()[-300:]
+                await self._publish(f"❌ {self.title} 실패" + (f"\n\n{error}" if error else ""))
+        except Exception as e:
+            print(f"[progress] chat_id={self.chat_id} 정리 에러: {e}")
@@ -1,81 +1,157 @@
 """텔레그램 API 유틸리티"""
 
+import time
 from typing import Optional
 
 import httpx
 
-from app.config import BOT_TOKEN, WEBHOOK_SECRET
+from app.config import (
+    BOT_TOKEN,
+    TELEGRAM_API_BASE,
+    TELEGRAM_CONNECT_TIMEOUT,
+    TELEGRAM_HTTP2,
+    TELEGRAM_KEEPALIVE_EXPIRY,
+    TELEGRAM_MAX_CONNECTIONS,
+    TELEGRAM_MAX_KEEPALIVE,
+    TELEGRAM_TIMEOUT,
+)
+from app.metrics import TELEGRAM_API, TELEGRAM_API_ERRORS
+
+# 프로세스 전역 HTTP 클라이언트 (app.main lifespan에서 생성/종료)
+# 호출마다 AsyncClient를 만들면 매번 TCP+TLS 핸드셰이크가 발생하므로 커넥션을 재사용한다.
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 사용 가능 여부 (httpx[http2] = h2 패키지 필요)"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _method_name(request: httpx.Request) -> str:
+    """/bot<token>/sendMessage → sendMessage (메트릭 레이블에 토큰이 들어가지 않게)"""
+    return request.url.path.rsplit("/", 1)[-1]
+
+
+async def _on_request(request: httpx.Request):
+    request.extensions["started_at"] = time.perf_counter()
+
+
+async def _on_response(response: httpx.Response):
+    """메서드별 응답 지연 기록 (헤더 수신 시점, 본문 읽기 전)"""
+    started_at = response.request.extensions.get("started_at")
+    if started_at is not None:
+        TELEGRAM_API.observe(
+            time.perf_counter() - started_at,
+            method=_method_name(response.request),
+            status=response.status_code,
+        )
+
+
+def create_client(api_base: Optional[str] = None) -> httpx.AsyncClient:
+    """커넥션 풀/keep-alive/타임아웃이 설정된 AsyncClient 생성"""
+    http2 = TELEGRAM_HTTP2 and _http2_available()
+    if TELEGRAM_HTTP2 and not http2:
+        print("[telegram] h2 패키지가 없어 HTTP/1.1로 동작합니다 (의존성 httpx[http2], 설치: uv sync)")
+
+    return httpx.AsyncClient(
+        base_url=f"{api_base or TELEGRAM_API_BASE}/bot{BOT_TOKEN}",
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=TELEGRAM_MAX_CONNECTIONS,
+            max_keepalive_connections=TELEGRAM_MAX_KEEPALIVE,
+            keepalive_expiry=TELEGRAM_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(TELEGRAM_TIMEOUT, connect=TELEGRAM_CONNECT_TIMEOUT),
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+    )
+
+
+async def start_client() -> httpx.AsyncClient:
+    """공유 클라이언트 시작"""
+    global _client
+    if _client is None:
+        _client = create_client()
+        print(f"[telegram] HTTP 클라이언트 시작 (http2={TELEGRAM_HTTP2 and _http2_available()})")
+    return _client
+
+
+async def close_client():
+    """공유 클라이언트 종료 (커넥션 풀 정리)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        print("[telegram] HTTP 클라이언트 종료")
+
+
+def get_client() -> httpx.AsyncClient:
+    """공유 클라이언트 반환 (lifespan 밖에서 호출되면 지연 생성)"""
+    global _client
+    if _client is None:
+        _client = create_client()
+    return _client
 
 
 async def send_chat_action(chat_id: int, action: str = "typing") -> bool:
     """타이핑 중 등의 액션 표시"""
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendChatAction"
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json={"chat_id": chat_id, "action": action})
-            result = response.json()
-            ok = result.get("ok", False)
-            if ok:
-                print(f"[typing] chat_id={chat_id} 타이핑 표시 성공")
-            else:
-                print(f"[typing] chat_id={chat_id} 실패: {result}")
-            return ok
+        response = await get_client().post("/sendChatAction", json={"chat_id": chat_id, "action": action})
+        result = response.json()
+        ok = result.get("ok", False)
+        if ok:
+            print(f"[typing] chat_id={chat_id} 타이핑 표시 성공")
+        else:
+            print(f"[typing] chat_id={chat_id} 실패: {result}")
+        return ok
     except Exception as e:
+        TELEGRAM_API_ERRORS.inc(method="sendChatAction")
         print(f"[typing] chat_id={chat_id} 에러: {e}")
         return False
 
 
-async def send_message(chat_id: int, text: str, parse_mode: str = "Markdown") -> bool:
-    """텔레그램으로 메시지 전송"""
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-
-    async with httpx.AsyncClient() as client:
-        payload = {
-            "chat_id": chat_id,
-            "text": text,
-            "parse_mode": parse_mode,
-        }
-
-        response = await client.post(url, json=payload)
-        data = response.json()
-
-        if not data.get("ok"):
-            # Markdown 파싱 실패시 plain text로 재시도
-            if "can't parse" in data.get("description", "").lower():
-                payload["parse_mode"] = None
-                response = await client.post(url, json=payload)
-                data = response.json()
+async def call_api(
+    method: str,
+    json: Optional[dict] = None,
+    data: Optional[dict] = None,
+    files: Optional[dict] = None,
+) -> dict:
+    """Bot API 호출 (속도 제한/재시도 없음, 응답 JSON 그대로 반환)
 
-        return data.get("ok", False)
+    사용자에게 보이는 메시지 전송은 app.outbox를 거친다.
+    """
+    try:
+        response = await get_client().post(f"/{method}", json=json, data=data, files=files)
+        return response.json()
+    except Exception as e:
+        TELEGRAM_API_ERRORS.inc(method=method)
+        return {"ok": False, "description": str(e)}
 
 
 async def set_webhook(webhook_url: str, secret_token: Optional[str] = None) -> bool:
     """텔레그램에 Webhook URL 등록"""
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/setWebhook"
-
     payload = {"url": webhook_url}
     if secret_token:
         payload["secret_token"] = secret_token
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=payload)
-        data = response.json()
+    response = await get_client().post("/setWebhook", json=payload)
+    data = response.json()
 
-        if data.get("ok"):
-            print(f"Webhook 설정 완료: {webhook_url}")
-            if secret_token:
-                print("Secret token 설정됨")
-            return True
-        else:
-            print(f"Webhook 설정 실패: {data.get('description')}")
-            return False
+    if data.get("ok"):
+        print(f"Webhook 설정 완료: {webhook_url}")
+        if secret_token:
+            print("Secret token 설정됨")
+        return True
+    else:
+        print(f"Webhook 설정 실패: {data.get('description')}")
+        return False
 
 
 async def delete_webhook() -> bool:
     """Webhook 삭제 (polling 모드로 전환시 필요)"""
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/deleteWebhook"
-
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url)
-        data = response.json()
-        return data.get("ok", False)
+    response = await get_client().post("/deleteWebhook")
+    data = response.json()
+    return data.get("ok", False)
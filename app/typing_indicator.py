@@ -0,0 +1,115 @@
+"""채팅별 타이핑 표시 관리
+
+핸들러마다 keep_typing 루프를 돌리는 대신, 채팅별로 진행 중인 작업 수를 세고
+작업이 하나라도 있으면 채팅당 루프 하나만 돌린다.
+
+- 채팅당 interval 동안 sendChatAction 최대 1회 (작업 수와 무관)
+- begin()/end()는 요청 경로에서 호출해도 즉시 반환 (전송은 백그라운드 태스크)
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from app.telegram import send_chat_action
+
+# 텔레그램 타이핑 표시는 약 5초 유지됨
+DEFAULT_INTERVAL = 4.0
+
+# _last_sent 정리 기준 크기
+_MAX_TRACKED_CHATS = 1000
+
+
+class TypingManager:
+    """채팅별 타이핑 표시 코얼레싱 관리자"""
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        action: str = "typing",
+        send: Callable[[int, str], Awaitable[bool]] = send_chat_action,
+    ):
+        self.interval = interval
+        self.action = action
+        self.send = send
+        self._counts: dict[int, int] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._last_sent: dict[int, float] = {}
+        self._sent = 0
+
+    def begin(self, chat_id: Optional[int]):
+        """작업 시작 (첫 작업이면 타이핑 루프 시작)"""
+        if chat_id is None:
+            return
+        self._counts[chat_id] = self._counts.get(chat_id, 0) + 1
+        if chat_id not in self._tasks:
+            self._prune()
+            self._tasks[chat_id] = asyncio.create_task(self._loop(chat_id))
+
+    def end(self, chat_id: Optional[int]):
+        """작업 종료 (마지막 작업이면 타이핑 루프 중지)"""
+        if chat_id is None or chat_id not in self._counts:
+            return
+        remaining = self._counts[chat_id] - 1
+        if remaining > 0:
+            self._counts[chat_id] = remaining
+            return
+        self._counts.pop(chat_id, None)
+        task = self._tasks.pop(chat_id, None)
+        if task:
+            task.cancel()
+
+    @asynccontextmanager
+    async def active(self, chat_id: Optional[int]):
+        """작업 구간 동안 타이핑 표시 유지"""
+        self.begin(chat_id)
+        try:
+            yield
+        finally:
+            self.end(chat_id)
+
+    async def _loop(self, chat_id: int):
+        """interval마다 한 번씩 전송 (직전 전송이 interval 이내면 대기)"""
+        try:
+            while True:
+                delay = self._last_sent.get(chat_id, float("-inf")) + self.interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                self._last_sent[chat_id] = time.monotonic()
+                self._sent += 1
+                await self.send(chat_id, self.action)
+        except asyncio.CancelledError:
+            pass
+
+    def _prune(self):
+        """오래된 전송 기록 정리"""
+        if len(self._last_sent) < _MAX_TRACKED_CHATS:
+            return
+        cutoff = time.monotonic() - self.interval
+        for chat_id, sent_at in list(self._last_sent.items()):
+            if sent_at < cutoff and chat_id not in self._tasks:
+                del self._last_sent[chat_id]
+
+    async def stop(self):
+        """모든 타이핑 루프 중지"""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        self._counts.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """타이핑 표시 상태"""
+        return {
+            "active_chats": len(self._tasks),
+            "active_work": sum(self._counts.values()),
+            "sent": self._sent,
+            "interval": self.interval,
+        }
+
+
+# 프로세스 전역 관리자
+typing_manager = TypingManager()
@@ -0,0 +1,496 @@
+"""OpenCode 워커 풀
+
+메시지마다 `opencode run`을 콜드 스타트하는 대신, 미리 띄워둔 `opencode serve` 워커에
+`opencode run --attach`로 붙어서 실행한다.
+
+- 워커 수(OPENCODE_WORKERS)만큼만 동시에 실행 (나머지는 대기열)
+- 대기열이 OPENCODE_MAX_PENDING을 넘으면 PoolBusyError (백프레셔)
+- 같은 key(chat_id)의 요청은 도착 순서대로 하나씩 실행
+- 우선순위: 사용자 요청(PRIORITY_INTERACTIVE)이 스케줄 실행(PRIORITY_SCHEDULED)보다 먼저 워커를 받음
+- stdout은 한 줄씩 읽어 on_line 콜백에 넘김 (진행 상황 표시), 메모리에는 마지막 OPENCODE_OUTPUT_LIMIT자만 보관
+- 스크립트의 단발 실행(사전 요약 등)도 /workers/run으로 같은 풀을 씀 (스케줄 우선순위)
+- /workers/stats 에서 대기열 깊이, 대기 시간, 실행 시간 확인 (/metrics 에도 히스토그램으로 기록)
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+
+from app.config import (
+    OPENCODE_MAX_PENDING,
+    OPENCODE_MODEL,
+    OPENCODE_OUTPUT_LIMIT,
+    OPENCODE_WORKER_BASE_PORT,
+    OPENCODE_WORKERS,
+    PROJECT_ROOT,
+)
+from app.metrics import OPENCODE_QUEUE_WAIT, OPENCODE_RUN, OPENCODE_SPAWN, registry, span
+from app.security import local_only
+
+# 내부 API 라우터 (localhost 전용)
+router = APIRouter(prefix="/workers", tags=["workers"], dependencies=[Depends(local_only)])
+
+# 통계용 최근 샘플 수
+_STATS_WINDOW = 200
+
+# 워커 시작 실패 후 재시도까지 대기 (초)
+_RESTART_BACKOFF = 60.0
+
+# 우선순위 (작을수록 먼저)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SCHEDULED = 10
+_PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_SCHEDULED: "scheduled"}
+
+
+# stdout 한 줄을 받는 콜백 (이벤트 루프에서 호출되므로 오래 걸리는 작업은 태스크로 넘겨야 함)
+LineCallback = Callable[[str], None]
+
+# 한 번에 읽을 바이트 수
+_READ_CHUNK = 64 * 1024
+
+
+class PoolBusyError(Exception):
+    """대기열이 가득 차서 요청을 받을 수 없음"""
+
+
+class OpenCodeWorker:
+    """`opencode serve` 프로세스 하나 (warm 세션)"""
+
+    def __init__(self, index: int, port: int):
+        self.index = index
+        self.port = port
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.runs = 0
+        # 시작 실패 후 재시도 가능 시각 (실패한 워커를 매 요청마다 재시작하지 않도록)
+        self.retry_at = 0.0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self, ready_timeout: float = 30.0) -> bool:
+        """서버 프로세스 시작 후 포트가 열릴 때까지 대기"""
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                "opencode", "serve", "--hostname", "127.0.0.1", "--port", str(self.port),
+                cwd=str(PROJECT_ROOT),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except Exception as e:
+            print(f"[workers] #{self.index} 시작 실패: {e}")
+            self.process = None
+            self.retry_at = time.monotonic() + _RESTART_BACKOFF
+            return False
+
+        deadline = time.monotonic() + ready_timeout
+        while time.monotonic() < deadline:
+            if not self.alive:
+                break
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", self.port)
+                writer.close()
+                await writer.wait_closed()
+                print(f"[workers] #{self.index} 준비됨 ({self.url})")
+                return True
+            except OSError:
+                await asyncio.sleep(0.5)
+
+        print(f"[workers] #{self.index} 준비 실패, 콜드 실행으로 대체")
+        await self.stop()
+        self.retry_at = time.monotonic() + _RESTART_BACKOFF
+        return False
+
+    async def stop(self):
+        """서버 프로세스 종료"""
+        if self.alive:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        self.process = None
+
+    def command(self, args: list[str]) -> list[str]:
+        """실행 명령 구성 (워커가 살아있으면 attach, 아니면 콜드 실행)"""
+        if self.alive:
+            return ["opencode", "run", "--attach", self.url, *args]
+        return ["opencode", "run", *args]
+
+
+class _OutputTail:
+    """마지막 limit자만 보관하는 출력 버퍼"""
+
+    def __init__(self, limit: int):
+        self.limit = max(0, limit)
+        self.parts: deque[str] = deque()
+        self.size = 0
+        self.truncated = 0
+
+    def append(self, text: str):
+        self.parts.append(text)
+        self.size += len(text)
+        while self.size > self.limit and self.parts:
+            excess = self.size - self.limit
+            head = self.parts[0]
+            if len(head) <= excess:
+                self.parts.popleft()
+                self.size -= len(head)
+                self.truncated += len(head)
+            else:
+                self.parts[0] = head[excess:]
+                self.size -= excess
+                self.truncated += excess
+
+    def text(self) -> str:
+        body = "".join(self.parts)
+        if self.truncated:
+            return f"... (앞부분 {self.truncated:,}자 생략)\n{body}"
+        return body
+
+
+async def _read_lines(stream: asyncio.StreamReader, tail: _OutputTail, on_line: Optional[LineCallback]):
+    """스트림을 줄 단위로 읽어 버퍼에 쌓고 콜백 호출 (줄 길이 제한 없음)"""
+    pending = b""
+    while True:
+        chunk = await stream.read(_READ_CHUNK)
+        if not chunk:
+            break
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for raw in lines:
+            line = raw.decode(errors="replace")
+            tail.append(line + "\n")
+            if on_line:
+                try:
+                    on_line(line)
+                except Exception as e:
+                    print(f"[workers] on_line 에러: {e}")
+    if pending:
+        line = pending.decode(errors="replace")
+        tail.append(line)
+        if on_line:
+            try:
+                on_line(line)
+            except Exception as e:
+                print(f"[workers] on_line 에러: {e}")
+
+
+class OpenCodePool:
+    """OpenCode 워커 풀"""
+
+    def __init__(self, size: int, base_port: int, max_pending: int):
+        self.size = max(1, size)
+        self.max_pending = max_pending
+        self.workers = [OpenCodeWorker(i, base_port + i) for i in range(self.size)]
+        self._idle: deque[OpenCodeWorker] = deque()
+        # 워커를 기다리는 요청 (우선순위, 도착 순번, future) 힙
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._chat_locks: dict[object, asyncio.Lock] = {}
+        self._chat_refs: dict[object, int] = {}
+        self._pending = 0
+        self._running = 0
+        self._started = False
+
+        # 통계
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._rejected = 0
+        self._wait_times: deque[float] = deque(maxlen=_STATS_WINDOW)
+        self._run_times: deque[float] = deque(maxlen=_STATS_WINDOW)
+
+    async def start(self):
+        """워커 전체 시작 (병렬)"""
+        if self._started:
+            return
+        await asyncio.gather(*(w.start() for w in self.workers))
+        for worker in self.workers:
+            self._release_worker(worker)
+        self._started = True
+        warm = sum(1 for w in self.workers if w.alive)
+        print(f"[workers] 풀 시작됨 (size={self.size}, warm={warm})")
+
+    async def stop(self):
+        """워커 전체 종료"""
+        await asyncio.gather(*(w.stop() for w in self.workers))
+        self._started = False
+        print("[workers] 풀 종료됨")
+
+    async def _acquire_worker(self, priority: int) -> OpenCodeWorker:
+        """빈 워커 획득 (없으면 우선순위 → 도착 순으로 대기)"""
+        if self._idle and not self._waiters:
+            return self._idle.popleft()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # 워커를 넘겨받은 직후 취소되면 반납 (취소된 대기는 _release_worker가 건너뜀)
+            if future.done() and not future.cancelled():
+                self._release_worker(future.result())
+            raise
+
+    def _release_worker(self, worker: OpenCodeWorker):
+        """워커 반납 (대기 중인 가장 높은 우선순위 요청에 바로 넘김)"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(worker)
+                return
+        self._idle.append(worker)
+
+    def _enter_chat(self, key: object) -> Optional[asyncio.Lock]:
+        """key별 순서 보장용 락 획득 준비 (참조 카운트 증가)"""
+        if key is None:
+            return None
+        lock = self._chat_locks.get(key)
+        if lock is None:
+            lock = self._chat_locks[key] = asyncio.Lock()
+        self._chat_refs[key] = self._chat_refs.get(key, 0) + 1
+        return lock
+
+    def _leave_chat(self, key: object):
+        """참조 카운트 감소, 아무도 안 쓰면 락 정리"""
+        if key is None:
+            return
+        self._chat_refs[key] -= 1
+        if self._chat_refs[key] <= 0:
+            self._chat_refs.pop(key, None)
+            self._chat_locks.pop(key, None)
+
+    async def run(
+        self,
+        args: list[str],
+        key: object = None,
+        timeout: float = 300.0,
+        priority: int = PRIORITY_INTERACTIVE,
+        on_line: Optional[LineCallback] = None,
+    ) -> dict:
+        """워커에서 opencode run 실행
+
+        Args:
+            args: `opencode run` 뒤에 붙을 인자 (예: ["/user-action", "-m", MODEL])
+            key: 순서를 보장할 키 (chat_id). 같은 키는 하나씩 순서대로 실행
+            timeout: 실행 타임아웃 (초)
+            priority: 워커 대기 우선순위. 사용자 요청만 대기열 상한(max_pending)을 적용하고,
+                스케줄 실행은 스케줄러가 작업별 동시 실행 수로 제한하므로 거절하지 않음
+            on_line: stdout 한 줄마다 호출 (실행 중 진행 상황 표시용)
+
+        Returns:
+            {"ok", "returncode", "stdout", "stderr", "timed_out", "wait_time", "run_time"}
+
+        Raises:
+            PoolBusyError: 대기열이 가득 찬 경우
+        """
+        if priority <= PRIORITY_INTERACTIVE and self._pending >= self.max_pending:
+            self._rejected += 1
+            raise PoolBusyError(f"대기열 초과 ({self._pending}/{self.max_pending})")
+
+        queued_at = time.monotonic()
+        self._pending += 1
+        lock = self._enter_chat(key)
+        locked = False
+        try:
+            if lock:
+                await lock.acquire()
+                locked = True
+            worker = await self._acquire_worker(priority)
+        except BaseException:
+            if locked:
+                lock.release()
+            self._leave_chat(key)
+            raise
+        finally:
+            self._pending -= 1
+
+        wait_time = time.monotonic() - queued_at
+        self._wait_times.append(wait_time)
+        OPENCODE_QUEUE_WAIT.observe(wait_time, priority=_PRIORITY_NAMES.get(priority, priority))
+        self._running += 1
+
+        try:
+            if self._started and not worker.alive and time.monotonic() >= worker.retry_at:
+                # 죽은 워커는 재시작 시도 (실패하면 콜드 실행)
+                await worker.start()
+            return await self._execute(worker, args, timeout, wait_time, priority, on_line)
+        finally:
+            self._running -= 1
+            worker.runs += 1
+            self._release_worker(worker)
+            if lock:
+                lock.release()
+            self._leave_chat(key)
+
+    async def _execute(
+        self,
+        worker: OpenCodeWorker,
+        args: list[str],
+        timeout: float,
+        wait_time: float,
+        priority: int = PRIORITY_INTERACTIVE,
+        on_line: Optional[LineCallback] = None,
+    ) -> dict:
+        """opencode run 프로세스 실행 및 결과 수집 (stdout 스트리밍)"""
+        started_at = time.monotonic()
+        result = {
+            "ok": False,
+            "returncode": None,
+            "stdout": "",
+            "stderr": "",
+            "timed_out": False,
+            "wait_time": wait_time,
+            "run_time": 0.0,
+        }
+
+        process = None
+        stdout = _OutputTail(OPENCODE_OUTPUT_LIMIT)
+        stderr = _OutputTail(OPENCODE_OUTPUT_LIMIT)
+        command = worker.command(args)
+        mode = "attach" if "--attach" in command else "cold"
+        try:
+            with span("opencode.spawn", OPENCODE_SPAWN, mode=mode) as fields:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    cwd=str(PROJECT_ROOT),
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                fields["worker"] = worker.index
+            await asyncio.wait_for(
+                asyncio.gather(
+                    _read_lines(process.stdout, stdout, on_line),
+                    _read_lines(process.stderr, stderr, None),
+                    process.wait(),
+                ),
+                timeout=timeout,
+            )
+            result["returncode"] = process.returncode
+            result["ok"] = process.returncode == 0
+        except asyncio.TimeoutError:
+            result["timed_out"] = True
+            self._timeouts += 1
+            if process and process.returncode is None:
+                process.kill()
+                await process.wait()
+        except Exception as e:
+            stderr.append(str(e))
+
+        result["stdout"] = stdout.text()
+        result["stderr"] = stderr.text()
+        result["run_time"] = time.monotonic() - started_at
+        self._run_times.append(result["run_time"])
+        outcome = "ok" if result["ok"] else "timeout" if result["timed_out"] else "failed"
+        OPENCODE_RUN.observe(result["run_time"], priority=_PRIORITY_NAMES.get(priority, priority), outcome=outcome)
+        if result["ok"]:
+            self._completed += 1
+        else:
+            self._failed += 1
+        return result
+
+    def stats(self) -> dict:
+        """풀 상태 및 지연 통계"""
+        return {
+            "size": self.size,
+            "warm_workers": sum(1 for w in self.workers if w.alive),
+            "queue_depth": self._pending,
+            "waiting": self._waiting_by_priority(),
+            "max_pending": self.max_pending,
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "timeouts": self._timeouts,
+            "rejected": self._rejected,
+            "wait_time": _summarize(self._wait_times),
+            "run_time": _summarize(self._run_times),
+            "workers": [
+                {"index": w.index, "url": w.url, "alive": w.alive, "runs": w.runs}
+                for w in self.workers
+            ],
+        }
+
+
+    def _waiting_by_priority(self) -> dict:
+        counts = {name: 0 for name in _PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                name = _PRIORITY_NAMES.get(priority, str(priority))
+                counts[name] = counts.get(name, 0) + 1
+        return counts
+
+
+def _summarize(samples: deque[float]) -> dict:
+    """최근 샘플의 평균/p50/p95/최대 (초)"""
+    if not samples:
+        return {"count": 0, "avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {
+        "count": n,
+        "avg": round(sum(ordered) / n, 3),
+        "p50": round(ordered[n // 2], 3),
+        "p95": round(ordered[min(n - 1, int(n * 0.95))], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+# 프로세스 전역 풀
+pool = OpenCodePool(
+    size=OPENCODE_WORKERS,
+    base_port=OPENCODE_WORKER_BASE_PORT,
+    max_pending=OPENCODE_MAX_PENDING,
+)
+
+
+registry.gauge("opencode_pool_workers", "워커 상태별 수", ["state"]).set_function(
+    lambda: {
+        ("warm",): sum(1 for w in pool.workers if w.alive),
+        ("running",): pool._running,
+        ("idle",): len(pool._idle),
+    }
+)
+registry.gauge("opencode_pool_waiting", "워커를 기다리는 요청 수", ["priority"]).set_function(
+    lambda: {(name,): count for name, count in pool._waiting_by_priority().items()}
+)
+
+
+def user_action_args() -> list[str]:
+    """/user-action 실행 인자"""
+    return ["/user-action", "-m", OPENCODE_MODEL]
+
+
+# ===== 내부 API 엔드포인트 =====
+
+class RunRequest(BaseModel):
+    """스크립트가 풀에서 실행할 단발 프롬프트 (도구 없는 요약 등)"""
+    prompt: str
+    model: Optional[str] = None
+    timeout: float = 300.0
+
+
+@router.post("/run")
+async def worker_run(req: RunRequest) -> dict:
+    """단발 프롬프트를 풀에서 실행 (스케줄 우선순위, 사용자 요청이 먼저 워커를 받음)"""
+    if pool.size < 2:
+        # 워커를 잡고 있는 에이전트가 부르면 자기 자신을 기다리게 됨 → 호출한 쪽이 직접 실행
+        raise HTTPException(status_code=503, detail="워커가 하나뿐이라 중첩 실행 불가")
+    args = ["-m", req.model or OPENCODE_MODEL, req.prompt]
+    return await pool.run(args, timeout=min(max(req.timeout, 1.0), 1800.0), priority=PRIORITY_SCHEDULED)
+
+
+@router.get("/stats")
+async def worker_stats() -> dict:
+    """워커 풀 상태 (대기열 깊이, 대기/실행 시간)"""
+    return pool.stats()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+update_id 중복 제거 마이크로 벤치마크
+
+기존 방식(set + list(set)[:500] 제거)과 app.dedup.DedupCache를 비교한다.
+- 처리량: update 하나당 평균 처리 시간
+- 정확도: 마지막 N개 update_id가 캐시에 남아 있는지 (재전송 시 중복 처리 여부)
+
+사용법:
+    python scripts/bench_dedup.py
+    python scripts/bench_dedup.py --updates 1000000 --size 1000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.dedup import DedupCache  # noqa: E402
+
+
+def legacy_dedup(update_ids: list[int], max_size: int) -> set[int]:
+    """기존 app/handlers.py 방식"""
+    processed: set[int] = set()
+    for update_id in update_ids:
+        if update_id in processed:
+            continue
+        processed.add(update_id)
+        if len(processed) > max_size:
+            to_remove = list(processed)[:max_size // 2]
+            for item in to_remove:
+                processed.discard(item)
+    return processed
+
+
+def cache_dedup(update_ids: list[int], max_size: int) -> DedupCache:
+    """DedupCache 방식"""
+    cache = DedupCache(max_size=max_size, ttl=86400.0)
+    for update_id in update_ids:
+        cache.add(update_id)
+    return cache
+
+
+def make_stream(count: int, retry_rate: float) -> list[int]:
+    """증가하는 update_id + 일정 비율의 최근 재전송"""
+    rng = random.Random(42)
+    base = rng.randint(100_000_000, 900_000_000)
+    stream = []
+    for i in range(count):
+        stream.append(base + i)
+        if i > 10 and rng.random() < retry_rate:
+            stream.append(base + i - rng.randint(1, 10))
+    return stream
+
+
+def main():
+    parser = argparse.ArgumentParser(description="update_id 중복 제거 벤치마크")
+    parser.add_argument("--updates", "-n", type=int, default=200_000, help="update 수 (기본: 200000)")
+    parser.add_argument("--size", type=int, default=1000, help="캐시 상한 (기본: 1000)")
+    parser.add_argument("--retry-rate", type=float, default=0.05, help="재전송 비율 (기본: 0.05)")
+    parser.add_argument("--recent", type=int, default=500, help="정확도 확인용 최근 id 수 (기본: 500)")
+    args = parser.parse_args()
+
+    stream = make_stream(args.updates, args.retry_rate)
+    recent = list(range(max(stream) - args.recent + 1, max(stream) + 1))
+
+    print(f"updates={len(stream):,} size={args.size} retry_rate={args.retry_rate}\n")
+
+    start = time.perf_counter()
+    legacy = legacy_dedup(stream, args.size)
+    legacy_time = time.perf_counter() - start
+    legacy_kept = sum(1 for u in recent if u in legacy)
+
+    start = time.perf_counter()
+    cache = cache_dedup(stream, args.size)
+    cache_time = time.perf_counter() - start
+    cache_kept = sum(1 for u in recent if u in cache)
+
+    for name, elapsed, kept in (
+        ("set", legacy_time, legacy_kept),
+        ("DedupCache", cache_time, cache_kept),
+    ):
+        print(
+            f"{name:<11} {elapsed / len(stream) * 1e9:8.0f} ns/update  "
+            f"최근 {args.recent}개 중 보존 {kept:>4} ({kept / args.recent:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
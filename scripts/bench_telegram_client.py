@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Telegram HTTP 클라이언트 벤치마크
+
+로컬 스텁 Telegram 서버를 띄우고 두 방식을 비교한다.
+- per-call: 호출마다 httpx.AsyncClient 생성 (기존 방식)
+- pooled: app.telegram 공유 클라이언트 (keep-alive 커넥션 재사용)
+
+사용법:
+    python scripts/bench_telegram_client.py
+    python scripts/bench_telegram_client.py --calls 500 --handshake-ms 30
+
+--handshake-ms는 새 커넥션마다 지연을 주어 실제 TCP+TLS 핸드셰이크 비용을 흉내낸다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+try:
+    import httpx
+except ImportError:
+    print("Error: pip install httpx")
+    sys.exit(1)
+
+
+STUB_RESPONSE = json.dumps({"ok": True, "result": True}).encode()
+
+
+async def start_stub_server(handshake_ms: float) -> tuple[asyncio.AbstractServer, int]:
+    """keep-alive를 지원하는 최소 HTTP/1.1 스텁 서버"""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # 새 커넥션 = 핸드셰이크 비용
+        if handshake_ms:
+            await asyncio.sleep(handshake_ms / 1000)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(STUB_RESPONSE)).encode() + b"\r\n"
+                    b"\r\n" + STUB_RESPONSE
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, port
+
+
+async def bench_per_call(api_base: str, calls: int) -> list[float]:
+    """기존 방식: 호출마다 새 AsyncClient"""
+    url = f"{api_base}/botTEST/sendChatAction"
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            response = await client.post(url, json={"chat_id": 1, "action": "typing"})
+            response.json()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def bench_pooled(calls: int) -> list[float]:
+    """공유 클라이언트: app.telegram.send_chat_action"""
+    from app import telegram
+
+    await telegram.start_client()
+    timings = []
+    try:
+        for _ in range(calls):
+            start = time.perf_counter()
+            await telegram.send_chat_action(1, "typing")
+            timings.append(time.perf_counter() - start)
+    finally:
+        await telegram.close_client()
+    return timings
+
+
+def report(name: str, timings: list[float]):
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[int(len(ms) * 0.95) - 1] if len(ms) >= 20 else ms[-1]
+    print(
+        f"{name:<10} calls={len(ms):<5} "
+        f"mean={statistics.mean(ms):7.3f}ms  p50={statistics.median(ms):7.3f}ms  "
+        f"p95={p95:7.3f}ms  total={sum(ms) / 1000:6.2f}s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Telegram HTTP 클라이언트 벤치마크")
+    parser.add_argument("--calls", "-n", type=int, default=200, help="호출 횟수 (기본: 200)")
+    parser.add_argument("--handshake-ms", type=float, default=0.0, help="새 커넥션당 지연 (기본: 0)")
+    args = parser.parse_args()
+
+    server, port = await start_stub_server(args.handshake_ms)
+    api_base = f"http://127.0.0.1:{port}"
+
+    # app.config 로드 전에 스텁 서버로 향하도록 설정
+    os.environ["TELEGRAM_API_BASE"] = api_base
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "TEST")
+
+    # 성공 로그가 결과를 가리지 않도록 stdout 억제
+    devnull = open(os.devnull, "w")
+    real_stdout = sys.stdout
+
+    print(f"스텁 서버: {api_base} (handshake={args.handshake_ms}ms)\n")
+    sys.stdout = devnull
+    try:
+        per_call = await bench_per_call(api_base, args.calls)
+        pooled = await bench_pooled(args.calls)
+    finally:
+        sys.stdout = real_stdout
+        devnull.close()
+
+    report("per-call", per_call)
+    report("pooled", pooled)
+    print(f"\n평균 지연 개선: {statistics.mean(per_call) / statistics.mean(pooled):.1f}x")
+
+    server.close()
+    await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+보조지표 엔진 증분 계산 회귀 확인
+
+거래소 없이 임시 캔들 DB에 가상 캔들을 넣고, IndicatorEngine이 돌려준 값을
+전체 이력을 처음부터 다시 계산한 값과 비교한다.
+
+확인하는 순서:
+1. count=100 조회 (처음 계산)
+2. count=150 조회 (창 앞쪽이 1번의 워밍업 구간에 걸침 → 다시 계산해야 함)
+3. 새 캔들 추가 후 count=150 조회 (저장 상태에서 증분)
+4. 진행 중 캔들 값이 바뀐 뒤 다시 조회 (진행 중 캔들은 저장하지 않아야 함)
+5. 긴 공백 뒤 캔들 저장소가 시리즈를 교체한 후 조회 (이전 상태에서 이어 계산하면 안 됨)
+
+사용법:
+    python scripts/check_indicators.py
+"""
+
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / ".opencode" / "skills" / "market-data" / "scripts"))
+
+from candle_store import CandleStore  # noqa: E402
+from indicators import IndicatorEngine, columns, parse_spec  # noqa: E402
+
+SPECS = ["sma:20", "ema:20", "macd:12:26:9", "rsi:14", "bb:20:2", "atr:14"]
+KEY = ("binance", "CHECK", "1m")
+MINUTE = 60_000
+
+# 워밍업(EMA 기간의 4배, Wilder 8배) 이후 초기값 영향은 e^-8 수준, 값 범위 대비 이 비율 안이면 통과
+TOLERANCE = 1e-3
+
+
+class OfflineStore(CandleStore):
+    """거래소를 부르지 않는 캔들 저장소 (넣어 둔 캔들만 사용)"""
+
+    def refresh(self, *args, **kwargs):
+        pass
+
+    def backfill(self, *args, **kwargs):
+        pass
+
+
+def make_candles(count: int, seed: int = 7) -> list[tuple]:
+    rng = random.Random(seed)
+    close, candles = 100.0, []
+    for i in range(count):
+        open_ = close
+        close = max(1.0, close + rng.gauss(0, 1))
+        high = max(open_, close) + rng.random()
+        low = min(open_, close) - rng.random()
+        candles.append((i * MINUTE, open_, high, low, close, 1.0, None))
+    return candles
+
+
+def reference(spec: str, candles: list[tuple], count: int) -> list[tuple]:
+    """전체 이력을 처음부터 계산한 최근 count개 값"""
+    indicator = parse_spec(spec)
+    return [indicator.update(candle) for candle in candles][-count:]
+
+
+def compare(engine: IndicatorEngine, candles: list[tuple], count: int, step: str) -> list[str]:
+    df = engine.frame(*KEY, count, SPECS)
+    price_range = max(c[2] for c in candles) - min(c[3] for c in candles)
+    failures = []
+    for spec in SPECS:
+        expected = reference(spec, candles, count)
+        # RSI는 0~100 척도, 나머지는 가격 척도
+        scale = 100.0 if spec.startswith("rsi") else price_range
+        for i, column in enumerate(columns(parse_spec(spec))):
+            worst = 0.0
+            for actual, values in zip(df[column].tolist(), expected):
+                if values[i] is None:
+                    continue
+                worst = max(worst, abs(actual - values[i]) / scale)
+            if not worst <= TOLERANCE:
+                failures.append(f"{step}: {column} 오차 {worst:.2e} (값 범위 대비)")
+    return failures
+
+
+def main():
+    candles = make_candles(600)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = OfflineStore(Path(tmp) / "candles.db")
+        engine = IndicatorEngine(store)
+        try:
+            store._save(KEY, candles[:400])
+            failures = compare(engine, candles[:400], 100, "처음 계산 (count=100)")
+            failures += compare(engine, candles[:400], 150, "워밍업 구간까지 넓힘 (count=150)")
+
+            store._save(KEY, candles[399:450])
+            failures += compare(engine, candles[:450], 150, "새 캔들 증분 (count=150)")
+
+            # 진행 중 캔들이 바뀐 경우: 앞서 계산한 값이 상태에 남아 있으면 안 됨
+            revised = list(candles[:460])
+            store._save(KEY, revised[450:])
+            engine.frame(*KEY, 150, SPECS)
+            revised[-1] = (*revised[-1][:4], revised[-1][4] + 5, *revised[-1][5:])
+            store._save(KEY, [revised[-1]])
+            failures += compare(engine, revised, 150, "진행 중 캔들 변경")
+
+            # 긴 공백 뒤 시리즈 교체: 이전 상태 이후 캔들이 저장소에 없음
+            later = [(c[0] + 1500 * MINUTE, *(v + 50 for v in c[1:5]), *c[5:]) for c in make_candles(200, seed=11)]
+            store._save(KEY, later, replace=True)
+            failures += compare(engine, later, 150, "공백 뒤 시리즈 교체")
+        finally:
+            store.close()
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"OK: {len(SPECS)}개 지표 증분 결과가 전체 재계산과 일치 (허용 오차 {TOLERANCE:g})")
+
+
+if __name__ == "__main__":
+    main()
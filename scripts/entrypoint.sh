@@ -19,12 +19,38 @@ else
     echo "WARNING: CLOUDFLARE_TUNNEL_TOKEN not set, tunnel disabled"
 fi
 
+# 텔레그램 수집 데몬 시작 (백그라운드, 메시지를 로컬 저장소에 계속 기록)
+if [ -n "$TELEGRAM_SESSION_STRING" ] && [ "${COLLECTOR_DAEMON:-true}" = "true" ]; then
+    echo "Starting Telegram collector daemon..."
+    uv run python /app/.opencode/skills/telegram-collector/scripts/collector_daemon.py &
+    COLLECTOR_PID=$!
+    echo "Collector daemon started (PID: $COLLECTOR_PID)"
+else
+    echo "Collector daemon disabled (TELEGRAM_SESSION_STRING not set or COLLECTOR_DAEMON=false)"
+fi
+
+# 시세 데몬 시작 (백그라운드, 시세 스크립트가 공유하는 TTL 캐시)
+if [ "${MARKETD:-true}" = "true" ]; then
+    echo "Starting market-data daemon..."
+    uv run python /app/.opencode/skills/market-data/scripts/marketd.py &
+    MARKETD_PID=$!
+    echo "Market-data daemon started (PID: $MARKETD_PID)"
+else
+    echo "Market-data daemon disabled (MARKETD=false)"
+fi
+
 # 종료 시그널 핸들링
 cleanup() {
     echo "Shutting down..."
     if [ -n "$CLOUDFLARED_PID" ]; then
         kill $CLOUDFLARED_PID 2>/dev/null || true
     fi
+    if [ -n "$COLLECTOR_PID" ]; then
+        kill $COLLECTOR_PID 2>/dev/null || true
+    fi
+    if [ -n "$MARKETD_PID" ]; then
+        kill $MARKETD_PID 2>/dev/null || true
+    fi
     exit 0
 }
 trap cleanup SIGTERM SIGINT
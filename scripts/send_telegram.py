@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """
 Telegram Bot으로 메시지 전송
+
+서버(app.main)가 실행 중이면 로컬 발신 큐(/outbox/sendMessage)로 보내
+속도 제한을 공유하고, 없으면 Bot API로 직접 전송한다 (429 retry_after 준수).
 """
 
 import os
@@ -21,6 +24,8 @@ except ImportError:
     print("설치: pip install requests")
     sys.exit(1)
 
+import telegram_outbox as outbox
+
 
 def find_project_root() -> Path:
     current = Path(__file__).resolve().parent
@@ -31,8 +36,25 @@ def find_project_root() -> Path:
     return Path.cwd()
 
 
+def send_via_outbox(chat_id: str, text: str, parse_mode: str = "Markdown"):
+    """로컬 발신 큐로 전송. 발신 큐를 쓸 수 없으면 None 반환"""
+    data = outbox.send_via_outbox("sendMessage", {"chat_id": chat_id, "text": text, "parse_mode": parse_mode})
+    if data is None:
+        return None
+    if not data.get("ok"):
+        print(f"Error: {data.get('description', 'Unknown error')}")
+        return False
+    if data.get("chunks", 1) > 1:
+        print(f"  전송 {data['sent']}/{data['chunks']} (발신 큐)")
+    return True
+
+
 def send_message(bot_token: str, chat_id: str, text: str, parse_mode: str = "Markdown") -> bool:
     """텔레그램 봇으로 메시지 전송"""
+    result = send_via_outbox(chat_id, text, parse_mode)
+    if result is not None:
+        return result
+
     url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
 
     # 텔레그램 메시지 길이 제한 (4096자)
@@ -61,15 +83,13 @@ def send_message(bot_token: str, chat_id: str, text: str, parse_mode: str = "Mar
             "parse_mode": parse_mode,
         }
 
-        response = requests.post(url, json=payload)
-        data = response.json()
+        data = outbox.post_with_retry(url, json=payload)
 
         if not data.get("ok"):
             # Markdown 파싱 실패시 plain text로 재시도
             if "can't parse" in data.get("description", "").lower():
                 payload["parse_mode"] = None
-                response = requests.post(url, json=payload)
-                data = response.json()
+                data = outbox.post_with_retry(url, json=payload)
 
             if not data.get("ok"):
                 print(f"Error: {data.get('description', 'Unknown error')}")
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """
 Telegram Bot으로 이미지 전송
+
+서버(app.main)가 실행 중이면 로컬 발신 큐(/outbox/sendPhoto)로 보내
+속도 제한을 공유하고, 없으면 Bot API로 직접 전송한다 (429 retry_after 준수).
 """
 
 import os
@@ -21,6 +24,8 @@ except ImportError:
     print("설치: pip install requests")
     sys.exit(1)
 
+import telegram_outbox as outbox
+
 
 def find_project_root() -> Path:
     current = Path(__file__).resolve().parent
@@ -31,41 +36,56 @@ def find_project_root() -> Path:
     return Path.cwd()
 
 
+def send_via_outbox(chat_id: str, photo_path: Path, caption: str = None):
+    """로컬 발신 큐로 전송. 발신 큐를 쓸 수 없으면 None 반환"""
+    payload = {"chat_id": chat_id, "path": str(photo_path.resolve()), "caption": caption}
+    result = outbox.send_via_outbox("sendPhoto", payload)
+    if result is None:
+        return None
+    if not result.get("ok"):
+        print(f"Error: {result.get('description', 'Unknown error')}")
+        return False
+    return True
+
+
+def post_with_retry(url: str, data: dict, photo_file: Path) -> dict:
+    """sendPhoto 호출, 429면 retry_after만큼 기다렸다가 재시도"""
+    files = {"photo": (photo_file.name, photo_file.read_bytes())}
+    return outbox.post_with_retry(url, timeout=60, data=data, files=files)
+
+
 def send_photo(bot_token: str, chat_id: str, photo_path: str, caption: str = None) -> bool:
     """텔레그램 봇으로 이미지 전송"""
-    url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
-
     photo_file = Path(photo_path)
     if not photo_file.exists():
         print(f"Error: 파일을 찾을 수 없음: {photo_path}")
         return False
 
-    with open(photo_file, "rb") as f:
-        files = {"photo": f}
-        data = {"chat_id": chat_id}
+    result = send_via_outbox(chat_id, photo_file, caption)
+    if result is not None:
+        return result
+
+    url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
+    data = {"chat_id": chat_id}
+
+    if caption:
+        # 캡션 길이 제한 (1024자)
+        if len(caption) > 1024:
+            caption = caption[:1021] + "..."
+        data["caption"] = caption
+        data["parse_mode"] = "Markdown"
 
-        if caption:
-            # 캡션 길이 제한 (1024자)
-            if len(caption) > 1024:
-                caption = caption[:1021] + "..."
-            data["caption"] = caption
-            data["parse_mode"] = "Markdown"
+    result = post_with_retry(url, data, photo_file)
 
-        response = requests.post(url, files=files, data=data)
-        result = response.json()
+    if not result.get("ok"):
+        # Markdown 파싱 실패시 plain text로 재시도
+        if caption and "can't parse" in result.get("description", "").lower():
+            data.pop("parse_mode", None)
+            result = post_with_retry(url, data, photo_file)
 
         if not result.get("ok"):
-            # Markdown 파싱 실패시 plain text로 재시도
-            if caption and "can't parse" in result.get("description", "").lower():
-                data.pop("parse_mode", None)
-                f.seek(0)
-                files = {"photo": f}
-                response = requests.post(url, files=files, data=data)
-                result = response.json()
-
-            if not result.get("ok"):
-                print(f"Error: {result.get('description', 'Unknown error')}")
-                return False
+            print(f"Error: {result.get('description', 'Unknown error')}")
+            return False
 
     return True
 
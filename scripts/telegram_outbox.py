@@ -0,0 +1,75 @@
+"""
+텔레그램 전송 스크립트 공용: 로컬 발신 큐 + Bot API 429 재시도
+
+send_telegram.py, send_telegram_image.py, data-visualization/send_chart.py가 같이 쓴다.
+
+발신 큐에 닿지 못했을 때(서버 없음, 연결 거부) 또는 403/404(외부 경유, 발신 큐 없는 서버)일 때만
+None을 돌려 Bot API 직접 전송으로 넘긴다. 요청이 서버에 도착한 뒤의 실패(읽기 타임아웃, 5xx,
+깨진 응답)는 발신 큐가 이미 보냈거나 일부만 보냈을 수 있으므로 다시 보내지 않고 실패로 알린다.
+"""
+
+import os
+import time
+from typing import Optional
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError
+
+# 로컬 발신 큐 주소
+DEFAULT_OUTBOX_URL = "http://127.0.0.1:8000/outbox"
+
+# 429 응답 재시도 횟수
+MAX_RETRIES = 3
+
+# 직접 전송으로 넘겨도 되는 발신 큐 응답 (local_only 거부, 엔드포인트 없음)
+FALLBACK_STATUSES = {403, 404}
+
+
+def _not_connected(error: requests.exceptions.ConnectionError) -> bool:
+    """연결 자체가 안 된 경우인지 (요청이 서버에 전달되지 않음)"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    # 연결 거부/주소 없음은 urllib3 NewConnectionError (ConnectTimeoutError 하위 클래스)
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, ConnectTimeoutError)
+
+
+def send_via_outbox(method: str, payload: dict) -> Optional[dict]:
+    """로컬 발신 큐로 전송
+
+    Returns:
+        None: 발신 큐를 쓸 수 없음 (직접 전송해도 중복 없음)
+        dict: 발신 큐 결과 ({"ok": ...}, 실패면 description)
+    """
+    url = os.environ.get("OUTBOX_URL", DEFAULT_OUTBOX_URL).rstrip("/") + f"/{method}"
+    try:
+        response = requests.post(url, json=payload, timeout=(1, 300))
+    except requests.exceptions.ConnectionError as e:
+        if _not_connected(e):
+            return None
+        return {"ok": False, "description": f"발신 큐 연결 끊김, 중복 전송을 막기 위해 다시 보내지 않음 ({e})"}
+    except requests.exceptions.RequestException as e:
+        return {"ok": False, "description": f"발신 큐 응답 없음, 중복 전송을 막기 위해 다시 보내지 않음 ({e})"}
+
+    if response.status_code in FALLBACK_STATUSES:
+        return None
+    try:
+        data = response.json()
+    except ValueError:
+        return {"ok": False, "description": f"발신 큐 응답 오류 (HTTP {response.status_code})"}
+    if response.status_code != 200:
+        detail = (data.get("detail") or data.get("description")) if isinstance(data, dict) else None
+        return {"ok": False, "description": f"발신 큐 오류 (HTTP {response.status_code}): {detail or data}"}
+    return data
+
+
+def post_with_retry(url: str, timeout: float = 30, **kwargs) -> dict:
+    """Bot API 호출, 429면 retry_after만큼 기다렸다가 재시도 (kwargs는 requests.post 인자)"""
+    for attempt in range(MAX_RETRIES + 1):
+        data = requests.post(url, timeout=timeout, **kwargs).json()
+        if data.get("error_code") != 429 or attempt == MAX_RETRIES:
+            return data
+        retry_after = data.get("parameters", {}).get("retry_after", 1)
+        print(f"  429 Too Many Requests, {retry_after}초 대기")
+        time.sleep(retry_after)
+    return data
@@ -55,6 +55,10 @@ def find_project_root() -> Path:
 PROJECT_ROOT = find_project_root()
 load_dotenv(PROJECT_ROOT / ".env")
 
+# app 패키지의 공용 모듈 사용 (app.dedup은 app.config에 의존하지 않음)
+sys.path.insert(0, str(PROJECT_ROOT))
+from app.dedup import DedupCache  # noqa: E402
+
 BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
 if not BOT_TOKEN:
     print("Error: TELEGRAM_BOT_TOKEN이 필요합니다.")
@@ -69,9 +73,8 @@ app = FastAPI(title="Telegram Webhook Bot")
 MessageHandler = Callable[[dict], Awaitable[Optional[str]]]
 _message_handlers: list[MessageHandler] = []
 
-# 중복 처리 방지용 (최근 처리한 update_id 저장)
-_processed_updates: set[int] = set()
-_MAX_PROCESSED_UPDATES = 1000
+# 중복 처리 방지용 (최근 처리한 update_id를 순서대로 보관, 24시간 TTL)
+_processed_updates = DedupCache(max_size=10000, ttl=86400.0)
 
 
 def on_message(handler: MessageHandler):
@@ -188,17 +191,9 @@ async def webhook_handler(request: Request, background_tasks: BackgroundTasks):
 
     # 중복 처리 방지
     update_id = update.get("update_id")
-    if update_id in _processed_updates:
+    if not _processed_updates.add(update_id):
         print(f"[중복] update_id={update_id} 이미 처리됨, 스킵")
         return JSONResponse({"ok": True})
-    
-    # 처리 완료 표시
-    _processed_updates.add(update_id)
-    if len(_processed_updates) > _MAX_PROCESSED_UPDATES:
-        # 오래된 항목 제거 (set은 순서가 없어서 일부만 제거)
-        to_remove = list(_processed_updates)[:_MAX_PROCESSED_UPDATES // 2]
-        for item in to_remove:
-            _processed_updates.discard(item)
 
     # 메시지 추출
     message = update.get("message")